@@ -0,0 +1,107 @@
+"""
+Compares the number of gradient updates per second of agents with eager update
+steps and with compiled update steps (``compile_update=True``) on CPU.
+
+The first compiled updates capture the update step, so they are run before
+timing, like the eager warmup updates.
+
+Example:
+    ``python examples/benchmarks/compiled_updates.py --agents dqn sac --updates 2000``
+"""
+import argparse
+import time
+
+import torch
+from utils import fill_replay_buffer
+
+from genrl.agents import DDPG, DQN, PPO1, SAC, TD3
+from genrl.environments import VectorEnv
+
+AGENTS = {
+    "dqn": (DQN, "CartPole-v1"),
+    "ddpg": (DDPG, "Pendulum-v0"),
+    "td3": (TD3, "Pendulum-v0"),
+    "sac": (SAC, "Pendulum-v0"),
+    "ppo": (PPO1, "CartPole-v1"),
+}
+
+
+def make_update(agent, env, batch_size: int):
+    """
+    Returns a function running one gradient update of the agent
+    """
+    if isinstance(agent, PPO1):
+        values, done = agent.collect_rollouts(env.reset())
+        agent.get_traj_loss(values, done)
+        n_minibatches = agent.rollout_size * env.n_envs // batch_size
+        return agent.update_params, n_minibatches
+
+    fill_replay_buffer(agent, env, 1000, random_actions=True)
+    return lambda: agent.update_params(1), 1
+
+
+def benchmark(name: str, compile_update, updates: int, warmup: int, batch_size: int):
+    """
+    Returns the number of gradient updates per second of an agent
+    """
+    torch.manual_seed(0)
+    agent_cls, env_id = AGENTS[name]
+    env = VectorEnv(env_id, 1)
+    kwargs = {"rollout_size": 512} if agent_cls is PPO1 else {"replay_size": 1000}
+    agent = agent_cls(
+        "mlp", env, batch_size=batch_size, compile_update=compile_update, **kwargs
+    )
+    update, n_steps = make_update(agent, env, batch_size)
+
+    for _ in range(max(warmup // n_steps, 1)):
+        update()
+    n_calls = max(updates // n_steps, 1)
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        update()
+    agent.get_logging_params()
+    env.close()
+    return n_calls * n_steps / (time.perf_counter() - start)
+
+
+def main(args):
+    torch.set_num_threads(args.threads)
+    print(
+        "{:<8} {:>14} {:>14} {:>8}".format(
+            "Agent", "Eager (upd/s)", "Compiled", "Ratio"
+        )
+    )
+    for name in args.agents:
+        eager = benchmark(name, False, args.updates, args.warmup, args.batch_size)
+        compiled = benchmark(
+            name, args.backend, args.updates, args.warmup, args.batch_size
+        )
+        print(
+            "{:<8} {:>14.1f} {:>14.1f} {:>8.2f}".format(
+                name, eager, compiled, compiled / eager
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark compiled update steps")
+    parser.add_argument(
+        "--agents",
+        type=str,
+        nargs="+",
+        default=list(AGENTS),
+        choices=list(AGENTS),
+        help="Agents to benchmark",
+    )
+    parser.add_argument(
+        "--updates", type=int, default=2000, help="Timed gradient updates per agent"
+    )
+    parser.add_argument(
+        "--warmup", type=int, default=20, help="Untimed updates run before timing"
+    )
+    parser.add_argument("--batch-size", type=int, default=64, help="Minibatch size")
+    parser.add_argument(
+        "--backend", type=str, default="inductor", help="Backend of torch.compile"
+    )
+    parser.add_argument("--threads", type=int, default=1, help="Torch CPU threads")
+    main(parser.parse_args())
@@ -0,0 +1,81 @@
+"""
+Compares the construction time, step time and hot attribute access time of the
+TorchWrapper(GymWrapper(TimeLimit(env))) chain and of the equivalent FusedTorchEnv.
+
+Example:
+    ``python examples/benchmarks/fused_wrappers.py --env CartPole-v1 --timesteps 20000``
+"""
+import argparse
+import time
+
+import gym
+import torch
+
+from genrl.environments import GymEnv
+from genrl.environments.fused import FusedTorchEnv
+from genrl.environments.torch import TorchWrapper
+
+BUILDERS = {
+    "chain": lambda env_id: TorchWrapper(GymEnv(env_id)),
+    "fused": lambda env_id: FusedTorchEnv(gym.make(env_id)),
+}
+
+
+def benchmark(env_id: str, builder: str, n_builds: int, timesteps: int):
+    """
+    Builds environments with the given builder and steps one of them
+
+    Returns the construction time, the step time and the time to read obs_shape,
+    action_shape and action_space, in microseconds
+    """
+    start = time.perf_counter()
+    for _ in range(n_builds):
+        env = BUILDERS[builder](env_id)
+    build_time = (time.perf_counter() - start) / n_builds
+
+    env.seed(0)
+    env.reset()
+    actions = [torch.as_tensor(env.action_space.sample()) for _ in range(timesteps)]
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _ = env.step(action)
+        if done:
+            env.reset()
+    step_time = (time.perf_counter() - start) / timesteps
+
+    start = time.perf_counter()
+    for _ in range(timesteps):
+        env.obs_shape, env.action_shape, env.action_space
+    attr_time = (time.perf_counter() - start) / timesteps
+    env.close()
+
+    return build_time * 1e6, step_time * 1e6, attr_time * 1e6
+
+
+def main(args):
+    print(
+        "{:<8} {:>12} {:>12} {:>12}".format(
+            "Method", "Build (us)", "Step (us)", "Attrs (us)"
+        )
+    )
+    for builder in BUILDERS:
+        build_time, step_time, attr_time = benchmark(
+            args.env, builder, args.n_builds, args.timesteps
+        )
+        print(
+            "{:<8} {:>12.1f} {:>12.2f} {:>12.3f}".format(
+                builder, build_time, step_time, attr_time
+            )
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark fused wrapper chains")
+    parser.add_argument("--env", type=str, default="CartPole-v1", help="Gym env id")
+    parser.add_argument(
+        "--n-builds", type=int, default=100, help="Environments built per method"
+    )
+    parser.add_argument(
+        "--timesteps", type=int, default=20000, help="Steps taken per method"
+    )
+    main(parser.parse_args())
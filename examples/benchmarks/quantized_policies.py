@@ -0,0 +1,121 @@
+"""
+Compares the latency of acting on a single observation on CPU with the float32
+networks of an agent and with its int8 quantized export (export_quantized_agent),
+along with the rate of agreement of their greedy actions.
+
+Every linear layer is quantized by default. Layers with fewer than
+--min-weight-size weights are kept in float32 (int8 layers are slower than float32
+ones on small layers). With --check, the script fails if an agent with int8 layers
+is slower than its float32 agent.
+
+Example:
+    ``python examples/benchmarks/quantized_policies.py --layers 64 256 1024``
+    ``python examples/benchmarks/quantized_policies.py --min-weight-size 524288 --check``
+"""
+import argparse
+import time
+
+import torch
+from torch.ao.nn.quantized import dynamic
+from utils import fill_replay_buffer
+
+from genrl.agents import DQN
+from genrl.core import export_quantized_agent
+from genrl.environments import VectorEnv
+
+
+def latency(agent, state: torch.Tensor, n_calls: int) -> float:
+    """
+    Returns the mean time of a call to act, in microseconds
+    """
+    for _ in range(max(n_calls // 10, 1)):
+        agent.act(state, deterministic=True)
+    start = time.perf_counter()
+    for _ in range(n_calls):
+        agent.act(state, deterministic=True)
+    return (time.perf_counter() - start) / n_calls * 1e6
+
+
+def benchmark(width: int, args):
+    """
+    Returns the latencies of the float32 and int8 agents, their agreement rate and
+    the number of quantized layers
+    """
+    torch.manual_seed(0)
+    env = VectorEnv(args.env, 1)
+    agent = DQN("mlp", env, replay_size=args.states, value_layers=[width, width])
+    fill_replay_buffer(agent, env, args.states)
+    exported = export_quantized_agent(agent, min_weight_size=args.min_weight_size)
+    n_quantized = sum(
+        isinstance(layer, dynamic.Linear) for layer in exported.model.modules()
+    )
+
+    states = agent.replay_buffer.sample(args.states)[0].reshape(-1, *env.obs_shape)
+    agreement = (
+        (
+            exported.act(states, deterministic=True)
+            == agent.act(states, deterministic=True)
+        )
+        .float()
+        .mean()
+        .item()
+    )
+    state = env.reset()
+    fp32 = latency(agent, state, args.calls)
+    int8 = latency(exported, state, args.calls)
+    env.close()
+    return fp32, int8, agreement, n_quantized
+
+
+def main(args):
+    torch.set_num_threads(args.threads)
+    print(
+        "{:<8} {:>12} {:>12} {:>8} {:>10} {:>12}".format(
+            "Width", "fp32 (us)", "int8 (us)", "Speedup", "Agreement", "int8 layers"
+        )
+    )
+    slower = []
+    for width in args.layers:
+        fp32, int8, agreement, n_quantized = benchmark(width, args)
+        print(
+            "{:<8} {:>12.1f} {:>12.1f} {:>8.2f} {:>10.3f} {:>12}".format(
+                width, fp32, int8, fp32 / int8, agreement, n_quantized
+            )
+        )
+        # Agents without quantized layers are the float32 agents
+        if n_quantized > 0 and int8 >= fp32:
+            slower.append(width)
+
+    if args.check and slower:
+        raise SystemExit("The int8 agents of widths {} are slower".format(slower))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark quantized policies")
+    parser.add_argument("--env", type=str, default="CartPole-v1", help="Gym env id")
+    parser.add_argument(
+        "--layers",
+        type=int,
+        nargs="+",
+        default=[64, 256, 1024],
+        help="Widths of the two hidden layers of the benchmarked Q networks",
+    )
+    parser.add_argument(
+        "--min-weight-size",
+        type=int,
+        default=0,
+        help="Minimum number of weights of the quantized layers",
+    )
+    parser.add_argument(
+        "--states", type=int, default=1000, help="Observations to compare actions on"
+    )
+    parser.add_argument(
+        "--calls", type=int, default=2000, help="Timed calls to act per agent"
+    )
+    parser.add_argument("--threads", type=int, default=1, help="Torch CPU threads")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Fail if an agent with int8 layers is slower than its float32 agent",
+    )
+    main(parser.parse_args())
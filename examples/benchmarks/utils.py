@@ -0,0 +1,21 @@
+"""
+Helpers shared by the benchmark scripts
+"""
+import numpy as np
+import torch
+
+
+def fill_replay_buffer(agent, env, timesteps: int, random_actions: bool = False):
+    """
+    Pushes the transitions of timesteps steps of env into the replay buffer of an
+    agent, with the actions of the agent or with random actions
+    """
+    state = env.reset()
+    for _ in range(timesteps):
+        if random_actions:
+            action = torch.as_tensor(np.array([env.action_space.sample()] * env.n_envs))
+        else:
+            action = agent.act(state)
+        next_state, reward, done, _ = env.step(action)
+        agent.replay_buffer.push((state, action, reward, next_state, done))
+        state = next_state
@@ -0,0 +1,81 @@
+"""
+Compares the startup time and throughput of the serial, thread pool and subprocess
+VecEnv backends.
+
+Example:
+    ``python examples/benchmarks/vec_env_backends.py --n-envs 8 --timesteps 2000``
+"""
+import argparse
+import time
+
+from genrl.environments import VectorEnv
+
+ENV_FAMILIES = {
+    "classic_control": ("CartPole-v1", "gym"),
+    "box2d": ("LunarLander-v2", "gym"),
+    "atari": ("PongNoFrameskip-v4", "atari"),
+}
+
+BACKENDS = ("serial", "thread", "process")
+
+
+def benchmark(env_id: str, env_type: str, backend: str, n_envs: int, timesteps: int):
+    """
+    Builds a vectorised env and steps it with random actions
+
+    Returns the construction time in seconds and the env steps per second
+    """
+    start = time.perf_counter()
+    env = VectorEnv(env_id, n_envs, parallel=backend, env_type=env_type)
+    startup = time.perf_counter() - start
+    env.seed(0)
+    env.reset()
+    actions = [env.sample() for _ in range(timesteps)]
+
+    start = time.perf_counter()
+    for action in actions:
+        env.step(action)
+    elapsed = time.perf_counter() - start
+    env.close()
+
+    return startup, timesteps * n_envs / elapsed
+
+
+def main(args):
+    print(
+        "{:<16} {:<20} {:>12} {:>12}".format(
+            "Family", "Backend", "Startup (s)", "Steps/sec"
+        )
+    )
+    for family in args.families:
+        env_id, env_type = ENV_FAMILIES[family]
+        for backend in BACKENDS:
+            try:
+                startup, steps_per_sec = benchmark(
+                    env_id, env_type, backend, args.n_envs, args.timesteps
+                )
+            except Exception as e:  # Missing Box2D/ALE installs etc.
+                print("{:<16} {:<20} {:>12}".format(family, backend, "skipped"))
+                print("    ({}: {})".format(type(e).__name__, e))
+                continue
+            print(
+                "{:<16} {:<20} {:>12.2f} {:>12.1f}".format(
+                    family, backend, startup, steps_per_sec
+                )
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark VecEnv backends")
+    parser.add_argument(
+        "--families",
+        nargs="+",
+        default=list(ENV_FAMILIES.keys()),
+        choices=list(ENV_FAMILIES.keys()),
+        help="Environment families to benchmark",
+    )
+    parser.add_argument("--n-envs", type=int, default=8, help="Number of envs")
+    parser.add_argument(
+        "--timesteps", type=int, default=1000, help="Vectorised steps per backend"
+    )
+    main(parser.parse_args())
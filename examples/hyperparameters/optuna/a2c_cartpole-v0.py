@@ -1,15 +1,16 @@
-import numpy as np
 import optuna
-import torch
 
 from genrl.agents.a2c.a2c import A2C
 from genrl.environments.suite import VectorEnv
+from genrl.trainers.evaluation import SequentialStopping
 from genrl.trainers.onpolicy import OnPolicyTrainer
 
-env = VectorEnv("CartPole-v0")
-
 
 def tune_A2C(trial):
+    # Envs are handed out by the persistent worker pool, so trials after the first
+    # do not have to spawn processes or construct the environments again
+    env = VectorEnv("CartPole-v0", parallel="pool")
+
     # Define hyperparameters that are relevant for training
     # Choose a suggestion type and range (float/int and log/uniform)
     lr_value = trial.suggest_float("lr_value", 1e-5, 1e-2, log=True)
@@ -30,43 +31,16 @@ def tune_A2C(trial):
         env,
         log_interval=10,
         epochs=100,
-        evaluate_episodes=10,
+        evaluate_episodes=50,
+        # Stop evaluating configurations which clearly solve (or fail) the env
+        eval_stopping=SequentialStopping(tolerance=5.0, threshold=195.0),
     )
     trainer.train()
 
-    episode, episode_reward = 0, np.zeros(trainer.env.n_envs)
-    episode_rewards = []
-    state = trainer.env.reset()
-    while True:
-        if trainer.off_policy:
-            action = trainer.agent.select_action(state, deterministic=True)
-        else:
-            action, _, _ = trainer.agent.select_action(state)
-
-        if isinstance(action, torch.Tensor):
-            action = action.numpy()
-
-        next_state, reward, done, _ = trainer.env.step(action)
-
-        episode_reward += reward
-        state = next_state
-        if np.any(done):
-            for i, di in enumerate(done):
-                if di:
-                    episode += 1
-                    episode_rewards.append(episode_reward[i])
-                    episode_reward[i] = 0
-        if episode == trainer.evaluate_episodes:
-            print(
-                "Evaluated for {} episodes, Mean Reward: {:.2f}, Std Deviation for the Reward: {:.2f}".format(
-                    trainer.evaluate_episodes,
-                    np.mean(episode_rewards),
-                    np.std(episode_rewards),
-                )
-            )
-            break
-
-    return np.mean(episode_rewards)
+    summary = trainer.evaluate()
+    trial.set_user_attr("eval_episodes", summary["Episodes"])
+    env.close()
+    return summary["Mean Reward"]
 
 
 agent_name = "A2C"  # replace
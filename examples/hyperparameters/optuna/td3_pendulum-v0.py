@@ -1,9 +1,8 @@
-import numpy as np
 import optuna
-import torch
 
 from genrl.agents.td3.td3 import TD3
 from genrl.environments.suite import VectorEnv
+from genrl.trainers.evaluation import SequentialStopping
 from genrl.trainers.offpolicy import OffPolicyTrainer
 
 env = VectorEnv("Pendulum-v0")
@@ -24,40 +23,15 @@ def objective(trial):
         log_interval=5,
         epochs=100,
         max_timesteps=16500,
-        evaluate_episodes=10,
+        evaluate_episodes=30,
+        eval_stopping=SequentialStopping(tolerance=20.0),
         max_ep_len=max_ep_len,
     )
     trainer.train()
 
-    episode = 0
-    episode_rewards = []
-    state = trainer.env.reset()
-
-    while True:
-        if trainer.off_policy:
-            action = trainer.agent.select_action(state, deterministic=True)
-        else:
-            action, _, _ = trainer.agent.select_action(state)
-
-        if isinstance(action, torch.Tensor):
-            action = action.numpy()
-
-        next_state, reward, done, _ = trainer.env.step(action)
-
-        state = next_state
-
-        if np.any(done):
-            for i, di in enumerate(done):
-                if di:
-                    episode += 1
-                    episode_rewards.append(trainer.env.episode_reward[i])
-                    trainer.env.episode_reward[i] = 0
-
-        if episode == trainer.evaluate_episodes:
-            eval_reward = float(np.mean(episode_rewards))
-
-            trial.report(eval_reward, int(episode))
-            break
+    summary = trainer.evaluate()
+    eval_reward = float(summary["Mean Reward"])
+    trial.report(eval_reward, summary["Episodes"])
 
     return eval_reward
 
@@ -84,6 +84,7 @@ class A2C(OnPolicyAgent):
                 val_type="V",
                 discrete=discrete,
                 action_lim=action_lim,
+                one_hot=isinstance(self.env.observation_space, gym.spaces.Discrete),
             ).to(self.device)
 
         else:
@@ -163,9 +164,14 @@ class A2C(OnPolicyAgent):
             if isinstance(self.env.action_space, gym.spaces.Discrete):
                 actions = actions.long().flatten()
 
-            values, log_prob, entropy = self.evaluate_actions(
-                rollout.observations, actions
-            )
+            with self.autocast():
+                values, log_prob, entropy = self.evaluate_actions(
+                    rollout.observations, actions
+                )
+
+            # The losses are computed in float32, outside of autocast
+            values, log_prob = values.float(), log_prob.float()
+            entropy = entropy.float()
 
             policy_loss = rollout.advantages * log_prob
             policy_loss = -torch.mean(policy_loss)
@@ -1,10 +1,11 @@
 from abc import ABC
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Tuple, Union
 
 import numpy as np
 import torch
+from torch import nn
 
-from genrl.utils import set_seeds
+from genrl.utils import compile_step, set_seeds
 
 
 class BaseAgent(ABC):
@@ -21,6 +22,14 @@ class BaseAgent(ABC):
             of the Q-value function
         lr_policy (float): Learning rate for the policy/actor
         lr_value (float): Learning rate for the Q-value function
+        compile_update (bool or str): Whether the update step should be compiled
+            (with torch.compile, or TorchScript on older versions of torch).
+            A string selects the backend of torch.compile
+        precision (str): Precision of the forward passes. Options:
+            ["fp32" -> float32, "bf16" -> bfloat16 autocast, the weights and the
+            optimizers staying in float32]
+        bf16_buffers (bool): Whether the observations in the buffers are stored in
+            bfloat16, halving their memory
         seed (int): Seed for randomness
         render (bool): Should the env be rendered during training?
         device (str): Hardware being used for training. Options:
@@ -39,6 +48,9 @@ class BaseAgent(ABC):
         value_layers: Tuple = (64, 64),
         lr_policy: float = 0.0001,
         lr_value: float = 0.001,
+        compile_update: Union[bool, str] = False,
+        precision: str = "fp32",
+        bf16_buffers: bool = False,
         **kwargs
     ):
         self.network = network
@@ -52,6 +64,12 @@ class BaseAgent(ABC):
         self.value_layers = value_layers
         self.lr_policy = lr_policy
         self.lr_value = lr_value
+        self.compile_update = compile_update
+        self.bf16_buffers = bf16_buffers
+
+        if precision not in ["fp32", "bf16"]:
+            raise NotImplementedError
+        self.precision = precision
 
         self.seed = kwargs["seed"] if "seed" in kwargs else None
         self.render = kwargs["render"] if "render" in kwargs else False
@@ -71,6 +89,33 @@ class BaseAgent(ABC):
         """Function to initialize all models of the agent"""
         raise NotImplementedError
 
+    def _compile_update_step(self, *modules: nn.Module) -> None:
+        """Compiles the update step of the agent if compile_update is set
+
+        Args:
+            modules (:obj:`torch.nn.Module`): Networks used by the update step
+        """
+        if self.compile_update:
+            backend = "inductor" if self.compile_update is True else self.compile_update
+            self._update_step = compile_step(self._update_step, modules, backend)
+
+    def autocast(self) -> torch.autocast:
+        """Context in which the forward passes of the agent run
+
+        Autocasts to bfloat16 when the precision of the agent is "bf16", and does
+        nothing otherwise. Only the operations run inside the context are
+        autocast: the parameters, their gradients and the optimizer states stay in
+        float32, and backward passes should be run outside of it.
+
+        Returns:
+            Autocast context manager
+        """
+        return torch.autocast(
+            self.device.type,
+            dtype=torch.bfloat16,
+            enabled=self.precision == "bf16",
+        )
+
     def select_action(
         self, state: np.ndarray, deterministic: bool = False
     ) -> np.ndarray:
@@ -87,6 +132,30 @@ class BaseAgent(ABC):
         """
         raise NotImplementedError
 
+    @torch.inference_mode()
+    def act(self, state: torch.Tensor, **kwargs) -> Any:
+        """Select action given state, without tracking gradients
+
+        Runs select_action under torch.inference_mode, so that acting never builds
+        an autograd graph. This should be used whenever the agent acts on the env
+        (during rollouts, training and evaluation). The returned tensors cannot be
+        modified in place or saved for backward outside of inference mode.
+        With bf16 precision, the forward passes are autocast and floating point
+        outputs are returned in float32.
+
+        Args:
+            state (:obj:`torch.Tensor`): Current state of the environment
+            kwargs: Keyword arguments of select_action (eg. deterministic)
+
+        Returns:
+            Same as select_action
+        """
+        with self.autocast():
+            output = self.select_action(state, **kwargs)
+        if self.precision == "bf16":
+            output = _to_float32(output)
+        return output
+
     def get_hyperparams(self) -> Dict[str, Any]:
         """Get relevant hyperparameters to save
 
@@ -115,3 +184,12 @@ class BaseAgent(ABC):
     def empty_logs(self):
         """Empties logs"""
         raise NotImplementedError
+
+
+def _to_float32(output: Any) -> Any:
+    """Casts the floating point tensors of an output (or of a tuple) to float32"""
+    if isinstance(output, tuple):
+        return tuple(_to_float32(x) for x in output)
+    if isinstance(output, torch.Tensor) and output.is_floating_point():
+        return output.float()
+    return output
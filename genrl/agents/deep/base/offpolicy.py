@@ -42,9 +42,13 @@ class OffPolicyAgent(BaseAgent):
         self.replay_size = replay_size
 
         if buffer_type == "push":
-            self.replay_buffer = ReplayBuffer(self.replay_size)
+            self.replay_buffer = ReplayBuffer(
+                self.replay_size, bf16_states=self.bf16_buffers
+            )
         elif buffer_type == "prioritized":
-            self.replay_buffer = PrioritizedBuffer(self.replay_size)
+            self.replay_buffer = PrioritizedBuffer(
+                self.replay_size, bf16_states=self.bf16_buffers
+            )
         else:
             raise NotImplementedError
 
@@ -109,19 +113,65 @@ class OffPolicyAgent(BaseAgent):
             raise NotImplementedError
         return batch
 
-    def get_q_loss(self, batch: collections.namedtuple) -> torch.Tensor:
+    def sample_batches(self, n_batches: int, beta: float = None):
+        """Samples the minibatches of several successive updates
+
+        With a uniform replay buffer, the experiences of all the minibatches are
+        sampled and converted in one go, and each minibatch is a view of that block.
+        Prioritized buffers are sampled before each update since their priorities
+        change between updates.
+
+        Args:
+            n_batches (int): Number of minibatches
+            beta (float): Importance-Sampling beta for prioritized replay
+
+        Returns:
+            batches (generator of :obj:`collections.namedtuple`): Minibatches of
+                experiences
+        """
+        if not isinstance(self.replay_buffer, ReplayBuffer):
+            for _ in range(n_batches):
+                yield self.sample_from_buffer(beta)
+            return
+
+        block = self._reshape_batch(
+            self.replay_buffer.sample_block(n_batches, self.batch_size)
+        )
+        for i in range(n_batches):
+            yield ReplayBufferSamples(*[v[i] for v in block])
+
+    def get_q_and_target_values(self, batch: collections.namedtuple, **kwargs):
+        """Get Q values of a batch of experiences and their targets
+
+        Targets are computed without tracking gradients. Agents which can share
+        forward passes between the Q values and the targets override this method.
+
+        Args:
+            batch (:obj:`collections.namedtuple` of :obj:`torch.Tensor`): Batch of experiences
+            kwargs: Passed on to `get_target_q_values`
+
+        Returns:
+            q_values (:obj:`torch.Tensor`): Q values for the states and actions of the batch
+            target_q_values (:obj:`torch.Tensor`): Target Q values
+        """
+        q_values = self.get_q_values(batch.states, batch.actions)
+        with torch.no_grad():
+            target_q_values = self.get_target_q_values(
+                batch.next_states, batch.rewards, batch.dones, **kwargs
+            )
+        return q_values, target_q_values
+
+    def get_q_loss(self, batch: collections.namedtuple, **kwargs) -> torch.Tensor:
         """Normal Function to calculate the loss of the Q-function or critic
 
         Args:
             batch (:obj:`collections.namedtuple` of :obj:`torch.Tensor`): Batch of experiences
+            kwargs: Passed on to `get_target_q_values`
 
         Returns:
             loss (:obj:`torch.Tensor`): Calculated loss of the Q-function
         """
-        q_values = self.get_q_values(batch.states, batch.actions)
-        target_q_values = self.get_target_q_values(
-            batch.next_states, batch.rewards, batch.dones
-        )
+        q_values, target_q_values = self.get_q_and_target_values(batch, **kwargs)
         loss = F.mse_loss(q_values, target_q_values)
         return loss
 
@@ -154,24 +204,28 @@ class OffPolicyAgentAC(OffPolicyAgent):
         self.doublecritic = False
 
     def select_action(
-        self, state: torch.Tensor, deterministic: bool = True
+        self, state: torch.Tensor, deterministic: bool = False
     ) -> torch.Tensor:
         """Select action given state
 
         Deterministic Action Selection with Noise
 
+        The action noise (sized for the training env) is only added when exploring,
+        so deterministic actions can be selected on a batch of states of any size,
+        eg. from an evaluation env with a different number of envs.
+
         Args:
             state (:obj:`torch.Tensor`): Current state of the environment
-            deterministic (bool): Should the policy be deterministic or stochastic
+            deterministic (bool): True if no exploration noise should be added
 
         Returns:
             action (:obj:`torch.Tensor`): Action taken by the agent
         """
-        action, _ = self.ac.get_action(state, deterministic)
+        action, _ = self.ac.get_action(state, deterministic=True)
         action = action.detach()
 
         # add noise to output from policy network
-        if self.noise is not None:
+        if self.noise is not None and not deterministic:
             action += self.noise()
 
         return torch.clamp(
@@ -183,11 +237,17 @@ class OffPolicyAgentAC(OffPolicyAgent):
 
         Updates the target model with the training model's weights when called
         """
-        for param, param_target in zip(
-            self.ac.parameters(), self.ac_target.parameters()
-        ):
-            param_target.data.mul_(self.polyak)
-            param_target.data.add_((1 - self.polyak) * param.data)
+        self.target_updater.soft_update(self.polyak)
+
+    def _shares_parameters(self) -> bool:
+        """Whether the actor and the critic of the agent have parameters in common
+
+        The optimizer step of either of them then changes the outputs of the other
+        """
+        actor_params, critic_params = self.ac.get_params()
+        return not {id(param) for param in actor_params}.isdisjoint(
+            id(param) for param in critic_params
+        )
 
     def get_q_values(self, states: torch.Tensor, actions: torch.Tensor) -> torch.Tensor:
         """Get Q values corresponding to specific states and actions
@@ -222,32 +282,27 @@ class OffPolicyAgentAC(OffPolicyAgent):
             target_q_values (:obj:`torch.Tensor`): Target Q values for the TD3
         """
         next_target_actions = self.ac_target.get_action(next_states, True)[0]
+        next_inputs = torch.cat([next_states, next_target_actions], dim=-1)
 
         if self.doublecritic:
-            next_q_target_values = self.ac_target.get_value(
-                torch.cat([next_states, next_target_actions], dim=-1), mode="min"
-            )
+            next_q_target_values = self.ac_target.get_value(next_inputs, mode="min")
         else:
-            next_q_target_values = self.ac_target.get_value(
-                torch.cat([next_states, next_target_actions], dim=-1)
-            )
+            next_q_target_values = self.ac_target.get_value(next_inputs)
         target_q_values = rewards + self.gamma * (1 - dones) * next_q_target_values
 
         return target_q_values
 
-    def get_q_loss(self, batch: collections.namedtuple) -> torch.Tensor:
+    def get_q_loss(self, batch: collections.namedtuple, **kwargs) -> torch.Tensor:
         """Actor Critic Function to calculate the loss of the Q-function or critic
 
         Args:
             batch (:obj:`collections.namedtuple` of :obj:`torch.Tensor`): Batch of experiences
+            kwargs: Passed on to `get_target_q_values`
 
         Returns:
             loss (:obj:`torch.Tensor`): Calculated loss of the Q-function
         """
-        q_values = self.get_q_values(batch.states, batch.actions)
-        target_q_values = self.get_target_q_values(
-            batch.next_states, batch.rewards, batch.dones
-        )
+        q_values, target_q_values = self.get_q_and_target_values(batch, **kwargs)
         if self.doublecritic:
             loss = F.mse_loss(q_values[0], target_q_values) + F.mse_loss(
                 q_values[1], target_q_values
@@ -36,7 +36,10 @@ class OnPolicyAgent(BaseAgent):
 
         if buffer_type == "rollout":
             self.rollout = RolloutBuffer(
-                self.rollout_size, self.env, gae_lambda=gae_lambda
+                self.rollout_size,
+                self.env,
+                gae_lambda=gae_lambda,
+                bf16_observations=self.bf16_buffers,
             )
         else:
             raise NotImplementedError
@@ -45,7 +48,9 @@ class OnPolicyAgent(BaseAgent):
         """Update parameters of the model"""
         raise NotImplementedError
 
-    def collect_rewards(self, dones: torch.Tensor, timestep: int):
+    def collect_rewards(
+        self, dones: torch.Tensor, timestep: int, state: torch.Tensor = None
+    ):
         """Helper function to collect rewards
 
         Runs through all the envs and collects rewards accumulated during rollouts
@@ -53,11 +58,16 @@ class OnPolicyAgent(BaseAgent):
         Args:
             dones (:obj:`torch.Tensor`): Game over statuses of each environment
             timestep (int): Timestep during rollout
+            state (:obj:`torch.Tensor`): States of each environment. The states of
+                the environments which are reset are replaced in place by their
+                initial states
         """
         for i, done in enumerate(dones):
             if done or timestep == self.rollout_size - 1:
                 self.rewards.append(self.env.episode_reward[i].detach().clone())
-                self.env.reset_single_env(i)
+                reset_states = self.env.reset_single_env(i)
+                if state is not None:
+                    state[i] = reset_states[i]
 
     def collect_rollouts(self, state: torch.Tensor):
         """Function to collect rollouts
@@ -73,7 +83,7 @@ class OnPolicyAgent(BaseAgent):
             dones (:obj:`torch.Tensor`): Game over statuses of each environment
         """
         for i in range(self.rollout_size):
-            action, values, old_log_probs = self.select_action(state)
+            action, values, old_log_probs = self.act(state)
 
             next_state, reward, dones, _ = self.env.step(action)
 
@@ -85,12 +95,12 @@ class OnPolicyAgent(BaseAgent):
                 action.reshape(self.env.n_envs, 1),
                 reward,
                 dones,
-                values.detach(),
-                old_log_probs.detach(),
+                values,
+                old_log_probs,
             )
 
-            state = next_state
+            state = next_state.detach().clone()
 
-            self.collect_rewards(dones, i)
+            self.collect_rewards(dones, i, state)
 
         return values, dones
@@ -1,3 +1,4 @@
+import collections
 from copy import deepcopy
 from typing import Any, Dict
 
@@ -6,7 +7,7 @@ import torch.optim as opt
 
 from genrl.agents import OffPolicyAgentAC
 from genrl.core import ActionNoise
-from genrl.utils import get_env_properties, get_model, safe_mean
+from genrl.utils import TargetUpdater, get_env_properties, get_model, safe_mean
 
 
 class DDPG(OffPolicyAgentAC):
@@ -26,6 +27,7 @@ class DDPG(OffPolicyAgentAC):
         shared_layers(:obj:`tuple` of :obj:`int`): Sizes of shared layers in Actor Critic if using
         lr_policy (float): Learning rate for the policy/actor
         lr_value (float): Learning rate for the critic
+        compile_update (bool or str): Whether the update step should be compiled
         replay_size (int): Capacity of the Replay Buffer
         buffer_type (str): Choose the type of Buffer: ["push", "prioritized"]
         polyak (float): Target model update parameter (1 for hard update)
@@ -60,7 +62,9 @@ class DDPG(OffPolicyAgentAC):
             )
         if self.noise is not None:
             self.noise = self.noise(
-                torch.zeros(action_dim), self.noise_std * torch.ones(action_dim)
+                torch.zeros(action_dim),
+                self.noise_std * torch.ones(action_dim),
+                n_envs=self.env.n_envs,
             )
 
         if isinstance(self.network, str):
@@ -81,9 +85,12 @@ class DDPG(OffPolicyAgentAC):
 
         actor_params, critic_params = self.ac.get_params()
         self.ac_target = deepcopy(self.ac).to(self.device)
+        self.target_updater = TargetUpdater(self.ac, self.ac_target)
 
         self.optimizer_policy = opt.Adam(actor_params, lr=self.lr_policy)
         self.optimizer_value = opt.Adam(critic_params, lr=self.lr_value)
+        self.critic_step_first = self._shares_parameters()
+        self._compile_update_step(self.ac, self.ac_target)
 
     def update_params(self, update_interval: int) -> None:
         """Update parameters of the model
@@ -91,24 +98,57 @@ class DDPG(OffPolicyAgentAC):
         Args:
             update_interval (int): Interval between successive updates of the target model
         """
-        for timestep in range(update_interval):
-            batch = self.sample_from_buffer()
+        for batch in self.sample_batches(update_interval):
+            value_loss, policy_loss = self._update_step(batch)
+            self.logs["value_loss"].append(value_loss)
+            self.logs["policy_loss"].append(policy_loss)
 
-            value_loss = self.get_q_loss(batch)
-            self.logs["value_loss"].append(value_loss.item())
+            self.update_target_model()
+
+    def _update_step(self, batch: collections.namedtuple):
+        """Single gradient step of the actor and the critic
+
+        Compiled when the agent is created with compile_update
+
+        Args:
+            batch (:obj:`collections.namedtuple` of :obj:`torch.Tensor`): Batch of experiences
 
+        Returns:
+            value_loss (:obj:`torch.Tensor`): Detached loss of the critic
+            policy_loss (:obj:`torch.Tensor`): Detached loss of the actor
+        """
+        # Each loss is computed right before its backward pass, to keep the two
+        # passes in separate graphs when compiled. Without shared layers, the
+        # critic loss does not depend on the actor, so the critic step can follow
+        # the actor step. With shared layers, the actor step would change the
+        # critic loss, so the critic step comes first.
+        if self.critic_step_first:
+            value_loss = self._critic_step(batch)
+            policy_loss = self._actor_step(batch)
+        else:
+            policy_loss = self._actor_step(batch)
+            value_loss = self._critic_step(batch)
+        return value_loss, policy_loss
+
+    def _actor_step(self, batch: collections.namedtuple) -> torch.Tensor:
+        """Gradient step of the actor, returning its detached loss"""
+        with self.autocast():
             policy_loss = self.get_p_loss(batch.states)
-            self.logs["policy_loss"].append(policy_loss.item())
 
-            self.optimizer_policy.zero_grad()
-            policy_loss.backward()
-            self.optimizer_policy.step()
+        self.optimizer_policy.zero_grad()
+        policy_loss.backward()
+        self.optimizer_policy.step()
+        return policy_loss.detach()
 
-            self.optimizer_value.zero_grad()
-            value_loss.backward()
-            self.optimizer_value.step()
+    def _critic_step(self, batch: collections.namedtuple) -> torch.Tensor:
+        """Gradient step of the critic, returning its detached loss"""
+        with self.autocast():
+            value_loss = self.get_q_loss(batch)
 
-            self.update_target_model()
+        self.optimizer_value.zero_grad()
+        value_loss.backward()
+        self.optimizer_value.step()
+        return value_loss.detach()
 
     def get_hyperparams(self) -> Dict[str, Any]:
         """Get relevant hyperparameters to save
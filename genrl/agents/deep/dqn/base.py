@@ -1,13 +1,14 @@
+import collections
 import math
-import random
 from copy import deepcopy
 from typing import Any, Dict, List
 
+import gym
 import torch  # noqa
 import torch.optim as opt  # noqa
 
 from genrl.agents import OffPolicyAgent
-from genrl.utils import get_env_properties, get_model, safe_mean
+from genrl.utils import TargetUpdater, get_env_properties, get_model, safe_mean
 
 
 class DQN(OffPolicyAgent):
@@ -25,6 +26,7 @@ class DQN(OffPolicyAgent):
         value_layers (:obj:`tuple` of :obj:`int`): Layers in the Neural Network
             of the Q-value function
         lr_value (float): Learning rate for the Q-value function
+        compile_update (bool or str): Whether the update step should be compiled
         replay_size (int): Capacity of the Replay Buffer
         buffer_type (str): Choose the type of Buffer: ["push", "prioritized"]
         max_epsilon (str): Maximum epsilon for exploration
@@ -49,6 +51,7 @@ class DQN(OffPolicyAgent):
         self.max_epsilon = max_epsilon
         self.min_epsilon = min_epsilon
         self.epsilon_decay = epsilon_decay
+        self.timestep = 0
         self.dqn_type = ""
         self.noisy = False
 
@@ -64,36 +67,48 @@ class DQN(OffPolicyAgent):
         state_dim, action_dim, discrete, _ = get_env_properties(self.env, self.network)
         if not discrete:
             raise Exception("Only Discrete Environments are supported for DQN")
+        self.action_dim = action_dim
 
         if isinstance(self.network, str):
             self.model = get_model("v", self.network + self.dqn_type)(
-                state_dim, action_dim, "Qs", self.value_layers, **kwargs
+                state_dim,
+                action_dim,
+                "Qs",
+                self.value_layers,
+                one_hot=isinstance(self.env.observation_space, gym.spaces.Discrete),
+                **kwargs
             )
         else:
             self.model = self.network
 
         self.target_model = deepcopy(self.model)
+        self.target_updater = TargetUpdater(self.model, self.target_model)
 
         self.optimizer = opt.Adam(self.model.parameters(), lr=self.lr_value)
+        self._compile_update_step(self.model, self.target_model)
 
     def update_target_model(self) -> None:
         """Function to update the target Q model
 
         Updates the target model with the training model's weights when called
         """
-        self.target_model.load_state_dict(self.model.state_dict())
+        self.target_updater.hard_update()
 
     def update_params_before_select_action(self, timestep: int) -> None:
         """Update necessary parameters before selecting an action
 
-        This updates the epsilon (exploration rate) of the agent every timestep
+        Only the timestep is stored: the epsilon (exploration rate) of the agent is
+        computed from it when needed
 
         Args:
             timestep (int): Timestep of training
         """
         self.timestep = timestep
-        self.epsilon = self.calculate_epsilon_by_frame()
-        self.logs["epsilon"].append(self.epsilon)
+
+    @property
+    def epsilon(self) -> float:
+        """Exploration rate at the current timestep"""
+        return self.calculate_epsilon_by_frame()
 
     def get_greedy_action(self, state: torch.Tensor) -> torch.Tensor:
         """Greedy action selection
@@ -113,20 +128,26 @@ class DQN(OffPolicyAgent):
     ) -> torch.Tensor:
         """Select action given state
 
-        Epsilon-greedy action-selection
+        Epsilon-greedy action-selection, with an independent exploration draw for each
+        environment of the batch
 
         Args:
             state (:obj:`torch.Tensor`): Current state of the environment
             deterministic (bool): Should the policy be deterministic or stochastic
 
         Returns:
-            action (:obj:`torch.Tensor`): Action taken by the agent
+            action (:obj:`torch.Tensor`): Actions taken by the agent, one per environment
         """
-        action = self.get_greedy_action(state)
-        if not deterministic:
-            if random.random() < self.epsilon:
-                action = self.env.sample()
-        return action
+        n_envs = state.shape[0]
+        if deterministic:
+            return self.get_greedy_action(state).reshape(n_envs)
+
+        explore = torch.rand(n_envs) < self.epsilon
+        random_actions = torch.randint(self.action_dim, (n_envs,))
+        if explore.all():
+            return random_actions
+        action = self.get_greedy_action(state).reshape(n_envs)
+        return torch.where(explore, random_actions, action)
 
     def _reshape_batch(self, batch: List):
         """Function to reshape experiences for DQN
@@ -188,20 +209,34 @@ class DQN(OffPolicyAgent):
         """
         self.update_target_model()
 
-        for timestep in range(update_interval):
-            batch = self.sample_from_buffer()
-            loss = self.get_q_loss(batch)
-            self.logs["value_loss"].append(loss.item())
-
-            self.optimizer.zero_grad()
-            loss.backward()
-            self.optimizer.step()
+        for batch in self.sample_batches(update_interval):
+            loss = self._update_step(batch)
+            self.logs["value_loss"].append(loss)
 
             # In case the model uses Noisy layers, we must reset the noise every timestep
             if self.noisy:
                 self.model.reset_noise()
                 self.target_model.reset_noise()
 
+    def _update_step(self, batch: collections.namedtuple) -> torch.Tensor:
+        """Single gradient step of the Q-value function
+
+        Compiled when the agent is created with compile_update
+
+        Args:
+            batch (:obj:`collections.namedtuple` of :obj:`torch.Tensor`): Batch of experiences
+
+        Returns:
+            loss (:obj:`torch.Tensor`): Detached loss of the Q-value function
+        """
+        with self.autocast():
+            loss = self.get_q_loss(batch)
+
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+        return loss.detach()
+
     def calculate_epsilon_by_frame(self) -> float:
         """Helper function to calculate epsilon after every timestep
 
@@ -229,7 +264,7 @@ class DQN(OffPolicyAgent):
         }
         return hyperparams, self.model.state_dict()
 
-    def load_weights(self, weights) -> None:
+    def _load_weights(self, weights) -> None:
         """Load weights for the agent from pretrained model
 
         Args:
@@ -245,7 +280,7 @@ class DQN(OffPolicyAgent):
         """
         logs = {
             "value_loss": safe_mean(self.logs["value_loss"]),
-            "epsilon": safe_mean(self.logs["epsilon"]),
+            "epsilon": self.epsilon,
         }
         self.empty_logs()
         return logs
@@ -254,4 +289,3 @@ class DQN(OffPolicyAgent):
         """Empties logs"""
         self.logs = {}
         self.logs["value_loss"] = []
-        self.logs["epsilon"] = []
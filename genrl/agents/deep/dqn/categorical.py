@@ -10,6 +10,7 @@ from genrl.agents.deep.dqn.utils import (
     categorical_q_target,
     categorical_q_values,
 )
+from genrl.core import CategoricalProjection
 
 
 class CategoricalDQN(DQN):
@@ -58,6 +59,7 @@ class CategoricalDQN(DQN):
         self.num_atoms = num_atoms
         self.v_min = v_min
         self.v_max = v_max
+        self.projection = CategoricalProjection(v_min, v_max, num_atoms)
 
         self.dqn_type = "categorical"
         self.noisy = True
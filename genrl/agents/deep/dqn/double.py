@@ -1,7 +1,9 @@
+import collections
+
 import torch
 
 from genrl.agents.deep.dqn.base import DQN
-from genrl.agents.deep.dqn.utils import ddqn_q_target
+from genrl.agents.deep.dqn.utils import ddqn_q_target, ddqn_q_values
 
 
 class DoubleDQN(DQN):
@@ -52,3 +54,17 @@ class DoubleDQN(DQN):
             target_q_values (:obj:`torch.Tensor`): Target Q values for the DQN
         """
         return ddqn_q_target(self, next_states, rewards, dones)
+
+    def get_q_and_target_values(self, batch: collections.namedtuple):
+        """Get Q values of a batch of experiences and their Double Q-learning targets
+
+        The online model is run once on both the states and the next states
+
+        Args:
+            batch (:obj:`collections.namedtuple` of :obj:`torch.Tensor`): Batch of experiences
+
+        Returns:
+            q_values (:obj:`torch.Tensor`): Q values for the states and actions of the batch
+            target_q_values (:obj:`torch.Tensor`): Target Q values for the DQN
+        """
+        return ddqn_q_values(self, batch)
@@ -1,3 +1,4 @@
+import collections
 from typing import Any, Dict
 
 import gym
@@ -32,6 +33,7 @@ class PPO1(OnPolicyAgent):
         shared_layers(:obj:`tuple` of :obj:`int`): Sizes of shared layers in Actor Critic if using
         lr_policy (float): Learning rate for the policy/actor
         lr_value (float): Learning rate for the Q-value function
+        compile_update (bool or str): Whether the update step should be compiled
         rollout_size (int): Capacity of the Rollout Buffer
         buffer_type (str): Choose the type of Buffer: ["rollout"]
         clip_param (float): Epsilon for clipping policy loss
@@ -84,6 +86,7 @@ class PPO1(OnPolicyAgent):
                 val_typ="V",
                 discrete=discrete,
                 action_lim=action_lim,
+                one_hot=isinstance(self.env.observation_space, gym.spaces.Discrete),
                 activation=self.activation,
             ).to(self.device)
         else:
@@ -92,6 +95,7 @@ class PPO1(OnPolicyAgent):
         actor_params, critic_params = self.ac.get_params()
         self.optimizer_policy = opt.Adam(actor_params, lr=self.lr_policy)
         self.optimizer_value = opt.Adam(critic_params, lr=self.lr_value)
+        self._compile_update_step(self.ac)
 
     def select_action(
         self, state: torch.Tensor, deterministic: bool = False
@@ -161,43 +165,65 @@ class PPO1(OnPolicyAgent):
             if isinstance(self.env.action_space, gym.spaces.Discrete):
                 actions = actions.long().flatten()
 
+            policy_loss, value_loss, entropy_loss = self._update_step(rollout, actions)
+            self.logs["policy_loss"].append(policy_loss)
+            self.logs["value_loss"].append(value_loss)
+            self.logs["policy_entropy"].append(entropy_loss)
+
+    def _update_step(self, rollout: collections.namedtuple, actions: torch.Tensor):
+        """Single gradient step of the actor and the critic on a minibatch
+
+        Compiled when the agent is created with compile_update
+
+        Args:
+            rollout (:obj:`collections.namedtuple` of :obj:`torch.Tensor`): Minibatch
+                of the rollout
+            actions (:obj:`torch.Tensor`): Actions of the minibatch
+
+        Returns:
+            policy_loss (:obj:`torch.Tensor`): Detached loss of the actor
+            value_loss (:obj:`torch.Tensor`): Detached loss of the critic
+            entropy_loss (:obj:`torch.Tensor`): Detached entropy loss
+        """
+        with self.autocast():
             values, log_prob, entropy = self.evaluate_actions(
                 rollout.observations, actions
             )
 
-            advantages = rollout.advantages
-            advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
+        # The ratio and the losses are computed in float32, outside of autocast
+        values, log_prob, entropy = values.float(), log_prob.float(), entropy.float()
 
-            ratio = torch.exp(log_prob - rollout.old_log_prob)
+        advantages = rollout.advantages
+        advantages = (advantages - advantages.mean()) / (advantages.std() + 1e-8)
 
-            policy_loss_1 = advantages * ratio
-            policy_loss_2 = advantages * torch.clamp(
-                ratio, 1 - self.clip_param, 1 + self.clip_param
-            )
-            policy_loss = -torch.min(policy_loss_1, policy_loss_2).mean()
-            self.logs["policy_loss"].append(policy_loss.item())
+        ratio = torch.exp(log_prob - rollout.old_log_prob)
 
-            values = values.flatten()
+        policy_loss_1 = advantages * ratio
+        policy_loss_2 = advantages * torch.clamp(
+            ratio, 1 - self.clip_param, 1 + self.clip_param
+        )
+        policy_loss = -torch.min(policy_loss_1, policy_loss_2).mean()
 
-            value_loss = self.value_coeff * nn.functional.mse_loss(
-                rollout.returns, values.cpu()
-            )
-            self.logs["value_loss"].append(torch.mean(value_loss).item())
+        values = values.flatten()
 
-            entropy_loss = -torch.mean(entropy)  # Change this to entropy
-            self.logs["policy_entropy"].append(entropy_loss.item())
+        value_loss = self.value_coeff * nn.functional.mse_loss(
+            rollout.returns, values.cpu()
+        )
 
-            actor_loss = policy_loss + self.entropy_coeff * entropy_loss
+        entropy_loss = -torch.mean(entropy)  # Change this to entropy
 
-            self.optimizer_policy.zero_grad()
-            actor_loss.backward()
-            torch.nn.utils.clip_grad_norm_(self.ac.actor.parameters(), 0.5)
-            self.optimizer_policy.step()
+        actor_loss = policy_loss + self.entropy_coeff * entropy_loss
 
-            self.optimizer_value.zero_grad()
-            value_loss.backward()
-            torch.nn.utils.clip_grad_norm_(self.ac.critic.parameters(), 0.5)
-            self.optimizer_value.step()
+        # One backward pass gives the gradients of both losses (the parameters of a
+        # shared network get the sum of both)
+        self.optimizer_policy.zero_grad()
+        self.optimizer_value.zero_grad()
+        (actor_loss + value_loss).backward()
+        torch.nn.utils.clip_grad_norm_(self.ac.actor.parameters(), 0.5)
+        torch.nn.utils.clip_grad_norm_(self.ac.critic.parameters(), 0.5)
+        self.optimizer_policy.step()
+        self.optimizer_value.step()
+        return policy_loss.detach(), value_loss.detach(), entropy_loss.detach()
 
     def get_hyperparams(self) -> Dict[str, Any]:
         """Get relevant hyperparameters to save
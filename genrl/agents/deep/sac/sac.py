@@ -1,3 +1,4 @@
+import collections
 from copy import deepcopy
 from typing import Any, Dict, List
 
@@ -5,7 +6,13 @@ import torch
 import torch.optim as opt
 
 from genrl.agents import OffPolicyAgentAC
-from genrl.utils import get_env_properties, get_model, safe_mean
+from genrl.utils import (
+    TargetUpdater,
+    get_env_properties,
+    get_model,
+    graph_break,
+    safe_mean,
+)
 
 
 class SAC(OffPolicyAgentAC):
@@ -25,6 +32,7 @@ class SAC(OffPolicyAgentAC):
         shared_layers(:obj:`tuple` of :obj:`int`): Sizes of shared layers in Actor Critic if using
         lr_policy (float): Learning rate for the policy/actor
         lr_value (float): Learning rate for the critic
+        compile_update (bool or str): Whether the update step should be compiled
         replay_size (int): Capacity of the Replay Buffer
         buffer_type (str): Choose the type of Buffer: ["push", "prioritized"]
         alpha (str): Entropy factor
@@ -94,6 +102,7 @@ class SAC(OffPolicyAgentAC):
             self.model = self.network
 
         self.ac_target = deepcopy(self.ac)
+        self.target_updater = TargetUpdater(self.ac, self.ac_target)
         actor_params, critic_params = self.ac.get_params()
         self.optimizer_value = opt.Adam(critic_params, self.lr_value)
         self.optimizer_policy = opt.Adam(actor_params, self.lr_policy)
@@ -105,6 +114,11 @@ class SAC(OffPolicyAgentAC):
             self.log_alpha = torch.zeros(1, requires_grad=True)
             self.optimizer_alpha = opt.Adam([self.log_alpha], lr=self.lr_policy)
 
+        # The critic step changes the layers shared with the actor, so the actor
+        # pass of the policy loss then has to come after it
+        self.fused_actor_pass = not self._shares_parameters()
+        self._compile_update_step(self.ac, self.ac_target)
+
     def select_action(
         self, state: torch.Tensor, deterministic: bool = False
     ) -> torch.Tensor:
@@ -122,19 +136,13 @@ class SAC(OffPolicyAgentAC):
         action, _, _ = self.ac.get_action(state, deterministic)
         return action.detach()
 
-    def update_target_model(self) -> None:
-        """Function to update the target Q model
-
-        Updates the target model with the training model's weights when called
-        """
-        for param, param_target in zip(
-            self.ac.parameters(), self.ac_target.parameters()
-        ):
-            param_target.data.mul_(self.polyak)
-            param_target.data.add_((1 - self.polyak) * param.data)
-
     def get_target_q_values(
-        self, next_states: torch.Tensor, rewards: List[float], dones: List[bool]
+        self,
+        next_states: torch.Tensor,
+        rewards: List[float],
+        dones: List[bool],
+        next_actions: torch.Tensor = None,
+        next_log_probs: torch.Tensor = None,
     ) -> torch.Tensor:
         """Get target Q values for the SAC
 
@@ -143,30 +151,41 @@ class SAC(OffPolicyAgentAC):
                 need to be found
             rewards (:obj:`list`): Rewards at each timestep for each environment
             dones (:obj:`list`): Game over status for each environment
+            next_actions (:obj:`torch.Tensor`): Actions sampled by the policy at the
+                next states, if already computed
+            next_log_probs (:obj:`torch.Tensor`): Log probabilities of next_actions
 
         Returns:
             target_q_values (:obj:`torch.Tensor`): Target Q values for the SAC
         """
-        next_target_actions, next_log_probs, _ = self.ac.get_action(next_states)
+        if next_actions is None:
+            next_actions, next_log_probs, _ = self.ac.get_action(next_states)
         next_q_target_values = self.ac_target.get_value(
-            torch.cat([next_states, next_target_actions], dim=-1), mode="min"
+            torch.cat([next_states, next_actions], dim=-1), mode="min"
         ).squeeze() - self.alpha * next_log_probs.squeeze(1)
         target_q_values = rewards + self.gamma * (1 - dones) * next_q_target_values
         return target_q_values
 
-    def get_p_loss(self, states: torch.Tensor) -> torch.Tensor:
+    def get_p_loss(
+        self,
+        states: torch.Tensor,
+        actions: torch.Tensor = None,
+        log_probs: torch.Tensor = None,
+    ) -> torch.Tensor:
         """Function to get the Policy loss
 
         Args:
             states (:obj:`torch.Tensor`): States for which Q-values need to be found
+            actions (:obj:`torch.Tensor`): Actions sampled by the policy at the
+                states, if already computed
+            log_probs (:obj:`torch.Tensor`): Log probabilities of actions
 
         Returns:
             loss (:obj:`torch.Tensor`): Calculated policy loss
         """
-        next_best_actions, log_probs, _ = self.ac.get_action(states)
-        q_values = self.ac.get_value(
-            torch.cat([states, next_best_actions], dim=-1), mode="min"
-        )
+        if actions is None:
+            actions, log_probs, _ = self.ac.get_action(states)
+        q_values = self.ac.get_value(torch.cat([states, actions], dim=-1), mode="min")
         policy_loss = ((self.alpha * log_probs) - q_values).mean()
         return policy_loss, log_probs
 
@@ -190,31 +209,64 @@ class SAC(OffPolicyAgentAC):
         Args:
             update_interval (int): Interval between successive updates of the target model
         """
-        for timestep in range(update_interval):
-            batch = self.sample_from_buffer()
-
-            value_loss = self.get_q_loss(batch)
-            self.logs["value_loss"].append(value_loss.item())
+        for batch in self.sample_batches(update_interval):
+            value_loss, policy_loss, alpha_loss = self._update_step(batch)
+            self.logs["value_loss"].append(value_loss)
+            self.logs["policy_loss"].append(policy_loss)
+            self.logs["alpha_loss"].append(alpha_loss)
 
-            policy_loss, log_probs = self.get_p_loss(batch.states)
-            self.logs["policy_loss"].append(policy_loss.item())
+            self.update_target_model()
 
-            alpha_loss = self.get_alpha_loss(log_probs)
-            self.logs["alpha_loss"].append(alpha_loss.item())
+    def _update_step(self, batch: collections.namedtuple):
+        """Single gradient step of the critics, the actor and the entropy coefficient
 
-            self.optimizer_value.zero_grad()
-            value_loss.backward()
-            self.optimizer_value.step()
+        Compiled when the agent is created with compile_update
 
-            self.optimizer_policy.zero_grad()
-            policy_loss.backward()
-            self.optimizer_policy.step()
+        Args:
+            batch (:obj:`collections.namedtuple` of :obj:`torch.Tensor`): Batch of experiences
 
-            self.optimizer_alpha.zero_grad()
-            alpha_loss.backward()
-            self.optimizer_alpha.step()
+        Returns:
+            value_loss (:obj:`torch.Tensor`): Detached loss of the critics
+            policy_loss (:obj:`torch.Tensor`): Detached loss of the actor
+            alpha_loss (:obj:`torch.Tensor`): Detached entropy loss
+        """
+        actions = log_probs = None
+        with self.autocast():
+            if self.fused_actor_pass:
+                # A single forward pass of the actor samples the actions of both
+                # the policy loss and the targets
+                actions, log_probs, _ = self.ac.get_action(
+                    torch.cat([batch.states, batch.next_states])
+                )
+                actions, next_actions = actions.chunk(2)
+                log_probs, next_log_probs = log_probs.chunk(2)
+                # The critic and the actor are backpropagated through separately
+                graph_break()
+                value_loss = self.get_q_loss(
+                    batch,
+                    next_actions=next_actions.detach(),
+                    next_log_probs=next_log_probs.detach(),
+                )
+            else:
+                value_loss = self.get_q_loss(batch)
+
+        self.optimizer_value.zero_grad()
+        value_loss.backward()
+        self.optimizer_value.step()
+
+        # The policy loss uses the updated critics
+        with self.autocast():
+            policy_loss, log_probs = self.get_p_loss(batch.states, actions, log_probs)
+            alpha_loss = self.get_alpha_loss(log_probs)
 
-            self.update_target_model()
+        # The policy and entropy losses depend on separate parameters, so a single
+        # backward pass gives the gradients of both
+        self.optimizer_policy.zero_grad()
+        self.optimizer_alpha.zero_grad()
+        (policy_loss + alpha_loss).backward()
+        self.optimizer_policy.step()
+        self.optimizer_alpha.step()
+        return value_loss.detach(), policy_loss.detach(), alpha_loss.detach()
 
     def get_hyperparams(self) -> Dict[str, Any]:
         """Get relevant hyperparameters to save
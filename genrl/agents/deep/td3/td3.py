@@ -1,3 +1,4 @@
+import collections
 from copy import deepcopy
 from typing import Any, Dict
 
@@ -5,7 +6,7 @@ import torch
 
 from genrl.agents import OffPolicyAgentAC
 from genrl.core import ActionNoise
-from genrl.utils import get_env_properties, get_model, safe_mean
+from genrl.utils import TargetUpdater, get_env_properties, get_model, safe_mean
 
 
 class TD3(OffPolicyAgentAC):
@@ -25,6 +26,7 @@ class TD3(OffPolicyAgentAC):
         shared_layers(:obj:`tuple` of :obj:`int`): Sizes of shared layers in Actor Critic if using
         lr_policy (float): Learning rate for the policy/actor
         lr_value (float): Learning rate for the critic
+        compile_update (bool or str): Whether the update step should be compiled
         replay_size (int): Capacity of the Replay Buffer
         buffer_type (str): Choose the type of Buffer: ["push", "prioritized"]
         polyak (float): Target model update parameter (1 for hard update)
@@ -85,13 +87,17 @@ class TD3(OffPolicyAgentAC):
 
         if self.noise is not None:
             self.noise = self.noise(
-                torch.zeros(action_dim), self.noise_std * torch.ones(action_dim)
+                torch.zeros(action_dim),
+                self.noise_std * torch.ones(action_dim),
+                n_envs=self.env.n_envs,
             )
 
         self.ac_target = deepcopy(self.ac)
+        self.target_updater = TargetUpdater(self.ac, self.ac_target)
         actor_params, critic_params = self.ac.get_params()
         self.optimizer_value = torch.optim.Adam(critic_params, lr=self.lr_value)
         self.optimizer_policy = torch.optim.Adam(actor_params, lr=self.lr_policy)
+        self._compile_update_step(self.ac, self.ac_target)
 
     def update_params(self, update_interval: int) -> None:
         """Update parameters of the model
@@ -99,27 +105,48 @@ class TD3(OffPolicyAgentAC):
         Args:
             update_interval (int): Interval between successive updates of the target model
         """
-        for timestep in range(update_interval):
-            batch = self.sample_from_buffer()
+        for timestep, batch in enumerate(self.sample_batches(update_interval)):
+            # Delayed Update
+            update_policy = timestep % self.policy_frequency == 0
+            value_loss, policy_loss = self._update_step(batch, update_policy)
 
-            value_loss = self.get_q_loss(batch)
+            if update_policy:
+                self.logs["policy_loss"].append(policy_loss)
+                self.logs["value_loss"].append(value_loss)
 
-            self.optimizer_value.zero_grad()
-            value_loss.backward()
-            self.optimizer_value.step()
+                self.update_target_model()
 
-            # Delayed Update
-            if timestep % self.policy_frequency == 0:
-                policy_loss = self.get_p_loss(batch.states)
+    def _update_step(self, batch: collections.namedtuple, update_policy: bool):
+        """Single gradient step of the critics, and of the actor if update_policy
 
-                self.optimizer_policy.zero_grad()
-                policy_loss.backward()
-                self.optimizer_policy.step()
+        Compiled when the agent is created with compile_update
 
-                self.logs["policy_loss"].append(policy_loss.item())
-                self.logs["value_loss"].append(value_loss.item())
+        Args:
+            batch (:obj:`collections.namedtuple` of :obj:`torch.Tensor`): Batch of experiences
+            update_policy (bool): True if the actor should be updated too
 
-                self.update_target_model()
+        Returns:
+            value_loss (:obj:`torch.Tensor`): Detached loss of the critics
+            policy_loss (:obj:`torch.Tensor`): Detached loss of the actor, None if
+                the actor was not updated
+        """
+        with self.autocast():
+            value_loss = self.get_q_loss(batch)
+
+        self.optimizer_value.zero_grad()
+        value_loss.backward()
+        self.optimizer_value.step()
+
+        if not update_policy:
+            return value_loss.detach(), None
+
+        with self.autocast():
+            policy_loss = self.get_p_loss(batch.states)
+
+        self.optimizer_policy.zero_grad()
+        policy_loss.backward()
+        self.optimizer_policy.step()
+        return value_loss.detach(), policy_loss.detach()
 
     def get_hyperparams(self) -> Dict[str, Any]:
         """Get relevant hyperparameters to save
@@ -58,6 +58,7 @@ class VPG(OnPolicyAgent):
                 "V",
                 discrete,
                 action_lim=action_lim,
+                one_hot=isinstance(self.env.observation_space, gym.spaces.Discrete),
             ).to(self.device)
         else:
             self.actor = self.network.to(self.device)
@@ -131,7 +132,11 @@ class VPG(OnPolicyAgent):
             if isinstance(self.env.action_space, gym.spaces.Discrete):
                 actions = actions.long().flatten()
 
-            log_prob = self.get_log_probs(rollout.observations, actions)
+            with self.autocast():
+                log_prob = self.get_log_probs(rollout.observations, actions)
+
+            # The loss is computed in float32, outside of autocast
+            log_prob = log_prob.float()
 
             loss = rollout.returns * log_prob
 
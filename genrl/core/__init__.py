@@ -5,6 +5,10 @@ from genrl.core.buffers import PrioritizedBuffer  # noqa
 from genrl.core.buffers import PrioritizedReplayBufferSamples  # noqa
 from genrl.core.buffers import ReplayBuffer  # noqa
 from genrl.core.buffers import ReplayBufferSamples  # noqa
+from genrl.core.distributional import CategoricalProjection  # noqa
+from genrl.core.distributional import QuantileProjection  # noqa
+from genrl.core.encoders import OneHotLinear  # noqa
+from genrl.core.ensemble import EnsembleLinear  # noqa
 from genrl.core.noise import ActionNoise  # noqa
 from genrl.core.noise import NoisyLinear  # noqa
 from genrl.core.noise import NormalActionNoise  # noqa
@@ -15,6 +19,9 @@ from genrl.core.policies import (  # noqa
     MlpPolicy,
     get_policy_from_name,
 )
+from genrl.core.quantization import export_quantized_agent  # noqa
+from genrl.core.quantization import quantize_dynamic_network  # noqa
+from genrl.core.quantization import quantize_static_encoders  # noqa
 from genrl.core.rollout_storage import RolloutBuffer  # noqa
 from genrl.core.values import (  # noqa
     BaseValue,
@@ -24,6 +31,7 @@ from genrl.core.values import (  # noqa
     CnnValue,
     MlpCategoricalValue,
     MlpDuelingValue,
+    MlpEnsembleValue,
     MlpNoisyValue,
     MlpValue,
     get_value_from_name,
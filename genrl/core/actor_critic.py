@@ -7,7 +7,7 @@ from torch.distributions import Categorical, Normal
 
 from genrl.core.base import BaseActorCritic
 from genrl.core.policies import MlpPolicy
-from genrl.core.values import MlpValue
+from genrl.core.values import MlpEnsembleValue, MlpValue
 from genrl.utils.utils import cnn, mlp
 
 
@@ -21,6 +21,7 @@ class MlpActorCritic(BaseActorCritic):
         value_layers (:obj:`list` or :obj:`tuple`): Hidden layers in the value MLP
         val_type (str): Value type of the critic network
         discrete (bool): True if the action space is discrete, else False
+        one_hot (bool): True if the observations are discrete and given as indices
         sac (bool): True if a SAC-like network is needed, else False
         activation (str): Activation function to be used. Can be either "tanh" or "relu"
     """
@@ -58,6 +59,7 @@ class MlpSharedActorCritic(BaseActorCritic):
         value_layers (:obj:`list` or :obj:`tuple`): Hidden layers in the value MLP
         val_type (str): Value type of the critic network
         discrete (bool): True if the action space is discrete, else False
+        one_hot (bool): True if the observations are discrete and given as indices
         sac (bool): True if a SAC-like network is needed, else False
         activation (str): Activation function to be used. Can be either "tanh" or "relu"
     """
@@ -71,10 +73,11 @@ class MlpSharedActorCritic(BaseActorCritic):
         value_layers: Tuple = (32, 32),
         val_type: str = "V",
         discrete: bool = True,
+        one_hot: bool = False,
         **kwargs,
     ):
         super(MlpSharedActorCritic, self).__init__()
-        self.shared_network = mlp([state_dim] + list(shared_layers))
+        self.shared_network = mlp([state_dim] + list(shared_layers), one_hot=one_hot)
         self.actor = MlpPolicy(
             shared_layers[-1], action_dim, policy_layers, discrete, **kwargs
         )
@@ -166,6 +169,9 @@ class MlpSharedActorCritic(BaseActorCritic):
 class MlpSingleActorTwoCritic(BaseActorCritic):
     """MLP Actor Critic
 
+    The critics are the members of an ensemble (two by default), whose layers are
+    evaluated together as batched matmuls.
+
     Attributes:
         state_dim (int): State dimensions of the environment
         action_dim (int): Action space dimensions of the environment
@@ -194,23 +200,41 @@ class MlpSingleActorTwoCritic(BaseActorCritic):
         self.num_critics = num_critics
 
         self.actor = MlpPolicy(state_dim, action_dim, policy_layers, discrete, **kwargs)
-        self.critic1 = MlpValue(state_dim, action_dim, "Qsa", value_layers, **kwargs)
-        self.critic2 = MlpValue(state_dim, action_dim, "Qsa", value_layers, **kwargs)
+        self.critics = MlpEnsembleValue(
+            state_dim, action_dim, "Qsa", value_layers, num_critics, **kwargs
+        )
 
         self.action_scale = kwargs["action_scale"] if "action_scale" in kwargs else 1
         self.action_bias = kwargs["action_bias"] if "action_bias" in kwargs else 0
 
     def get_params(self):
         actor_params = self.actor.parameters()
-        critic_params = list(self.critic1.parameters()) + list(
-            self.critic2.parameters()
-        )
+        critic_params = self.critics.parameters()
         return actor_params, critic_params
 
     def forward(self, x):
-        q1_values = self.critic1(x).squeeze(-1)
-        q2_values = self.critic2(x).squeeze(-1)
-        return (q1_values, q2_values)
+        values = self.critics(x).squeeze(-1)
+        return tuple(values)
+
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        # Weights of separate critics (critic1, critic2, ...) are stacked into the
+        # ensemble, so that older checkpoints can still be loaded
+        old_prefix = prefix + "critic1."
+        for key in [k for k in state_dict if k.startswith(old_prefix)]:
+            name = key[len(old_prefix) :]
+            members = [
+                state_dict.pop("{}critic{}.{}".format(prefix, i + 1, name))
+                for i in range(self.num_critics)
+            ]
+            if name.endswith("weight"):
+                members = [weight.t() for weight in members]
+            else:
+                members = [bias.unsqueeze(0) for bias in members]
+            state_dict[prefix + "critics." + name] = torch.stack(members)
+
+        super(MlpSingleActorTwoCritic, self)._load_from_state_dict(
+            state_dict, prefix, *args, **kwargs
+        )
 
     def get_action(self, state: torch.Tensor, deterministic: bool = False):
         """Get Actions from the actor
@@ -257,8 +281,8 @@ class MlpSingleActorTwoCritic(BaseActorCritic):
         Arg:
             state (:obj:`torch.Tensor`): The state(s) being passed to the critics
             mode (str): What values should be returned. Types:
-                "both" --> Both values will be returned
-                "min" --> The minimum of both values will be returned
+                "both" --> The values of all the critics will be returned
+                "min" --> The minimum of the values will be returned
                 "first" --> The value from the first critic only will be returned
 
         Returns:
@@ -269,10 +293,11 @@ class MlpSingleActorTwoCritic(BaseActorCritic):
         if mode == "both":
             values = self.forward(state)
         elif mode == "min":
-            values = self.forward(state)
-            values = torch.min(*values).squeeze(-1)
+            values = self.critics(state).squeeze(-1)
+            values = values.min(dim=0)[0].squeeze(-1)
         elif mode == "first":
-            values = self.critic1(state)
+            # Only the first member of the ensemble is evaluated
+            values = self.critics(state, n_members=1)[0]
         else:
             raise KeyError("Mode doesn't exist")
 
@@ -324,10 +349,8 @@ class MlpSharedSingleActorTwoCritic(MlpSingleActorTwoCritic):
         actor_params = list(self.shared_network.parameters()) + list(
             self.actor.parameters()
         )
-        critic_params = (
-            list(self.shared_network.parameters())
-            + list(self.critic1.parameters())
-            + list(self.critic2.parameters())
+        critic_params = list(self.shared_network.parameters()) + list(
+            self.critics.parameters()
         )
         return actor_params, critic_params
 
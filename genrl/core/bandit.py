@@ -43,6 +43,21 @@ class BanditAgent(ABC):
             int: The action to take
         """
 
+    @torch.inference_mode()
+    def act(self, context: torch.Tensor) -> int:
+        """Select an action based on given context, without tracking gradients
+
+        Runs select_action under torch.inference_mode, so that acting never
+        builds an autograd graph.
+
+        Args:
+            context (torch.Tensor): The context vector to select action for
+
+        Returns:
+            int: The action to take
+        """
+        return self.select_action(context)
+
 
 class MultiArmedBandit(Bandit):
     """
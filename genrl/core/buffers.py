@@ -1,6 +1,6 @@
 import random
 from collections import deque
-from typing import NamedTuple, Tuple
+from typing import List, NamedTuple, Tuple
 
 import numpy as np
 import torch
@@ -29,11 +29,14 @@ class ReplayBuffer:
     Implements the basic Experience Replay Mechanism
 
     :param capacity: Size of the replay buffer
+    :param bf16_states: Whether floating point states are stored in bfloat16
     :type capacity: int
+    :type bf16_states: bool
     """
 
-    def __init__(self, capacity: int):
+    def __init__(self, capacity: int, bf16_states: bool = False):
         self.capacity = capacity
+        self.bf16_states = bf16_states
         self.memory = deque([], maxlen=capacity)
 
     def push(self, inp: Tuple) -> None:
@@ -44,6 +47,8 @@ class ReplayBuffer:
         :type inp: tuple
         :returns: None
         """
+        if self.bf16_states:
+            inp = compress_states(inp)
         self.memory.append(inp)
 
     def sample(
@@ -58,19 +63,41 @@ class ReplayBuffer:
         `next_state` and `done`)
         """
         batch = random.sample(self.memory, batch_size)
-        state, action, reward, next_state, done = map(np.stack, zip(*batch))
+        state, action, reward, next_state, done = stack_transitions(batch)
         return [
-            torch.from_numpy(v).float()
+            decompress(v, self.bf16_states)
             for v in [state, action, reward, next_state, done]
         ]
 
+    def sample_block(self, n_batches: int, batch_size: int) -> List[torch.Tensor]:
+        """
+        Returns randomly sampled experiences for several minibatches at once
+
+        The indices of all the minibatches are drawn in a single call and the
+        experiences are stacked into one block per element, whose first dimension
+        indexes the minibatches. Indices are drawn with replacement.
+
+        :param n_batches: Number of minibatches
+        :param batch_size: Number of samples per minibatch
+        :type n_batches: int
+        :type batch_size: int
+        :returns: (List of `state`, `action`, `reward`, `next_state` and `done`
+            blocks of shape (n_batches, batch_size, ...))
+        """
+        indices = np.random.randint(len(self.memory), size=n_batches * batch_size)
+        batch = [self.memory[i] for i in indices]
+        return [
+            decompress(v, self.bf16_states).view(n_batches, batch_size, *v.shape[1:])
+            for v in stack_transitions(batch)
+        ]
+
     def __len__(self) -> int:
         """
         Gives number of experiences in buffer currently
 
         :returns: Length of replay memory
         """
-        return self.pos
+        return len(self.memory)
 
 
 class PrioritizedBuffer:
@@ -79,14 +106,23 @@ class PrioritizedBuffer:
 
     :param capacity: Size of the replay buffer
     :param alpha: Level of prioritization
+    :param bf16_states: Whether floating point states are stored in bfloat16
     :type capacity: int
     :type alpha: int
+    :type bf16_states: bool
     """
 
-    def __init__(self, capacity: int, alpha: float = 0.6, beta: float = 0.4):
+    def __init__(
+        self,
+        capacity: int,
+        alpha: float = 0.6,
+        beta: float = 0.4,
+        bf16_states: bool = False,
+    ):
         self.alpha = alpha
         self.beta = beta
         self.capacity = capacity
+        self.bf16_states = bf16_states
         self.buffer = deque([], maxlen=capacity)
         self.priorities = deque([], maxlen=capacity)
 
@@ -100,6 +136,8 @@ class PrioritizedBuffer:
                 :returns: None
         """
         max_priority = max(self.priorities) if self.priorities else 1.0
+        if self.bf16_states:
+            inp = compress_states(inp)
         self.buffer.append(inp)
         self.priorities.append(max_priority)
 
@@ -142,10 +180,10 @@ class PrioritizedBuffer:
         weights = np.asarray(weights, dtype=np.float32)
 
         samples = [self.buffer[i] for i in indices]
-        (states, actions, rewards, next_states, dones) = map(np.stack, zip(*samples))
+        (states, actions, rewards, next_states, dones) = stack_transitions(samples)
 
         return [
-            torch.as_tensor(v, dtype=torch.float32)
+            decompress(np.asarray(v), self.bf16_states)
             for v in [
                 states,
                 actions,
@@ -181,3 +219,73 @@ class PrioritizedBuffer:
     @property
     def pos(self):
         return len(self.buffer)
+
+
+def stack_transitions(transitions: List[Tuple]) -> List[np.ndarray]:
+    """
+    Stacks sampled transitions into one array per element of the transitions
+
+    Lazily stored elements (such as genrl.environments.LazyFrames), recognised by
+    their stack(batch, cache) static method, are decoded as a batch, and frames
+    shared between them (eg. the overlapping frames of states and next states) are
+    decoded once.
+
+    :param transitions: Sampled transitions
+    :type transitions: list
+    :returns: Batched elements of the transitions
+    :rtype: list
+    """
+    cache = {}
+    return [
+        type(column[0]).stack(column, cache)
+        if _is_lazy(column[0])
+        else np.stack(column)
+        for column in zip(*transitions)
+    ]
+
+
+def compress_states(transition: Tuple) -> Tuple:
+    """
+    Stores the floating point states and next states of a transition in bfloat16
+
+    Numpy has no bfloat16 type, so the bfloat16 values are kept as their int16 bit
+    patterns, which stack like any other array and are decoded by decompress
+
+    :param transition: Tuple containing state, action, reward, next_state and done
+    :type transition: tuple
+    :returns: Transition with compressed states
+    :rtype: tuple
+    """
+    state, action, reward, next_state, done = transition
+    return (_to_bf16_bits(state), action, reward, _to_bf16_bits(next_state), done)
+
+
+def _is_lazy(x) -> bool:
+    return callable(getattr(type(x), "stack", None))
+
+
+def _to_bf16_bits(x):
+    if _is_lazy(x):
+        return x
+    x = torch.as_tensor(x)
+    if not x.is_floating_point():
+        return x
+    return x.to(torch.bfloat16).view(torch.int16)
+
+
+def decompress(array: np.ndarray, bf16: bool = False) -> torch.Tensor:
+    """
+    Converts a stacked array of transitions to a float32 tensor
+
+    :param array: Stacked elements of transitions
+    :param bf16: Whether int16 arrays are bit patterns written by compress_states,
+        to be decoded as bfloat16
+    :type array: np.ndarray
+    :type bf16: bool
+    :returns: Float32 tensor
+    :rtype: torch.Tensor
+    """
+    tensor = torch.from_numpy(array)
+    if bf16 and tensor.dtype == torch.int16:
+        tensor = tensor.view(torch.bfloat16)
+    return tensor.float()
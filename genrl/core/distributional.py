@@ -0,0 +1,148 @@
+import torch
+from torch import nn
+from torch.nn import functional as F
+
+
+class CategoricalProjection(nn.Module):
+    """Projection of distributional Bellman targets onto a fixed categorical support
+
+    The support (and the spacing of its atoms) is computed once and kept as a
+    registered buffer, so that it follows the module across devices and is never
+    rebuilt when acting or computing targets. All methods take distributions of any
+    batch shape (..., num_atoms).
+
+    Paper: https://arxiv.org/pdf/1707.06887.pdf
+
+    Args:
+        v_min (float): Lower bound of the support
+        v_max (float): Upper bound of the support
+        num_atoms (int): Number of atoms of the support
+    """
+
+    def __init__(self, v_min: float, v_max: float, num_atoms: int = 51):
+        super(CategoricalProjection, self).__init__()
+        self.v_min = v_min
+        self.v_max = v_max
+        self.num_atoms = num_atoms
+        self.delta_z = (v_max - v_min) / (num_atoms - 1)
+        self.register_buffer("support", torch.linspace(v_min, v_max, num_atoms))
+
+    def expected_value(self, dist: torch.Tensor) -> torch.Tensor:
+        """Expected values of categorical distributions over the support
+
+        Args:
+            dist (:obj:`torch.Tensor`): Probabilities of shape (..., num_atoms)
+
+        Returns:
+            Expected values of shape (...)
+        """
+        return dist @ self.support
+
+    def forward(
+        self,
+        next_dist: torch.Tensor,
+        rewards: torch.Tensor,
+        dones: torch.Tensor,
+        gamma: float,
+    ) -> torch.Tensor:
+        """Projects the distributions of r + gamma * (1 - done) * Z' onto the support
+
+        The probability of each shifted atom is split between its two neighbouring
+        atoms of the support, in a single scatter.
+
+        Args:
+            next_dist (:obj:`torch.Tensor`): Probabilities of the next state-action
+                values, of shape (..., num_atoms)
+            rewards (:obj:`torch.Tensor`): Rewards of shape (...)
+            dones (:obj:`torch.Tensor`): Game over statuses of shape (...)
+            gamma (float): Discount factor
+
+        Returns:
+            Projected probabilities of shape (..., num_atoms)
+        """
+        rewards, dones = rewards.unsqueeze(-1), dones.unsqueeze(-1)
+        tz = rewards + gamma * (1 - dones) * self.support
+        bz = (tz.clamp(self.v_min, self.v_max) - self.v_min) / self.delta_z
+
+        # Lower atom, such that the upper one (lower + 1) is still in the support
+        lower = bz.floor().clamp(max=self.num_atoms - 2)
+        upper_weight = bz - lower
+        index = torch.cat([lower, lower + 1], dim=-1).long()
+        weights = torch.cat(
+            [next_dist * (1 - upper_weight), next_dist * upper_weight], dim=-1
+        )
+        return torch.zeros_like(next_dist).scatter_add_(-1, index, weights)
+
+
+class QuantileProjection(nn.Module):
+    """Quantile regression targets and loss for quantile distributional RL (QR-DQN)
+
+    The quantile midpoints are computed once and kept as a registered buffer. All
+    methods take quantiles of any batch shape (..., num_quantiles).
+
+    Paper: https://arxiv.org/pdf/1710.10044.pdf
+
+    Args:
+        num_quantiles (int): Number of quantiles
+        kappa (float): Threshold of the Huber loss
+    """
+
+    def __init__(self, num_quantiles: int = 200, kappa: float = 1.0):
+        super(QuantileProjection, self).__init__()
+        self.num_quantiles = num_quantiles
+        self.kappa = kappa
+        taus = (torch.arange(num_quantiles, dtype=torch.float32) + 0.5) / num_quantiles
+        self.register_buffer("taus", taus)
+
+    def expected_value(self, quantiles: torch.Tensor) -> torch.Tensor:
+        """Expected values of distributions given by their quantiles
+
+        Args:
+            quantiles (:obj:`torch.Tensor`): Quantiles of shape (..., num_quantiles)
+
+        Returns:
+            Expected values of shape (...)
+        """
+        return quantiles.mean(-1)
+
+    def forward(
+        self,
+        next_quantiles: torch.Tensor,
+        rewards: torch.Tensor,
+        dones: torch.Tensor,
+        gamma: float,
+    ) -> torch.Tensor:
+        """Target quantiles r + gamma * (1 - done) * Z'
+
+        Args:
+            next_quantiles (:obj:`torch.Tensor`): Quantiles of the next state-action
+                values, of shape (..., num_quantiles)
+            rewards (:obj:`torch.Tensor`): Rewards of shape (...)
+            dones (:obj:`torch.Tensor`): Game over statuses of shape (...)
+            gamma (float): Discount factor
+
+        Returns:
+            Target quantiles of shape (..., num_quantiles)
+        """
+        discount = gamma * (1 - dones.unsqueeze(-1))
+        return torch.addcmul(rewards.unsqueeze(-1), discount, next_quantiles)
+
+    def loss(self, quantiles: torch.Tensor, target_quantiles: torch.Tensor):
+        """Quantile Huber loss between predicted and target quantiles
+
+        Args:
+            quantiles (:obj:`torch.Tensor`): Predicted quantiles of shape
+                (..., num_quantiles)
+            target_quantiles (:obj:`torch.Tensor`): Target quantiles of shape
+                (..., num_quantiles), considered constant
+
+        Returns:
+            Mean loss over the batch
+        """
+        # Pairwise errors of shape (..., num_quantiles (target), num_quantiles)
+        errors = target_quantiles.detach().unsqueeze(-1) - quantiles.unsqueeze(-2)
+        huber = F.huber_loss(
+            errors, torch.zeros_like(errors), reduction="none", delta=self.kappa
+        )
+        weights = (self.taus - (errors.detach() < 0).float()).abs()
+        return (weights * huber / self.kappa).sum(-1).mean(-1).mean()
@@ -0,0 +1,37 @@
+import torch
+from torch import nn
+from torch.nn import functional as F
+
+
+class OneHotLinear(nn.Linear):
+    """Linear input layer taking discrete observations as indices
+
+    Discrete observations are passed around (in the environments and the buffers)
+    as a single index of shape (..., 1). The layer treats them as one-hot vectors
+    of size in_features, without building them: the product of a one-hot vector
+    with the weights is the column of the index, so the layer is an embedding
+    lookup. It is the first layer of the MLPs built with one_hot=True, which the
+    agents do when their environment has a Discrete observation space.
+
+    Args:
+        in_features (int): Size of the input (number of discrete observations)
+        out_features (int): Size of the output
+        bias (bool): Whether the layer has a bias
+    """
+
+    def forward(self, inp: torch.Tensor) -> torch.Tensor:
+        return self.embed(inp.squeeze(-1).long())
+
+    def embed(self, indices: torch.Tensor) -> torch.Tensor:
+        """Output of the layer for one-hot inputs given by their indices
+
+        Args:
+            indices (:obj:`torch.Tensor`): Indices of any shape
+
+        Returns:
+            Output of shape (*indices.shape, out_features)
+        """
+        out = F.embedding(indices, self.weight.t())
+        if self.bias is not None:
+            out = out + self.bias
+        return out
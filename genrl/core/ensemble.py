@@ -0,0 +1,74 @@
+import math
+from typing import List
+
+import torch
+from torch import nn
+
+
+class EnsembleLinear(nn.Module):
+    """Linear layers of an ensemble of networks, evaluated as one batched matmul
+
+    The weights of the members are stacked in a single parameter of shape
+    (n_members, in_features, out_features), so that the whole ensemble is evaluated
+    by one torch.baddbmm call instead of one linear layer per member. Each member is
+    initialised like an nn.Linear layer. Inputs for fewer members than n_members
+    are evaluated by the first members only.
+
+    Args:
+        n_members (int): Number of members of the ensemble
+        in_features (int): Size of the input of each member
+        out_features (int): Size of the output of each member
+        bias (bool): Whether the layers have a bias
+    """
+
+    def __init__(
+        self, n_members: int, in_features: int, out_features: int, bias: bool = True
+    ):
+        super(EnsembleLinear, self).__init__()
+        self.n_members = n_members
+        self.in_features = in_features
+        self.out_features = out_features
+
+        self.weight = nn.Parameter(torch.empty(n_members, in_features, out_features))
+        if bias:
+            self.bias = nn.Parameter(torch.empty(n_members, 1, out_features))
+        else:
+            self.register_parameter("bias", None)
+        self.reset_parameters()
+
+    def reset_parameters(self) -> None:
+        bound = 1 / math.sqrt(self.in_features)
+        nn.init.uniform_(self.weight, -bound, bound)
+        if self.bias is not None:
+            nn.init.uniform_(self.bias, -bound, bound)
+
+    def forward(self, inp: torch.Tensor) -> torch.Tensor:
+        """Output of every member for its own input
+
+        Args:
+            inp (:obj:`torch.Tensor`): Inputs of shape (n, ..., in_features) of the
+                first n members, n being at most n_members. An input shared by the
+                members can be given as an expanded view
+
+        Returns:
+            Outputs of shape (n, ..., out_features)
+        """
+        n_members = inp.shape[0]
+        # The shape is built as a list, without unpacking, so that the layer can
+        # be scripted with TorchScript
+        shape: List[int] = [n_members]
+        shape.extend(inp.shape[1:-1])
+        shape.append(self.out_features)
+
+        inp = inp.reshape(n_members, -1, self.in_features)
+        weight = self.weight[:n_members]
+        if self.bias is None:
+            out = torch.bmm(inp, weight)
+        else:
+            out = torch.baddbmm(self.bias[:n_members], inp, weight)
+        return out.view(shape)
+
+    def extra_repr(self) -> str:
+        return "n_members={}, in_features={}, out_features={}, bias={}".format(
+            self.n_members, self.in_features, self.out_features, self.bias is not None
+        )
@@ -1,5 +1,6 @@
 import math
 from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
 
 import torch  # noqa
 import torch.nn as nn  # noqa
@@ -9,30 +10,85 @@ class ActionNoise(ABC):
     """
     Base class for Action Noise
 
+    The noise has an independent state for each environment: a call returns noise
+    of shape (n_envs, *mean.shape). Random numbers are drawn in blocks of
+    block_size steps, so that a call does not need its own RNG call.
+
     :param mean: Mean of noise distribution
     :param std: Standard deviation of noise distribution
-    :type mean: float
-    :type std: float
+    :param n_envs: Number of environments
+    :param block_size: Number of steps of noise drawn at once
+    :type mean: torch.Tensor
+    :type std: torch.Tensor
+    :type n_envs: int
+    :type block_size: int
     """
 
-    def __init__(self, mean: float, std: float):
-        # super().__init__(mean, std)
-        self._mean = mean
-        self._std = std
+    def __init__(
+        self,
+        mean: torch.Tensor,
+        std: torch.Tensor,
+        n_envs: int = 1,
+        block_size: int = 1024,
+    ):
+        self._mean = torch.as_tensor(mean, dtype=torch.float32)
+        self._std = torch.as_tensor(std, dtype=torch.float32)
+        self.n_envs = n_envs
+        self.block_size = block_size
+        self._block = None
+        self._index = block_size
 
     @abstractmethod
-    def __call__(self) -> None:
+    def __call__(self) -> torch.Tensor:
         raise NotImplementedError
 
+    def _scale_block(self, block: torch.Tensor) -> torch.Tensor:
+        """
+        Scales a block of standard normal samples in place
+
+        :param block: Samples of shape (block_size, n_envs, *mean.shape)
+        :type block: torch.Tensor
+        :returns: Noise samples (or increments) for block_size steps
+        :rtype: torch.Tensor
+        """
+        return block
+
+    def _next_sample(self) -> torch.Tensor:
+        """
+        Returns the samples of the next step, drawing a new block when needed
+        """
+        if self._index >= self.block_size:
+            self._block = self._scale_block(torch.randn(self.block_size, *self.shape))
+            self._index = 0
+        sample = self._block[self._index]
+        self._index += 1
+        return sample
+
+    def reset(self, env_ids: Optional[List[int]] = None) -> None:
+        """
+        Resets the state of the noise
+
+        :param env_ids: Environments whose noise should be reset. None resets all
+        :type env_ids: list
+        """
+        pass
+
     @property
-    def mean(self) -> float:
+    def shape(self) -> Tuple[int, ...]:
+        """
+        Returns the shape of the noise returned by a call
+        """
+        return (self.n_envs, *self._mean.shape)
+
+    @property
+    def mean(self) -> torch.Tensor:
         """
         Returns mean of noise distribution
         """
         return self._mean
 
     @property
-    def std(self) -> float:
+    def std(self) -> torch.Tensor:
         """
         Returns standard deviation of noise distribution
         """
@@ -45,21 +101,28 @@ class NormalActionNoise(ActionNoise):
 
     :param mean: Mean of noise distribution
     :param std: Standard deviation of noise distribution
-    :type mean: float
-    :type std: float
+    :param n_envs: Number of environments
+    :param block_size: Number of steps of noise drawn at once
+    :type mean: torch.Tensor
+    :type std: torch.Tensor
+    :type n_envs: int
+    :type block_size: int
     """
 
-    def __init__(self, mean: float, std: float):
-        super(NormalActionNoise, self).__init__(mean, std)
+    def __init__(self, *args, **kwargs):
+        super(NormalActionNoise, self).__init__(*args, **kwargs)
+
+    def _scale_block(self, block: torch.Tensor) -> torch.Tensor:
+        return block.mul_(self._std).add_(self._mean)
 
-    def __call__(self) -> float:
+    def __call__(self) -> torch.Tensor:
         """
         Return action noise randomly sampled from noise distribution
-        """
-        return torch.normal(self._mean, self._std)
 
-    def reset(self) -> None:
-        pass
+        :returns: Noise of shape (n_envs, *mean.shape)
+        :rtype: torch.Tensor
+        """
+        return self._next_sample()
 
 
 class OrnsteinUhlenbeckActionNoise(ActionNoise):
@@ -71,52 +134,67 @@ class OrnsteinUhlenbeckActionNoise(ActionNoise):
     :param theta: Parameter used to solve the Ornstein Uhlenbeck process
     :param dt: Small parameter used to solve the Ornstein Uhlenbeck process
     :param initial_noise: Initial noise distribution
-    :type mean: float
-    :type std: float
+    :param n_envs: Number of environments
+    :param block_size: Number of steps of noise drawn at once
+    :type mean: torch.Tensor
+    :type std: torch.Tensor
     :type theta: float
     :type dt: float
     :type initial_noise: torch.Tensor
+    :type n_envs: int
+    :type block_size: int
     """
 
     def __init__(
         self,
-        mean: float,
-        std: float,
+        mean: torch.Tensor,
+        std: torch.Tensor,
         theta: float = 0.15,
         dt: float = 1e-2,
         initial_noise: torch.Tensor = None,
+        n_envs: int = 1,
+        block_size: int = 1024,
     ):
-        super(OrnsteinUhlenbeckActionNoise, self).__init__(mean, std)
+        super(OrnsteinUhlenbeckActionNoise, self).__init__(
+            mean, std, n_envs, block_size
+        )
         self._theta = theta
-        self._mean = mean
-        self._std = std
         self._dt = dt
         self._initial_noise = initial_noise
-        self.noise_prev = None
+        self.noise_prev = torch.zeros(self.shape)
         self.reset()
 
-    def __call__(self) -> float:
+    def _scale_block(self, block: torch.Tensor) -> torch.Tensor:
+        # x' = x + theta * (mean - x) * dt + std * sqrt(dt) * N(0, 1) is computed as
+        # x' = (1 - theta * dt) * x + increment, with the constant part in increment
+        return block.mul_(self._std * math.sqrt(self._dt)).add_(
+            self._mean * self._theta * self._dt
+        )
+
+    def __call__(self) -> torch.Tensor:
         """
                 (Return action noise randomly sampled from noise distribution
         according to the Ornstein Uhlenbeck process)
+
+        :returns: Noise of shape (n_envs, *mean.shape)
+        :rtype: torch.Tensor
         """
-        noise = (
-            self.noise_prev
-            + self._theta * (self._mean - self.noise_prev) * self._dt
-            + (self._std * math.sqrt(self._dt) * torch.randn(self._mean.shape))
-        )
-        self.noise_prev = noise
-        return noise
+        self.noise_prev.mul_(1 - self._theta * self._dt).add_(self._next_sample())
+        return self.noise_prev.clone()
 
-    def reset(self) -> None:
+    def reset(self, env_ids: Optional[List[int]] = None) -> None:
         """
         Reset the initial noise value for the noise distribution sampling
+
+        :param env_ids: Environments whose noise should be reset. None resets all
+        :type env_ids: list
         """
-        self.noise_prev = (
-            self._initial_noise
-            if self._initial_noise is not None
-            else torch.zeros(self._mean.shape)
-        )
+        if env_ids is None:
+            env_ids = slice(None)
+        if self._initial_noise is not None:
+            self.noise_prev[env_ids] = self._initial_noise
+        else:
+            self.noise_prev[env_ids] = 0
 
 
 class NoisyLinear(nn.Module):
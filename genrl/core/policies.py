@@ -33,11 +33,13 @@ class MlpPolicy(BasePolicy):
             state_dim, action_dim, hidden, discrete, **kwargs
         )
         self.activation = kwargs["activation"] if "activation" in kwargs else "relu"
+        self.one_hot = kwargs["one_hot"] if "one_hot" in kwargs else False
 
         self.model = mlp(
             [state_dim] + list(hidden) + [action_dim],
             activation=self.activation,
             sac=self.sac,
+            one_hot=self.one_hot,
         )
 
 
@@ -0,0 +1,209 @@
+import copy
+from typing import Any, Callable, List, Optional
+
+import torch
+from torch import nn
+from torch.ao import quantization
+
+# Networks of the agents which are used to act
+ACTING_NETWORKS = ("model", "ac", "actor")
+
+
+def quantize_dynamic_network(network: nn.Module, min_weight_size: int = 0) -> nn.Module:
+    """Copy of a network whose linear layers are dynamically quantized to int8
+
+    The weights of the quantized layers are stored in int8 and their activations
+    are quantized on the fly, so no calibration is needed. On CPU, int8 layers are
+    only faster than float32 ones for large weights: on small layers the cost of
+    quantizing the activations dominates. Layers with fewer than min_weight_size
+    weights can thus be kept in float32 (from about 2 ** 19 weights, int8 layers
+    are faster at a batch size of 1). OneHotLinear input layers, which are
+    embedding lookups of discrete observations, are kept in float32.
+
+    Args:
+        network (:obj:`torch.nn.Module`): Network to quantize
+        min_weight_size (int): Minimum number of weights of the quantized layers.
+            Every linear layer is quantized by default
+
+    Returns:
+        Quantized copy of the network, in eval mode
+    """
+    network = copy.deepcopy(network).eval()
+    layers = {
+        name
+        for name, module in network.named_modules()
+        if type(module) is nn.Linear and module.weight.numel() >= min_weight_size
+    }
+    if not layers:
+        return network
+    return quantization.quantize_dynamic(network, layers, dtype=torch.qint8)
+
+
+def quantize_static_encoders(
+    network: nn.Module,
+    calibrate: Callable[[], Any],
+    backend: Optional[str] = None,
+) -> nn.Module:
+    """Statically quantizes the convolutional encoders of a network in place
+
+    Convolutional encoders (nn.Sequential blocks of convolutions and activations,
+    as built by genrl.utils.cnn) are fused, then observed while calibrate runs
+    forward passes of the network on representative inputs, and finally converted
+    to int8 convolutions. Their outputs are dequantized (and made contiguous, as
+    quantized convolutions return channels last outputs), so the rest of the
+    network is unchanged.
+
+    Args:
+        network (:obj:`torch.nn.Module`): Network to quantize, in eval mode
+        calibrate (callable): Runs forward passes of the network on calibration data
+        backend (str): Quantized engine of the encoders. Defaults to the current
+            torch.backends.quantized.engine
+
+    Returns:
+        The network, with quantized encoders
+    """
+    if backend is None:
+        backend = torch.backends.quantized.engine
+
+    encoders = _conv_encoders(network)
+    for name in encoders:
+        encoder = _fuse_conv_relu(network.get_submodule(name))
+        encoder = nn.Sequential(
+            quantization.QuantStub(),
+            *encoder,
+            quantization.DeQuantStub(),
+            _Contiguous(),
+        )
+        encoder.qconfig = quantization.get_default_qconfig(backend)
+        quantization.prepare(encoder, inplace=True)
+        _set_submodule(network, name, encoder)
+
+    if encoders:
+        calibrate()
+    for name in encoders:
+        quantization.convert(network.get_submodule(name), inplace=True)
+    return network
+
+
+def export_quantized_agent(
+    agent: Any,
+    calibration_states: Optional[torch.Tensor] = None,
+    n_calibration: int = 256,
+    min_weight_size: int = 0,
+    backend: Optional[str] = None,
+) -> Any:
+    """Exports a copy of an agent acting with int8 quantized networks on CPU
+
+    The acting networks of the agent (model for value based agents, ac or actor
+    for policy based agents) are copied and quantized: convolutional encoders are
+    statically quantized, calibrated on observations of the replay or rollout
+    buffer of the agent (or on calibration_states), and linear layers are
+    dynamically quantized. The exported agent has no buffers (it keeps the env
+    of the agent for its spaces), acts in float32 precision, and is only meant to
+    be used with act (its training networks, such as target networks, are not
+    quantized).
+
+    Args:
+        agent (object): Trained agent
+        calibration_states (:obj:`torch.Tensor`): Observations of shape
+            (n_states, *obs_shape) used to calibrate the convolutional encoders.
+            Defaults to observations from the buffer of the agent
+        n_calibration (int): Number of observations taken from the buffer
+        min_weight_size (int): Minimum number of weights of the quantized linear
+            layers (see quantize_dynamic_network). Every linear layer is quantized
+            by default
+        backend (str): Quantized engine of the convolutional encoders
+
+    Returns:
+        Copy of the agent with quantized acting networks
+    """
+    exported = copy.copy(agent)
+    for name in ("replay_buffer", "rollout"):
+        if hasattr(exported, name):
+            setattr(exported, name, None)
+    exported.precision = "fp32"
+
+    networks = [
+        name
+        for name in ACTING_NETWORKS
+        if isinstance(getattr(agent, name, None), nn.Module)
+    ]
+    for name in networks:
+        setattr(exported, name, copy.deepcopy(getattr(agent, name)).eval())
+
+    # The encoders of all the networks are observed during the same calibration
+    acting = nn.ModuleDict({name: getattr(exported, name) for name in networks})
+    if _conv_encoders(acting):
+        if calibration_states is None:
+            calibration_states = buffer_states(agent, n_calibration)
+
+        def calibrate():
+            for states in calibration_states.split(agent.batch_size):
+                exported.act(states, deterministic=True)
+
+        quantize_static_encoders(acting, calibrate, backend)
+
+    for name in networks:
+        setattr(
+            exported,
+            name,
+            quantize_dynamic_network(getattr(exported, name), min_weight_size),
+        )
+    return exported
+
+
+def buffer_states(agent: Any, n_states: int) -> torch.Tensor:
+    """Observations from the replay or rollout buffer of an agent
+
+    Args:
+        agent (object): Agent with a replay_buffer or a rollout
+        n_states (int): Maximum number of observations
+
+    Returns:
+        Observations of shape (n_states, *obs_shape)
+    """
+    replay_buffer = getattr(agent, "replay_buffer", None)
+    rollout = getattr(agent, "rollout", None)
+    if replay_buffer is not None and len(replay_buffer) > 0:
+        states = replay_buffer.sample(min(n_states, len(replay_buffer)))[0]
+    elif rollout is not None and rollout.size() > 0:
+        states = rollout.observations
+        if not rollout.full:
+            states = states[: rollout.pos]
+        states = states.float()
+    else:
+        raise ValueError("The buffer of the agent has no observations to calibrate on")
+    return states.reshape(-1, *agent.env.obs_shape)[:n_states]
+
+
+class _Contiguous(nn.Module):
+    def forward(self, inp: torch.Tensor) -> torch.Tensor:
+        return inp.contiguous()
+
+
+def _conv_encoders(network: nn.Module) -> List[str]:
+    layers = (nn.Conv2d, nn.ReLU, nn.Tanh)
+    return [
+        name
+        for name, module in network.named_modules()
+        if isinstance(module, nn.Sequential)
+        and any(isinstance(layer, nn.Conv2d) for layer in module)
+        and all(isinstance(layer, layers) for layer in module)
+    ]
+
+
+def _fuse_conv_relu(encoder: nn.Sequential) -> nn.Sequential:
+    layers = list(encoder)
+    pairs = [
+        [str(i), str(i + 1)]
+        for i in range(len(layers) - 1)
+        if isinstance(layers[i], nn.Conv2d) and isinstance(layers[i + 1], nn.ReLU)
+    ]
+    if not pairs:
+        return encoder
+    return quantization.fuse_modules(encoder, pairs)
+
+
+def _set_submodule(network: nn.Module, name: str, module: nn.Module) -> None:
+    parent, _, child = name.rpartition(".")
+    setattr(network.get_submodule(parent), child, module)
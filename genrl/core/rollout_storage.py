@@ -147,6 +147,8 @@ class RolloutBuffer(BaseBuffer):
         Equivalent to classic advantage when set to 1.
     :param gamma: (float) Discount factor
     :param n_envs: (int) Number of parallel environments
+    :param bf16_observations: (bool) Whether floating point observations are stored
+        in bfloat16. They are sampled back in float32
     """
 
     def __init__(
@@ -156,11 +158,13 @@ class RolloutBuffer(BaseBuffer):
         device: Union[torch.device, str] = "cpu",
         gae_lambda: float = 1,
         gamma: float = 0.99,
+        bf16_observations: bool = False,
     ):
 
         super(RolloutBuffer, self).__init__(buffer_size, env, device)
         self.gae_lambda = gae_lambda
         self.gamma = gamma
+        self.bf16_observations = bf16_observations
         self.observations, self.actions, self.rewards, self.advantages = (
             None,
             None,
@@ -172,8 +176,12 @@ class RolloutBuffer(BaseBuffer):
         self.reset()
 
     def reset(self) -> None:
+        obs_dtype = self.env.obs_dtype
+        if self.bf16_observations and obs_dtype.is_floating_point:
+            obs_dtype = torch.bfloat16
         self.observations = torch.zeros(
-            *(self.buffer_size, self.env.n_envs, *self.env.obs_shape)
+            *(self.buffer_size, self.env.n_envs, *self.env.obs_shape),
+            dtype=obs_dtype,
         )
         self.actions = torch.zeros(
             *(self.buffer_size, self.env.n_envs, *self.env.action_shape)
@@ -210,12 +218,13 @@ class RolloutBuffer(BaseBuffer):
             # Reshape 0-d tensor to avoid error
             log_prob = log_prob.reshape(-1, 1)
 
-        self.observations[self.pos] = obs.detach().clone()
-        self.actions[self.pos] = action.detach().clone()
-        self.rewards[self.pos] = reward.detach().clone()
-        self.dones[self.pos] = done.detach().clone()
-        self.values[self.pos] = value.detach().clone().flatten()
-        self.log_probs[self.pos] = log_prob.detach().clone().flatten()
+        # Assignments copy into the buffers, without recording any graph
+        self.observations[self.pos] = obs.detach()
+        self.actions[self.pos] = action.detach()
+        self.rewards[self.pos] = reward.detach()
+        self.dones[self.pos] = done.detach()
+        self.values[self.pos] = value.detach().flatten()
+        self.log_probs[self.pos] = log_prob.detach().flatten()
         self.pos += 1
         if self.pos == self.buffer_size:
             self.full = True
@@ -248,8 +257,11 @@ class RolloutBuffer(BaseBuffer):
             start_idx += batch_size
 
     def _get_samples(self, batch_inds: np.ndarray) -> RolloutBufferSamples:
+        observations = self.observations[batch_inds]
+        if observations.dtype == torch.bfloat16:
+            observations = observations.float()
         data = (
-            self.observations[batch_inds],
+            observations,
             self.actions[batch_inds],
             self.values[batch_inds].flatten(),
             self.log_probs[batch_inds].flatten(),
@@ -1,3 +1,4 @@
+from functools import partial
 from typing import Tuple, Type, Union
 
 import numpy as np
@@ -6,7 +7,7 @@ from torch.nn import functional as F
 
 from genrl.core.base import BaseValue
 from genrl.core.noise import NoisyLinear
-from genrl.utils.utils import cnn, mlp, noisy_mlp
+from genrl.utils.utils import cnn, ensemble_mlp, mlp, noisy_mlp
 
 
 def _get_val_model(
@@ -71,12 +72,78 @@ class MlpValue(BaseValue):
         self.fc_layers = fc_layers
 
         self.activation = kwargs["activation"] if "activation" in kwargs else "relu"
+        self.one_hot = kwargs["one_hot"] if "one_hot" in kwargs else False
 
         self.model = _get_val_model(
-            mlp, val_type, state_dim, fc_layers, action_dim, self.activation
+            partial(mlp, one_hot=self.one_hot),
+            val_type,
+            state_dim,
+            fc_layers,
+            action_dim,
+            self.activation,
         )
 
 
+class MlpEnsembleValue(BaseValue):
+    """
+        Ensemble of MLP Value Functions evaluated together
+
+        The members share the same layer sizes and their layers are batched, so
+        that every layer of the ensemble is a single batched matmul.
+
+        :param state_dim: State dimensions of environment
+        :param action_dim: Action dimensions of environment
+        :param val_type: Specifies type of value function: (
+    "V" for V(s), "Qs" for Q(s), "Qsa" for Q(s,a))
+        :param fc_layers: Sizes of hidden layers
+        :param n_members: Number of value functions in the ensemble
+        :type state_dim: int
+        :type action_dim: int
+        :type val_type: string
+        :type fc_layers: tuple or list
+        :type n_members: int
+    """
+
+    def __init__(
+        self,
+        state_dim: int,
+        action_dim: int = None,
+        val_type: str = "V",
+        fc_layers: Tuple = (32, 32),
+        n_members: int = 2,
+        **kwargs,
+    ):
+        super(MlpEnsembleValue, self).__init__(state_dim, action_dim)
+        self.val_type = val_type
+        self.fc_layers = fc_layers
+        self.n_members = n_members
+
+        self.activation = kwargs["activation"] if "activation" in kwargs else "relu"
+
+        self.model = _get_val_model(
+            partial(ensemble_mlp, n_members=n_members),
+            val_type,
+            state_dim,
+            fc_layers,
+            action_dim,
+            self.activation,
+        )
+
+    def forward(self, state: torch.Tensor, n_members: int = None) -> torch.Tensor:
+        """
+        Values of the first n_members members of the ensemble for the same input
+
+        :param state: Input to the value functions
+        :param n_members: Number of members evaluated, all of them by default
+        :type state: Tensor
+        :type n_members: int
+        :returns: Values of shape (n_members, ..., output size)
+        """
+        if n_members is None:
+            n_members = self.n_members
+        return self.model(state.expand(n_members, *state.shape))
+
+
 class CnnValue(MlpValue):
     """
         CNN Value Function class
@@ -121,7 +188,7 @@ class MlpDuelingValue(MlpValue):
 
     def __init__(self, *args, **kwargs):
         super(MlpDuelingValue, self).__init__(*args, **kwargs)
-        self.feature = mlp([self.state_dim, *self.fc_layers[:-1]])
+        self.feature = mlp([self.state_dim, *self.fc_layers[:-1]], one_hot=self.one_hot)
         self.advantage = mlp([self.fc_layers[-1], self.action_dim])
         self.value = mlp([self.fc_layers[-1], 1])
 
@@ -164,6 +231,7 @@ class MlpNoisyValue(MlpValue):
             [self.state_dim, *self.fc_layers],
             [*self.noisy_layers, self.action_dim * self.num_atoms],
             self.activation,
+            self.one_hot,
         )
 
     def reset_noise(self) -> None:
@@ -219,7 +287,7 @@ class MlpCategoricalValue(MlpNoisyValue):
     def forward(self, state: torch.Tensor) -> torch.Tensor:
         batch_size, n_envs, _ = state.shape
         features = self.model(state)
-        return F.softmax(features.view(-1, self.num_atoms), dim=0).view(
+        return F.softmax(features.view(-1, self.num_atoms), dim=-1).view(
             batch_size, n_envs, self.action_dim, self.num_atoms
         )
 
@@ -243,7 +311,7 @@ class CnnCategoricalValue(CnnNoisyValue):
         features = self._cnn_forward(state)
         features = self.model(features)
         batch_size, env, _ = features.shape
-        return F.softmax(features.view(-1, self.num_atoms), dim=0).view(
+        return F.softmax(features.view(-1, self.num_atoms), dim=-1).view(
             batch_size, env, self.action_dim, self.num_atoms
         )
 
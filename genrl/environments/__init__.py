@@ -1,9 +1,24 @@
 from genrl.environments.action_wrappers import ClipAction, RescaleAction  # noqa
-from genrl.environments.atari_preprocessing import AtariPreprocessing  # noqa
+from genrl.environments.atari_preprocessing import (  # noqa
+    AtariPreprocessing,
+    AtariScreens,
+)
 from genrl.environments.atari_wrappers import FireReset, NoopReset  # noqa
 from genrl.environments.base_wrapper import BaseWrapper  # noqa
+from genrl.environments.batched import (  # noqa
+    BatchedCartPole,
+    BatchedMountainCar,
+    BatchedPendulum,
+    BatchedVecEnv,
+)
 from genrl.environments.frame_stack import FrameStack  # noqa
+from genrl.environments.frame_stack import LazyFrames  # noqa
 from genrl.environments.gym_wrapper import GymWrapper  # noqa
-from genrl.environments.suite import AtariEnv, GymEnv, VectorEnv  # noqa
+from genrl.environments.suite import (  # noqa
+    AtariEnv,
+    AtariScreensEnv,
+    GymEnv,
+    VectorEnv,
+)
 from genrl.environments.time_limit import AtariTimeLimit, TimeLimit  # noqa
 from genrl.environments.vec_env import VecEnv, VecNormalize  # noqa
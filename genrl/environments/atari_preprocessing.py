@@ -131,3 +131,50 @@ resizes output to appropriate screen size.
         )
 
         return np.array(obs, dtype=np.uint8)
+
+
+class AtariScreens(AtariPreprocessing):
+    """
+    Frameskip for Gym Atari environments, leaving the rest of the preprocessing \
+to be done in batches for all environments by VecAtariPreprocessing.
+
+    Observations are the last two raw screens of the frameskip, of shape \
+(2, height, width, 3) (or (2, height, width) if grayscale)
+
+    :param env: Atari environment
+    :param frameskip: Number of steps between actions. \
+E.g. frameskip=4 will mean 1 action will be taken for every 4 frames. It'll be\
+ a tuple
+if non-deterministic and a random number will be chosen from (2, 5)
+    :param grayscale: Whether the screens should be fetched in grayscale from the ALE
+    :type env: Gym Environment
+    :type frameskip: tuple or int
+    :type grayscale: boolean
+    """
+
+    def __init__(
+        self,
+        env: gym.Env,
+        frameskip: Union[Tuple, int] = (2, 5),
+        grayscale: bool = False,
+    ):
+        super(AtariScreens, self).__init__(env, frameskip, grayscale)
+
+        shape = self.env.observation_space.shape
+        if grayscale:
+            shape = shape[:2]
+        self.observation_space = Box(low=0, high=255, shape=(2, *shape), dtype=np.uint8)
+
+        self._obs_buffer = [
+            np.empty(shape, dtype=np.uint8),
+            np.empty(shape, dtype=np.uint8),
+        ]
+
+    def _get_obs(self) -> np.ndarray:
+        """
+        Returns both screens of the observation buffer
+
+        :returns: Last two raw screens
+        :rtype: NumPy array
+        """
+        return np.stack(self._obs_buffer)
@@ -0,0 +1,26 @@
+from genrl.environments.batched.base import BatchedVecEnv  # noqa
+from genrl.environments.batched.classic_control import (  # noqa
+    BatchedCartPole,
+    BatchedMountainCar,
+    BatchedPendulum,
+)
+
+batched_env_registry = {
+    "CartPole-v0": BatchedCartPole,
+    "CartPole-v1": BatchedCartPole,
+    "Pendulum-v0": BatchedPendulum,
+    "MountainCar-v0": BatchedMountainCar,
+}
+
+
+def get_batched_env_from_name(name_: str):
+    """
+    Returns the batched environment class given the gym ID of the environment
+
+    :param name_: Gym ID of the environment
+    :type name_: str
+    :returns: Batched environment class to be used
+    """
+    if name_ in batched_env_registry:
+        return batched_env_registry[name_]
+    raise NotImplementedError
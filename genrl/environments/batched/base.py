@@ -0,0 +1,260 @@
+from abc import abstractmethod
+from typing import List, Tuple, Union
+
+import gym
+import torch
+
+from genrl.environments.vec_env import VecEnv
+
+
+class BatchedVecEnv(VecEnv):
+    """
+    Base class for environments implemented natively as batched tensor operations.
+
+    Instead of holding n_envs separate gym environments, the state of every
+    environment is stored in a single (n_envs, ...) tensor and stepped in one call.
+    Like the other VecEnvs, step returns the final observations of the episodes
+    which ended, and finished environments are reset by ``reset_single_env``.
+    Environments which were not reset that way are reset (using a mask) at the start
+    of the next step.
+
+    Subclasses must define ``observation_space`` and ``action_space`` (for a single
+    environment) and implement ``_sample_initial_state`` and ``_dynamics``.
+
+    :param env_id: Gym ID of the environment being simulated
+    :param n_envs: Number of environments
+    :param device: Device on which the states are stored and stepped
+    :param max_episode_len: Maximum length of an episode. Defaults to that of the gym spec
+    :type env_id: string
+    :type n_envs: int
+    :type device: string
+    :type max_episode_len: int
+    """
+
+    observation_space = None
+    action_space = None
+
+    def __init__(
+        self,
+        env_id: str,
+        n_envs: int = 2,
+        device: Union[torch.device, str] = "cpu",
+        max_episode_len: int = None,
+    ):
+        self.envs = []
+        self.env = None
+        self._n_envs = n_envs
+        self.env_id = env_id
+        self.spec = gym.spec(env_id)
+        self.device = torch.device(device)
+
+        if max_episode_len is None:
+            max_episode_len = self.spec.max_episode_steps
+        self.max_episode_len = max_episode_len
+
+        self.generator = torch.Generator(device=self.device)
+        self.generator.seed()
+
+        self.state = self._sample_initial_state(self.n_envs)
+        self.steps = torch.zeros(self.n_envs, dtype=torch.long, device=self.device)
+        self.episode_reward = torch.zeros(self.n_envs, device=self.device)
+        self._needs_reset = torch.zeros(
+            self.n_envs, dtype=torch.bool, device=self.device
+        )
+
+    @abstractmethod
+    def _sample_initial_state(self, n: int) -> torch.Tensor:
+        """
+        Samples initial (internal) states for n environments
+
+        :param n: Number of initial states needed
+        :type n: int
+        :returns: Initial states of shape (n, ...)
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def _dynamics(self, state: torch.Tensor, actions: torch.Tensor) -> Tuple:
+        """
+        Advances all the environments by one timestep
+
+        :param state: Internal states of all the environments
+        :param actions: Actions for all the environments
+        :type state: torch.Tensor
+        :type actions: torch.Tensor
+        :returns: Next states, rewards and terminal statuses (as a bool tensor)
+        """
+        raise NotImplementedError
+
+    def _get_obs(self, state: torch.Tensor) -> torch.Tensor:
+        """
+        Computes observations from the internal states
+
+        :param state: Internal states of all the environments
+        :type state: torch.Tensor
+        :returns: Observations
+        """
+        return state.clone()
+
+    def _format_actions(self, actions: torch.Tensor) -> torch.Tensor:
+        """
+        Reshapes actions from the agent into a single (n_envs, ...) tensor
+        """
+        actions = torch.as_tensor(actions, device=self.device)
+        if isinstance(self.action_space, gym.spaces.Discrete):
+            return actions.reshape(self.n_envs).long()
+        return actions.reshape(self.n_envs, *self.action_space.shape).float()
+
+    def _reset_mask(self, mask: torch.Tensor) -> None:
+        """
+        Resets the environments selected by a boolean mask
+        """
+        n_reset = int(mask.sum())
+        if n_reset:
+            self.state[mask] = self._sample_initial_state(n_reset)
+            self.steps[mask] = 0
+
+    def _reset_finished(self) -> None:
+        """
+        Resets the environments which finished in the last step and were not reset since
+        """
+        self._reset_mask(self._needs_reset)
+        self.episode_reward.masked_fill_(self._needs_reset, 0)
+        self._needs_reset.zero_()
+
+    def step(self, actions: torch.Tensor) -> Tuple:
+        """
+        Steps through all the environments in a single batched call
+
+        :param actions: Actions from the model
+        :type actions: torch.Tensor
+        :returns: States, rewards, dones, infos
+        """
+        actions = self._format_actions(actions)
+        self._reset_finished()
+        self.state, rewards, terminal = self._dynamics(self.state, actions)
+        self.steps += 1
+
+        dones = terminal | (self.steps >= self.max_episode_len)
+        return self._end_step(rewards, terminal, dones)
+
+    def step_repeat(self, actions: torch.Tensor, repeat: int) -> Tuple:
+        """
+        Repeats the actions in all the environments, stopping at episode ends
+
+        Environments whose episode ended are frozen (masked out of the state and
+        reward updates) for the remaining repeats.
+
+        :param actions: Actions from the model
+        :param repeat: Maximum number of times the actions are taken
+        :type actions: torch.Tensor
+        :type repeat: int
+        :returns: States, summed rewards, dones, infos
+        """
+        actions = self._format_actions(actions)
+        self._reset_finished()
+        active = torch.ones(self.n_envs, dtype=torch.bool, device=self.device)
+        rewards = torch.zeros(self.n_envs, device=self.device)
+        terminal = torch.zeros_like(active)
+        # View of active, so it follows the in-place updates below
+        state_mask = active.view(-1, *[1] * (self.state.dim() - 1))
+
+        for _ in range(repeat):
+            state, step_rewards, step_terminal = self._dynamics(self.state, actions)
+            self.state = torch.where(state_mask, state, self.state)
+            self.steps += active
+            rewards += step_rewards * active
+
+            terminal |= step_terminal & active
+            active &= ~(step_terminal | (self.steps >= self.max_episode_len))
+            if not active.any():
+                break
+
+        return self._end_step(rewards, terminal, ~active)
+
+    def _end_step(
+        self, rewards: torch.Tensor, terminal: torch.Tensor, dones: torch.Tensor
+    ) -> Tuple:
+        """
+        Updates episode rewards and marks the finished environments for reset
+        """
+        self.episode_reward += rewards
+        self._needs_reset = dones
+
+        infos = [{"done": done} for done in terminal.tolist()]
+        return self._get_obs(self.state), rewards, dones.float(), infos
+
+    def reset(self) -> torch.Tensor:
+        """
+        Resets all the environments
+        """
+        self.state = self._sample_initial_state(self.n_envs)
+        self.steps.zero_()
+        self.episode_reward = torch.zeros(self.n_envs, device=self.device)
+        self._needs_reset.zero_()
+        return self._get_obs(self.state)
+
+    def reset_single_env(self, i: int) -> torch.Tensor:
+        """
+        Resets a single environment
+        """
+        mask = torch.zeros(self.n_envs, dtype=torch.bool, device=self.device)
+        mask[i] = True
+        self._reset_mask(mask)
+        self._needs_reset[i] = False
+        self.episode_reward[i] = 0
+        return self._get_obs(self.state)
+
+    def sample(self) -> torch.Tensor:
+        """
+        Return random actions for each environment
+        """
+        if isinstance(self.action_space, gym.spaces.Discrete):
+            return torch.randint(
+                self.action_space.n,
+                (self.n_envs,),
+                generator=self.generator,
+                device=self.device,
+            )
+        low = torch.as_tensor(self.action_space.low, device=self.device)
+        high = torch.as_tensor(self.action_space.high, device=self.device)
+        return low + (high - low) * self._rand(self.n_envs, *self.action_space.shape)
+
+    def seed(self, seed: int):
+        """
+        Set seed for reproducibility in all environments
+        """
+        self.generator.manual_seed(seed)
+
+    def _rand(self, *size: int) -> torch.Tensor:
+        """
+        Uniform random numbers in [0, 1) drawn from the environment's generator
+        """
+        return torch.rand(*size, generator=self.generator, device=self.device)
+
+    def _uniform(self, low: float, high: float, *size: int) -> torch.Tensor:
+        """
+        Uniform random numbers in [low, high) drawn from the environment's generator
+        """
+        return low + (high - low) * self._rand(*size)
+
+    def get_spaces(self) -> Tuple:
+        return self.observation_space, self.action_space
+
+    def close(self):
+        pass
+
+    def render(self, mode="human"):
+        raise NotImplementedError("Batched environments cannot be rendered")
+
+    @property
+    def unwrapped(self) -> "BatchedVecEnv":
+        return self
+
+    @property
+    def observation_spaces(self) -> List:
+        return [self.observation_space] * self.n_envs
+
+    @property
+    def action_spaces(self) -> List:
+        return [self.action_space] * self.n_envs
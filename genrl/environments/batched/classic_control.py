@@ -0,0 +1,184 @@
+import math
+from typing import Tuple
+
+import numpy as np
+import torch
+from gym import spaces
+
+from genrl.environments.batched.base import BatchedVecEnv
+
+
+class BatchedCartPole(BatchedVecEnv):
+    """
+    Batched implementation of the gym CartPole environment
+
+    Follows the dynamics of gym's CartPoleEnv (euler integration).
+
+    :param env_id: Gym ID of the environment ["CartPole-v0", "CartPole-v1"]
+    :param n_envs: Number of environments
+    :type env_id: string
+    :type n_envs: int
+    """
+
+    gravity = 9.8
+    masscart = 1.0
+    masspole = 0.1
+    total_mass = masspole + masscart
+    length = 0.5
+    polemass_length = masspole * length
+    force_mag = 10.0
+    tau = 0.02
+    theta_threshold_radians = 12 * 2 * math.pi / 360
+    x_threshold = 2.4
+
+    high = np.array(
+        [
+            x_threshold * 2,
+            np.finfo(np.float32).max,
+            theta_threshold_radians * 2,
+            np.finfo(np.float32).max,
+        ],
+        dtype=np.float32,
+    )
+    observation_space = spaces.Box(-high, high, dtype=np.float32)
+    action_space = spaces.Discrete(2)
+
+    def __init__(self, env_id: str = "CartPole-v1", *args, **kwargs):
+        super(BatchedCartPole, self).__init__(env_id, *args, **kwargs)
+
+    def _sample_initial_state(self, n: int) -> torch.Tensor:
+        return self._uniform(-0.05, 0.05, n, 4)
+
+    def _dynamics(self, state: torch.Tensor, actions: torch.Tensor) -> Tuple:
+        x, x_dot, theta, theta_dot = state.unbind(-1)
+        force = (2 * actions - 1).float() * self.force_mag
+        costheta, sintheta = torch.cos(theta), torch.sin(theta)
+
+        temp = (
+            force + self.polemass_length * theta_dot ** 2 * sintheta
+        ) / self.total_mass
+        thetaacc = (self.gravity * sintheta - costheta * temp) / (
+            self.length * (4.0 / 3.0 - self.masspole * costheta ** 2 / self.total_mass)
+        )
+        xacc = temp - self.polemass_length * thetaacc * costheta / self.total_mass
+
+        x = x + self.tau * x_dot
+        x_dot = x_dot + self.tau * xacc
+        theta = theta + self.tau * theta_dot
+        theta_dot = theta_dot + self.tau * thetaacc
+
+        terminal = (x.abs() > self.x_threshold) | (
+            theta.abs() > self.theta_threshold_radians
+        )
+        rewards = torch.ones(self.n_envs, device=self.device)
+        return torch.stack([x, x_dot, theta, theta_dot], dim=-1), rewards, terminal
+
+
+class BatchedPendulum(BatchedVecEnv):
+    """
+    Batched implementation of the gym Pendulum environment
+
+    The internal state is (theta, theta_dot) and the observation is
+    (cos(theta), sin(theta), theta_dot) like in gym's PendulumEnv.
+
+    :param env_id: Gym ID of the environment ["Pendulum-v0"]
+    :param n_envs: Number of environments
+    :type env_id: string
+    :type n_envs: int
+    """
+
+    max_speed = 8.0
+    max_torque = 2.0
+    dt = 0.05
+    g = 10.0
+    m = 1.0
+    l = 1.0
+
+    observation_space = spaces.Box(
+        low=-np.array([1.0, 1.0, max_speed], dtype=np.float32),
+        high=np.array([1.0, 1.0, max_speed], dtype=np.float32),
+        dtype=np.float32,
+    )
+    action_space = spaces.Box(
+        low=-max_torque, high=max_torque, shape=(1,), dtype=np.float32
+    )
+
+    def __init__(self, env_id: str = "Pendulum-v0", *args, **kwargs):
+        super(BatchedPendulum, self).__init__(env_id, *args, **kwargs)
+
+    def _sample_initial_state(self, n: int) -> torch.Tensor:
+        high = torch.tensor([math.pi, 1.0], device=self.device)
+        return (2 * self._rand(n, 2) - 1) * high
+
+    def _get_obs(self, state: torch.Tensor) -> torch.Tensor:
+        theta, theta_dot = state.unbind(-1)
+        return torch.stack([torch.cos(theta), torch.sin(theta), theta_dot], dim=-1)
+
+    def _dynamics(self, state: torch.Tensor, actions: torch.Tensor) -> Tuple:
+        theta, theta_dot = state.unbind(-1)
+        u = actions[:, 0].clamp(-self.max_torque, self.max_torque)
+
+        normalized_theta = ((theta + math.pi) % (2 * math.pi)) - math.pi
+        costs = normalized_theta ** 2 + 0.1 * theta_dot ** 2 + 0.001 * u ** 2
+
+        new_theta_dot = (
+            theta_dot
+            + (
+                -3 * self.g / (2 * self.l) * torch.sin(theta + math.pi)
+                + 3.0 / (self.m * self.l ** 2) * u
+            )
+            * self.dt
+        )
+        new_theta = theta + new_theta_dot * self.dt
+        new_theta_dot = new_theta_dot.clamp(-self.max_speed, self.max_speed)
+
+        terminal = torch.zeros(self.n_envs, dtype=torch.bool, device=self.device)
+        return torch.stack([new_theta, new_theta_dot], dim=-1), -costs, terminal
+
+
+class BatchedMountainCar(BatchedVecEnv):
+    """
+    Batched implementation of the gym MountainCar environment
+
+    :param env_id: Gym ID of the environment ["MountainCar-v0"]
+    :param n_envs: Number of environments
+    :type env_id: string
+    :type n_envs: int
+    """
+
+    min_position = -1.2
+    max_position = 0.6
+    max_speed = 0.07
+    goal_position = 0.5
+    goal_velocity = 0
+    force = 0.001
+    gravity = 0.0025
+
+    observation_space = spaces.Box(
+        np.array([min_position, -max_speed], dtype=np.float32),
+        np.array([max_position, max_speed], dtype=np.float32),
+        dtype=np.float32,
+    )
+    action_space = spaces.Discrete(3)
+
+    def __init__(self, env_id: str = "MountainCar-v0", *args, **kwargs):
+        super(BatchedMountainCar, self).__init__(env_id, *args, **kwargs)
+
+    def _sample_initial_state(self, n: int) -> torch.Tensor:
+        position = self._uniform(-0.6, -0.4, n)
+        return torch.stack([position, torch.zeros_like(position)], dim=-1)
+
+    def _dynamics(self, state: torch.Tensor, actions: torch.Tensor) -> Tuple:
+        position, velocity = state.unbind(-1)
+
+        velocity = velocity + (actions - 1).float() * self.force
+        velocity = velocity + torch.cos(3 * position) * (-self.gravity)
+        velocity = velocity.clamp(-self.max_speed, self.max_speed)
+        position = (position + velocity).clamp(self.min_position, self.max_position)
+        velocity = velocity.masked_fill(
+            (position == self.min_position) & (velocity < 0), 0
+        )
+
+        terminal = (position >= self.goal_position) & (velocity >= self.goal_velocity)
+        rewards = -torch.ones(self.n_envs, device=self.device)
+        return torch.stack([position, velocity], dim=-1), rewards, terminal
@@ -1,5 +1,5 @@
 from collections import deque
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple, Union
 
 import gym
 import numpy as np
@@ -12,51 +12,75 @@ class LazyFrames(object):
     Efficient data structure to save each frame only once. \
 Can use LZ4 compression to optimizer memory usage.
 
+    Frames are only referenced, so overlapping stacks share the same (compressed) \
+frames. Shape and dtype are known without decoding any frame and decoding is \
+only done when an array is needed, directly into the output array.
+
     :param frames: List of frames that needs to converted \
-to a LazyFrames data structure
+to a LazyFrames data structure. If compress is True, the frames can already be \
+compressed with compress_frame, in which case frame_shape and dtype are needed
     :param compress: True if we want to use LZ4 compression \
 to conserve memory usage
+    :param frame_shape: Shape of a single frame (for compressed frames)
+    :param dtype: Data type of the frames (for compressed frames)
     :type frames: collections.deque
     :type compress: boolean
+    :type frame_shape: tuple
+    :type dtype: NumPy dtype
     """
 
-    def __init__(self, frames: List, compress: bool = False):
-        if compress:
-            from lz4.block import compress
-
-            frames = [compress(frame) for frame in frames]
-        self._frames = frames
+    def __init__(
+        self,
+        frames: List,
+        compress: bool = False,
+        frame_shape: Tuple = None,
+        dtype: np.dtype = None,
+    ):
+        if isinstance(frames[0], np.ndarray):
+            frame_shape, dtype = frames[0].shape, frames[0].dtype
+            if compress:
+                frames = [compress_frame(frame) for frame in frames]
+        self._frames = list(frames)
         self.compress = compress
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.shape = (len(self._frames), *self.frame_shape)
 
-    def __array__(self) -> np.ndarray:
+    def _decode(self, frame: Any, out: np.ndarray) -> None:
         """
-        Makes the LazyFrames object convertible to a NumPy array
+        Writes a single decoded frame into out
         """
         if self.compress:
             from lz4.block import decompress
 
-            frames = [
-                np.frombuffer(decompress(frame), dtype=self._frames[0].dtype).reshape(
-                    self._frames[0].shape
-                )
-                for frame in self._frames
-            ]
-        else:
-            frames = self._frames
+            frame = np.frombuffer(decompress(frame), dtype=self.dtype)
+            frame = frame.reshape(self.frame_shape)
+        out[...] = frame
 
-        return np.stack(frames, axis=0)
+    def __array__(self, dtype: np.dtype = None) -> np.ndarray:
+        """
+        Makes the LazyFrames object convertible to a NumPy array
+        """
+        out = np.empty(self.shape, dtype=self.dtype)
+        for i, frame in enumerate(self._frames):
+            self._decode(frame, out[i])
+        return out if dtype is None else out.astype(dtype)
 
     def __getitem__(self, index: int) -> np.ndarray:
         """
         Return frame at index
         """
+        if isinstance(index, int):
+            out = np.empty(self.frame_shape, dtype=self.dtype)
+            self._decode(self._frames[index], out)
+            return out
         return self.__array__()[index]
 
     def __len__(self) -> int:
         """
         Return length of data structure
         """
-        return len(self.__array__())
+        return len(self._frames)
 
     def __eq__(self, other: np.ndarray) -> bool:
         """
@@ -67,12 +91,47 @@ to conserve memory usage
         """
         return self.__array__() == other
 
-    @property
-    def shape(self) -> Tuple:
+    @staticmethod
+    def stack(batch: List["LazyFrames"], cache: Dict = None) -> np.ndarray:
         """
-        Returns dimensions of other object
+        Decodes a batch of LazyFrames into a single array
+
+        Frames shared by several LazyFrames of the batch are only decoded once.
+
+        :param batch: LazyFrames to be stacked, all of the same shape
+        :param cache: Decoded frames by id, to be shared between several calls \
+(eg. for states and next states sampled from a replay buffer)
+        :type batch: list
+        :type cache: dict
+        :returns: Array of shape (batch_size, *shape)
+        :rtype: NumPy array
         """
-        return self.__array__().shape
+        if cache is None:
+            cache = {}
+        out = np.empty((len(batch), *batch[0].shape), dtype=batch[0].dtype)
+        for i, lazy_frames in enumerate(batch):
+            for j, frame in enumerate(lazy_frames._frames):
+                decoded = cache.get(id(frame))
+                if decoded is None:
+                    lazy_frames._decode(frame, out[i, j])
+                    cache[id(frame)] = out[i, j]
+                else:
+                    out[i, j] = decoded
+        return out
+
+
+def compress_frame(frame: np.ndarray) -> bytes:
+    """
+    Compresses a single frame with LZ4
+
+    :param frame: Frame to be compressed
+    :type frame: NumPy array
+    :returns: Compressed frame
+    :rtype: bytes
+    """
+    from lz4.block import compress
+
+    return compress(np.ascontiguousarray(frame))
 
 
 class FrameStack(Wrapper):
@@ -83,18 +142,30 @@ agent efficiently
     :param env: Environment to be wrapped
     :param framestack: Number of frames to be stacked
     :param compress: True if we want to use LZ4 compression \
-to conserve memory usage
+to conserve memory usage. Only used with lazy, since frames are compressed once \
+when they are observed and would otherwise be decoded right away
+    :param lazy: True if observations should be returned as LazyFrames (of shape \
+(framestack, ...)) instead of arrays (of shape (1, framestack, ...))
     :type env: Gym Environment
     :type framestack: int
     :type compress: bool
+    :type lazy: bool
     """
 
-    def __init__(self, env: gym.Env, framestack: int = 4, compress: bool = True):
+    def __init__(
+        self,
+        env: gym.Env,
+        framestack: int = 4,
+        compress: bool = True,
+        lazy: bool = False,
+    ):
         super(FrameStack, self).__init__(env)
 
         self.env = env
         self._frames = deque([], maxlen=framestack)
         self.framestack = framestack
+        self.compress = compress and lazy
+        self.lazy = lazy
 
         low = np.repeat(
             np.expand_dims(self.env.observation_space.low, axis=0), framestack, axis=0
@@ -117,7 +188,7 @@ to conserve memory usage
         :rtype: NumPy Array, float, boolean, dict
         """
         observation, reward, done, info = self.env.step(action)
-        self._frames.append(observation)
+        self._frames.append(self._encode(observation))
         return self._get_obs(), reward, done, info
 
     def reset(self) -> np.ndarray:
@@ -127,16 +198,38 @@ to conserve memory usage
         :returns: Initial state of environment
         :rtype: NumPy Array
         """
-        observation = self.env.reset()
+        # The initial frame is encoded once and shared by the whole stack
+        frame = self._encode(self.env.reset())
         for _ in range(self.framestack):
-            self._frames.append(observation)
+            self._frames.append(frame)
         return self._get_obs()
 
-    def _get_obs(self) -> np.ndarray:
+    def _encode(self, observation: np.ndarray) -> Any:
+        """
+        Encodes a new observation for the deque of frames, compressing it if needed
+
+        :param observation: New observation
+        :type observation: NumPy Array
+        """
+        observation = np.asarray(observation)
+        self._frame_shape, self._dtype = observation.shape, observation.dtype
+        if self.compress:
+            return compress_frame(observation)
+        return observation
+
+    def _get_obs(self) -> Union[np.ndarray, LazyFrames]:
         """
         Gets observation given deque of frames
 
         :returns: Past few frames
-        :rtype: NumPy Array
+        :rtype: NumPy Array or LazyFrames
         """
-        return np.array(LazyFrames(list(self._frames)))[np.newaxis, ...]
+        frames = LazyFrames(
+            list(self._frames),
+            self.compress,
+            self._frame_shape,
+            self._dtype,
+        )
+        if self.lazy:
+            return frames
+        return np.asarray(frames)[np.newaxis, ...]
@@ -0,0 +1,90 @@
+from typing import Tuple
+
+import gym
+import torch
+
+from genrl.environments.gym_wrapper import GymWrapper
+from genrl.environments.time_limit import TimeLimit
+from genrl.environments.torch import TorchWrapper
+
+
+class FusedTorchEnv(TorchWrapper):
+    """
+    Single wrapper equivalent to ``TorchWrapper(GymWrapper(TimeLimit(env)))``
+
+    The conversions of TorchWrapper and the episode length limit of TimeLimit are
+    done in a single step and reset, and the shapes and spaces are resolved once
+    on construction, so hot-path calls do not go through the wrapper chain.
+
+    :param env: Gym environment (as returned by gym.make)
+    :param max_episode_len: Maximum length of an episode. Defaults to that of the \
+gym spec
+    :type env: Gym Environment
+    :type max_episode_len: int
+    """
+
+    def __init__(self, env: gym.Env, max_episode_len: int = None):
+        super(FusedTorchEnv, self).__init__(env)
+
+        if max_episode_len is None:
+            max_episode_len = self.env.spec.max_episode_steps
+        else:
+            self.env.spec.max_episode_steps = max_episode_len
+
+        self._max_episode_len = max_episode_len
+        self._steps_taken = 0
+        self._env_step = self.env.step
+        self._env_reset = self.env.reset
+
+    def step(self, action: torch.Tensor) -> Tuple:
+        """
+        Steps the env through given action
+
+        :param action: Action taken by agent
+        :type action: torch.Tensor
+        :returns: Next observation, reward, game status and debugging info
+        """
+        action = action.item() if self._discrete_action else action.data
+        state, reward, done, info = self._env_step(action)
+
+        self._steps_taken += 1
+        info["done"] = done
+        if self._steps_taken >= self._max_episode_len:
+            done = True
+            info["done"] = False
+        return self._to_tensor(state), reward, done, info
+
+    def reset(self, **kwargs) -> torch.Tensor:
+        """
+        Resets environment
+
+        :returns: Initial state
+        :rtype: torch.Tensor
+        """
+        self._steps_taken = 0
+        return self._to_tensor(self._env_reset(**kwargs))
+
+
+def fuse_wrappers(env: gym.Env) -> gym.Env:
+    """
+    Flattens a known chain of wrappers into a single fused wrapper
+
+    ``TorchWrapper(GymWrapper(TimeLimit(env)))`` (as built by the vectorised
+    environments for gym environments) is replaced by an equivalent FusedTorchEnv.
+    Other environments are returned unchanged.
+
+    :param env: Wrapped environment
+    :type env: Gym Environment
+    :returns: Fused environment
+    :rtype: Gym Environment
+    """
+    if (
+        type(env) is TorchWrapper
+        and type(env.env) is GymWrapper
+        and type(env.env.env) is TimeLimit
+    ):
+        time_limit = env.env.env
+        fused_env = FusedTorchEnv(time_limit.env, time_limit._max_episode_len)
+        fused_env._steps_taken = time_limit._steps_taken
+        return fused_env
+    return env
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Tuple
 
 import gym
 import numpy as np
@@ -30,6 +30,11 @@ serially or parallelly
         self.done = False
         self.info = {}
 
+        # The spaces are fixed, so the shapes are resolved once here instead of
+        # through the wrapper chain on every access
+        self._obs_shape = space_shape(self.env.observation_space)
+        self._action_shape = space_shape(self.env.action_space)
+
     def __getattr__(self, name: str) -> Any:
         """
         All other calls would go to base env
@@ -39,19 +44,11 @@ serially or parallelly
 
     @property
     def obs_shape(self):
-        if isinstance(self.env.observation_space, gym.spaces.Discrete):
-            obs_shape = (1,)
-        elif isinstance(self.env.observation_space, gym.spaces.Box):
-            obs_shape = self.env.observation_space.shape
-        return obs_shape
+        return self._obs_shape
 
     @property
     def action_shape(self):
-        if isinstance(self.env.action_space, gym.spaces.Box):
-            action_shape = self.env.action_space.shape
-        elif isinstance(self.env.action_space, gym.spaces.Discrete):
-            action_shape = (1,)
-        return action_shape
+        return self._action_shape
 
     def sample(self) -> np.ndarray:
         """
@@ -106,3 +103,19 @@ Displays tiled images in 'human' and returns tiled images in 'rgb_array'
         Closes environment
         """
         self.env.close()
+
+
+def space_shape(space: gym.Space) -> Tuple:
+    """
+    Shape of the observations or actions of a space as seen by the agents
+
+    :param space: Observation or action space
+    :type space: Gym Space
+    :returns: (1,) for Discrete spaces, the shape of Box spaces and None otherwise
+    :rtype: tuple
+    """
+    if isinstance(space, gym.spaces.Discrete):
+        return (1,)
+    elif isinstance(space, gym.spaces.Box):
+        return space.shape
+    return None
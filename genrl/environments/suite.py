@@ -1,48 +1,91 @@
-from typing import List
+from typing import Callable, List, Union
 
 import gym
 
 from genrl.environments import (
     AtariPreprocessing,
+    AtariScreens,
     FireReset,
     FrameStack,
     GymWrapper,
     NoopReset,
 )
+from genrl.environments.batched import get_batched_env_from_name
 from genrl.environments.time_limit import AtariTimeLimit, TimeLimit
-from genrl.environments.torch import TorchWrapper
-from genrl.environments.vec_env import SerialVecEnv, SubProcessVecEnv, VecEnv
+from genrl.environments.vec_env import (
+    EnvFactory,
+    SerialVecEnv,
+    SubProcessVecEnv,
+    ThreadVecEnv,
+    VecAtariPreprocessing,
+    VecEnv,
+    get_env_pool,
+)
 
 
 def VectorEnv(
-    env_id: str,
+    env_id: Union[str, Callable],
     n_envs: int = 2,
-    parallel: int = False,
+    parallel: Union[bool, str] = False,
     env_type: str = "gym",
+    batched_preprocessing: bool = False,
+    copy_obs: bool = True,
+    pin_memory: bool = False,
 ) -> VecEnv:
     """
         Chooses the kind of Vector Environment that is required
 
-        :param env_id: Gym environment to be vectorised
+        :param env_id: Gym environment to be vectorised, or a factory (callable (
+    returning a single wrapped environment) used to build each environment)
         :param n_envs: Number of environments
-        :param parallel: True if we want environments to run parallely and (
-    subprocesses, False if we want environments to run serially one after the other)
-        :param env_type: Type of environment. Currently, we support ["gym", "atari"]
-        :type env_id: string
+        :param parallel: True (or "process") if we want environments to run parallely in (
+    subprocesses, "thread" if we want them to run parallely on a thread pool, "pool" if
+    we want them to run on the persistent worker processes of the shared EnvPool and
+    False (or "serial") if we want environments to run serially one after the other.
+    Subprocesses and pool workers build their environments themselves, in parallel)
+        :param env_type: Type of environment. Currently, we support ["gym", "atari", (
+    "batched"]. "batched" uses the natively batched torch implementations of
+    the classic control environments, for which parallel is ignored)
+        :param batched_preprocessing: For Atari environments, True if the (
+    preprocessing and frame stacking should be done for all environments at once by
+    VecAtariPreprocessing instead of inside each environment)
+        :param copy_obs: True if the observations returned should be copies of the (
+    batch of observations. If False, they are overwritten by the next step or reset.
+    Ignored by batched environments and batched preprocessing)
+        :param pin_memory: True if the batch of observations should be in pinned (
+    memory. Ignored by batched environments and batched preprocessing)
+        :type env_id: string or callable
         :type n_envs: int
-        :type parallel: False
+        :type parallel: bool or string
         :type env_type: string
+        :type batched_preprocessing: bool
+        :type copy_obs: bool
+        :type pin_memory: bool
         :returns: Vector Environment
         :rtype: object
     """
-    wrapper = AtariEnv if env_type == "atari" else GymEnv
+    if env_type == "batched":
+        return get_batched_env_from_name(env_id)(env_id, n_envs)
+
+    if env_type == "atari" and batched_preprocessing:
+        venv = VectorEnv(env_id, n_envs, parallel, env_type="atari_screens")
+        return VecAtariPreprocessing(venv)
+
+    env_fn = env_id if callable(env_id) else EnvFactory(env_id, env_type)
 
-    envs = [TorchWrapper(wrapper(env_id)) for _ in range(n_envs)]
+    if parallel == "pool":
+        return get_env_pool().make(env_fn, n_envs, copy_obs, pin_memory)
+    elif parallel in (True, "process"):
+        return SubProcessVecEnv([env_fn] * n_envs, n_envs, copy_obs, pin_memory)
 
-    if parallel:
-        venv = SubProcessVecEnv(envs, n_envs)
+    envs = [env_fn() for _ in range(n_envs)]
+
+    if parallel == "thread":
+        venv = ThreadVecEnv(envs, n_envs, copy_obs, pin_memory)
+    elif parallel in (False, "serial"):
+        venv = SerialVecEnv(envs, n_envs, copy_obs, pin_memory)
     else:
-        venv = SerialVecEnv(envs, n_envs)
+        raise ValueError("Invalid value for parallel: {}".format(parallel))
 
     return venv
 
@@ -91,9 +134,24 @@ def AtariEnv(
         frameskip = (2, 5)
 
     for wrapper in wrapper_list:
-        if wrapper is AtariPreprocessing:
+        if issubclass(wrapper, AtariPreprocessing):
             env = wrapper(env, frameskip)
         else:
             env = wrapper(env)
 
     return env
+
+
+def AtariScreensEnv(env_id: str) -> gym.Env:
+    """
+    Function to apply wrappers for Atari envs whose preprocessing is batched \
+by VecAtariPreprocessing
+
+    :param env: Environment Name
+    :type env: string
+    :returns: Gym Atari Environment returning raw screens
+    :rtype: object
+    """
+    return AtariEnv(
+        env_id, wrapper_list=[AtariScreens, NoopReset, FireReset, AtariTimeLimit]
+    )
@@ -27,19 +27,30 @@ class TorchWrapper(GymWrapper):
             env (gym.Env): Environment
         """
         super(TorchWrapper, self).__init__(env, *args, **kwargs)
+        self._discrete_action = self.action_shape == (1,) and isinstance(
+            self.env.action_space, gym.spaces.Discrete
+        )
+        self._discrete_obs = isinstance(self.env.observation_space, gym.spaces.Discrete)
 
     def step(self, action: torch.Tensor) -> torch.Tensor:
-        if self.action_shape == (1,) and isinstance(
-            self.env.action_space, gym.spaces.Discrete
-        ):
+        if self._discrete_action:
             state, reward, done, info = self.env.step(action.item())
         else:
             state, reward, done, info = self.env.step(action.data)
-        state = torch.from_numpy(state)
-        return state, reward, done, info
+        return self._to_tensor(state), reward, done, info
 
     def reset(self) -> torch.Tensor:
-        return torch.from_numpy(self.env.reset())
+        return self._to_tensor(self.env.reset())
+
+    def _to_tensor(self, state: Any) -> torch.Tensor:
+        """
+        Converts an observation to a tensor without copying it
+
+        Discrete observations are returned as a (1,) tensor holding their index.
+        """
+        if self._discrete_obs:
+            return torch.tensor([state])
+        return torch.from_numpy(state)
 
     def sample(self) -> torch.Tensor:
         return torch.from_numpy(self.env.action_space.sample())
@@ -1,5 +1,14 @@
+from genrl.environments.vec_env.action_repeat import VecActionRepeat  # noqa
 from genrl.environments.vec_env.monitor import VecMonitor  # noqa
-from genrl.environments.vec_env.normalize import VecNormalize  # noqa
-from genrl.environments.vec_env.utils import RunningMeanStd  # noqa
+from genrl.environments.vec_env.normalize import VecNormalize, get_vec_normalize  # noqa
+from genrl.environments.vec_env.pool import (  # noqa
+    EnvFactory,
+    EnvPool,
+    PooledVecEnv,
+    get_env_pool,
+)
+from genrl.environments.vec_env.preprocessing import VecAtariPreprocessing  # noqa
+from genrl.environments.vec_env.utils import ObservationBatch, RunningMeanStd  # noqa
 from genrl.environments.vec_env.vector_envs import SerialVecEnv  # noqa
+from genrl.environments.vec_env.vector_envs import ThreadVecEnv  # noqa
 from genrl.environments.vec_env.vector_envs import SubProcessVecEnv, VecEnv
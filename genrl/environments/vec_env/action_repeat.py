@@ -0,0 +1,50 @@
+from typing import Tuple
+
+import torch
+
+from genrl.environments.vec_env.vector_envs import VecEnv
+from genrl.environments.vec_env.wrappers import VecEnvWrapper
+
+
+class VecActionRepeat(VecEnvWrapper):
+    """
+    Repeats every action for a fixed number of environment steps
+
+    The actions are repeated inside the vectorised environment (in the worker
+    processes for subprocess environments), so a single call to step, and so a
+    single forward pass of the policy, covers up to repeat environment steps.
+    Rewards are summed over the repeats and an environment stops repeating at
+    the end of its episode, so every step still returns a single transition.
+
+    Must directly wrap a Serial, Thread, SubProcess, pooled or batched VecEnv.
+
+    :param venv: Vectorized Environment
+    :param repeat: Number of times each action is taken
+    :type venv: Vectorized Environment
+    :type repeat: int
+    """
+
+    def __init__(self, venv: VecEnv, repeat: int = 4):
+        super(VecActionRepeat, self).__init__(venv)
+        if repeat < 1:
+            raise ValueError("repeat should be at least 1, got {}".format(repeat))
+        self.repeat = repeat
+
+    def step(self, actions: torch.Tensor) -> Tuple:
+        """
+        Repeats the actions in all the environments
+
+        :param actions: Actions to be taken for the Vectorized Environment
+        :type actions: torch.Tensor
+        :returns: States, summed rewards, dones, infos
+        """
+        return self.venv.step_repeat(actions, self.repeat)
+
+    def reset(self) -> torch.Tensor:
+        """
+        Resets Vectorized Environment
+
+        :returns: Initial observations
+        :rtype: torch.Tensor
+        """
+        return self.venv.reset()
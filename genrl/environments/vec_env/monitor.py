@@ -1,8 +1,7 @@
 import time
-from collections import deque
-from typing import Tuple
+from typing import Dict, Tuple
 
-import numpy as np
+import torch
 
 from genrl.environments.vec_env.wrappers import VecEnv, VecEnvWrapper
 
@@ -11,6 +10,13 @@ class VecMonitor(VecEnvWrapper):
     """
     Monitor class for VecEnvs. Saves important variables into the info dictionary
 
+    Returns and lengths of the running episodes are kept in tensors which are
+    updated for all environments at once, and those of the last history_length
+    finished episodes in preallocated ring buffers. Summary statistics over the
+    history are computed on demand with get_statistics. The time spent stepping
+    the environments, in the monitor and outside of step (ie. by the agent) is
+    accumulated and can be read with get_timing.
+
     :param venv: Vectorized Environment
     :param history_length: Length of history for episode rewards and episode lengths
     :param info_keys: Important variables to save
@@ -24,61 +30,147 @@ class VecMonitor(VecEnvWrapper):
 
         self.len = history_length
 
-        self.episode_returns = None
-        self.episode_lens = None
+        self.episode_returns = torch.zeros(self.n_envs)
+        self.episode_lens = torch.zeros(self.n_envs, dtype=torch.long)
         self.episode_count = 0
         self.tstart = time.time()
 
         self.keys = info_keys
 
-        if self.len:
-            self.returns_history = deque([], maxlen=self.len)
-            self.lens_history = deque([], maxlen=self.len)
+        self.returns_history = torch.zeros(self.len)
+        self.lens_history = torch.zeros(self.len, dtype=torch.long)
+
+        self.timing = {"env": 0.0, "monitor": 0.0, "agent": 0.0}
+        self.n_steps = 0
+        self._step_end = None
 
-    def reset(self) -> np.ndarray:
+    def reset(self) -> torch.Tensor:
         """
         Resets Vectorized Environment
 
         :returns: Initial observations
-        :rtype: Numpy Array
+        :rtype: torch.Tensor
         """
         observation = self.venv.reset()
-        self.episode_returns = np.zeros(self.n_envs, dtype=np.float32)
-        self.episode_lens = np.zeros(self.n_envs, dtype=int)
+        self.episode_returns.zero_()
+        self.episode_lens.zero_()
+        self._step_end = None
         return observation
 
-    def step(self, actions: np.ndarray) -> Tuple:
+    def reset_single_env(self, i: int) -> torch.Tensor:
+        """
+        Resets a single environment
+
+        :returns: Observations of all environments after the reset
+        :rtype: torch.Tensor
+        """
+        observations = self.venv.reset_single_env(i)
+        self.episode_returns[i] = 0
+        self.episode_lens[i] = 0
+        return observations
+
+    def step(self, actions: torch.Tensor) -> Tuple:
         """
         Steps through all the environments and records important information
 
         :param actions: Actions to be taken for the Vectorized Environment
-        :type actions: Numpy Array
+        :type actions: torch.Tensor
         :returns: States, rewards, dones, infos
         """
+        step_start = time.perf_counter()
         observations, rewards, dones, infos = self.venv.step(actions)
+        env_end = time.perf_counter()
 
-        self.episode_returns += rewards.numpy()
+        self.episode_returns += rewards
         self.episode_lens += 1
 
-        new_infos = infos.copy()
-        for i, done in enumerate(dones):
-            if done:
+        done_mask = torch.as_tensor(dones).bool()
+        done_idx = done_mask.nonzero(as_tuple=True)[0]
+        if len(done_idx):
+            returns = self.episode_returns[done_idx]
+            lens = self.episode_lens[done_idx]
+            self._add_to_history(returns, lens)
+
+            time_taken = round(time.time() - self.tstart, 4)
+            for i, episode_return, episode_len in zip(
+                done_idx.tolist(), returns.tolist(), lens.tolist()
+            ):
                 episode_info = {
-                    "Episode Rewards": self.episode_returns[i],
-                    "Episode Length": self.episode_lens[i],
-                    "Time taken": round(time.time() - self.tstart, 4),
+                    "Episode Rewards": episode_return,
+                    "Episode Length": episode_len,
+                    "Time taken": time_taken,
                 }
-
                 for key in self.keys:
-                    episode_info[key] = new_infos[i][key]
+                    episode_info[key] = infos[i][key]
+                infos[i]["episode"] = episode_info
+
+            self.episode_count += len(done_idx)
+            self.episode_returns.masked_fill_(done_mask, 0)
+            self.episode_lens.masked_fill_(done_mask, 0)
 
-                new_infos[i]["episode"] = episode_info
+        step_end = time.perf_counter()
+        if self._step_end is not None:
+            self.timing["agent"] += step_start - self._step_end
+        self.timing["env"] += env_end - step_start
+        self.timing["monitor"] += step_end - env_end
+        self.n_steps += 1
+        self._step_end = step_end
 
-                if self.len:
-                    self.returns_history.append(self.episode_returns[i])
-                    self.lens_history.append(self.episode_lens[i])
+        return observations, rewards, dones, infos
 
-                self.episode_count += 1
-                self.episode_returns[i] = 0
-                self.episode_lens[i] = 0
-        return observations, rewards, dones, new_infos
+    def _add_to_history(self, returns: torch.Tensor, lens: torch.Tensor):
+        """
+        Writes returns and lengths of finished episodes into the ring buffers
+        """
+        if not self.len:
+            return
+        # Only the most recent episodes fit if more finish than the history holds
+        start = self.episode_count + max(len(returns) - self.len, 0)
+        returns, lens = returns[-self.len :], lens[-self.len :]
+        idx = torch.arange(start, start + len(returns)).remainder_(self.len)
+        self.returns_history[idx] = returns
+        self.lens_history[idx] = lens
+
+    def get_statistics(self, percentiles: Tuple = (25, 50, 75)) -> Dict[str, float]:
+        """
+        Computes summary statistics of the episodes in the history
+
+        :param percentiles: Percentiles of the episode returns and lengths to compute
+        :type percentiles: tuple or list
+        :returns: Mean, standard deviation, minimum, maximum and percentiles of the
+            returns and lengths of the last history_length episodes
+        :rtype: dict
+        """
+        n_episodes = min(self.episode_count, self.len)
+        statistics = {"Episodes": self.episode_count}
+        if n_episodes == 0:
+            return statistics
+
+        q = torch.tensor(percentiles, dtype=torch.float32) / 100
+        for name, history in (
+            ("Episode Rewards", self.returns_history),
+            ("Episode Length", self.lens_history),
+        ):
+            values = history[:n_episodes].float()
+            statistics["{} Mean".format(name)] = values.mean().item()
+            statistics["{} Std".format(name)] = values.std(unbiased=False).item()
+            statistics["{} Min".format(name)] = values.min().item()
+            statistics["{} Max".format(name)] = values.max().item()
+            for p, value in zip(percentiles, torch.quantile(values, q).tolist()):
+                statistics["{} P{}".format(name, p)] = value
+        return statistics
+
+    def get_timing(self) -> Dict[str, float]:
+        """
+        Returns the breakdown of the time spent per vectorised step
+
+        :returns: Mean time (in seconds) per step spent in the environments, in the
+            monitor and between steps (ie. by the agent), and the total time of each
+        :rtype: dict
+        """
+        n_steps = max(self.n_steps, 1)
+        timing = {"Steps": self.n_steps}
+        for key, total in self.timing.items():
+            timing["{} time".format(key.capitalize())] = total / n_steps
+            timing["Total {} time".format(key)] = total
+        return timing
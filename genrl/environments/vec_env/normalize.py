@@ -1,6 +1,6 @@
-from typing import Any, Tuple
+from typing import Any, Dict, Optional, Tuple
 
-import numpy as np
+import torch
 
 from genrl.environments.vec_env.utils import RunningMeanStd
 from genrl.environments.vec_env.vector_envs import VecEnv
@@ -11,16 +11,21 @@ class VecNormalize(VecEnvWrapper):
     """
     Wrapper to implement Normalization of observations and rewards for VecEnvs
 
+    When frozen, the running statistics are used as they are and not updated,
+    eg. while evaluating or serving an agent trained on normalized environments.
+
     :param venv: The Vectorized environment
     :param n_envs: Number of environments in VecEnv
     :param norm_obs: True if observations should be normalized, else False
     :param norm_reward: True if rewards should be normalized, else False
     :param clip_reward: Maximum absolute value for rewards
+    :param frozen: True if the running statistics should not be updated
     :type venv: Vectorized Environment
     :type n_envs: int
     :type norm_obs: bool
     :type norm_reward: bool
     :type clip_reward: float
+    :type frozen: bool
     """
 
     def __init__(
@@ -29,13 +34,15 @@ class VecNormalize(VecEnvWrapper):
         norm_obs: bool = True,
         norm_reward: bool = True,
         clip_reward: float = 20.0,
+        frozen: bool = False,
     ):
         super(VecNormalize, self).__init__(venv)
 
         self.obs_rms = RunningMeanStd(shape=self.obs_shape) if norm_obs else False
-        self.reward_rms = RunningMeanStd(shape=(1, 1)) if norm_reward else False
+        self.reward_rms = RunningMeanStd(shape=()) if norm_reward else False
 
         self.clip_reward = clip_reward
+        self.frozen = frozen
 
     def __getattr__(self, name: str) -> Any:
         """
@@ -48,26 +55,24 @@ class VecNormalize(VecEnvWrapper):
         venv = super(VecNormalize, self).__getattribute__("venv")
         return getattr(venv, name)
 
-    def step(self, actions: np.ndarray) -> Tuple:
+    def step(self, actions: torch.Tensor) -> Tuple:
         """
         Steps through all the environments and normalizes the observations and rewards (if enabled)
 
         :param actions: Actions to be taken for the Vectorized Environment
-        :type actions: Numpy Array
+        :type actions: torch.Tensor
         :returns: States, rewards, dones, infos
         """
         states, rewards, dones, infos = self.venv.step(actions)
 
         states = self._normalize(self.obs_rms, None, states)
-        rewards = self._normalize(self.reward_rms, self.clip_reward, rewards).reshape(
-            self.n_envs,
-        )
+        rewards = self._normalize(self.reward_rms, self.clip_reward, rewards)
 
         return states, rewards, dones, infos
 
     def _normalize(
-        self, rms: RunningMeanStd, clip: float, batch: np.ndarray
-    ) -> np.ndarray:
+        self, rms: RunningMeanStd, clip: Optional[float], batch: torch.Tensor
+    ) -> torch.Tensor:
         """
         Function to normalize and clip a given RMS
 
@@ -76,29 +81,97 @@ class VecNormalize(VecEnvWrapper):
         :param batch: Batch of observations/rewards to be normalized and clipped
         :type rms: object
         :type clip: float
-        :type batch: Numpy Array
+        :type batch: torch.Tensor
         :returns: Normalized observations/rewards
-        :rtype: Numpy Array
+        :rtype: torch.Tensor
         """
         if rms:
-            rms.update(batch)
-            batch = (batch - rms.mean) / np.sqrt(rms.var + 1e-8)
-        if clip:
-            batch = np.clip(batch, -clip, clip)
+            if not self.frozen:
+                rms.update(batch)
+            batch = rms.normalize(batch)
+            if clip:
+                batch.clamp_(-clip, clip)
+        elif clip:
+            batch = batch.clamp(-clip, clip)
         return batch
 
-    def reset(self) -> np.ndarray:
+    def reset(self) -> torch.Tensor:
         """
         Resets Vectorized Environment
 
         :returns: Initial observations
-        :rtype: Numpy Array
+        :rtype: torch.Tensor
         """
         states = self.venv.reset()
         return self._normalize(self.obs_rms, None, states)
 
+    def reset_single_env(self, i: int) -> torch.Tensor:
+        """
+        Resets a single environment
+
+        The observations are normalized without updating the running statistics, as
+        those of the other environments were already used in the last step.
+
+        :returns: Observations of all environments after the reset
+        :rtype: torch.Tensor
+        """
+        states = self.venv.reset_single_env(i)
+        return self.obs_rms.normalize(states) if self.obs_rms else states
+
+    def freeze(self):
+        """
+        Stops updating the running statistics
+        """
+        self.frozen = True
+
+    def unfreeze(self):
+        """
+        Resumes updating the running statistics
+        """
+        self.frozen = False
+
+    def state_dict(self) -> Dict:
+        """
+        Returns the running statistics so that they can be saved
+
+        :returns: Statistics of the observations and rewards
+        :rtype: dict
+        """
+        return {
+            "obs_rms": self.obs_rms.state_dict() if self.obs_rms else None,
+            "reward_rms": self.reward_rms.state_dict() if self.reward_rms else None,
+        }
+
+    def load_state_dict(self, state_dict: Dict):
+        """
+        Loads running statistics returned by state_dict
+
+        :param state_dict: Saved statistics of the observations and rewards
+        :type state_dict: dict
+        """
+        if self.obs_rms and state_dict["obs_rms"] is not None:
+            self.obs_rms.load_state_dict(state_dict["obs_rms"])
+        if self.reward_rms and state_dict["reward_rms"] is not None:
+            self.reward_rms.load_state_dict(state_dict["reward_rms"])
+
     def close(self):
         """
         Close all individual environments in the Vectorized Environment
         """
         self.venv.close()
+
+
+def get_vec_normalize(venv: VecEnv) -> Optional[VecNormalize]:
+    """
+    Finds the VecNormalize wrapper in a stack of VecEnv wrappers
+
+    :param venv: Vectorized Environment, possibly wrapped
+    :type venv: Vectorized Environment
+    :returns: The VecNormalize wrapper if there is one, else None
+    :rtype: VecNormalize
+    """
+    while isinstance(venv, VecEnvWrapper):
+        if isinstance(venv, VecNormalize):
+            return venv
+        venv = venv.venv
+    return None
@@ -0,0 +1,325 @@
+import atexit
+import multiprocessing as mp
+import pickle
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import gym
+import torch
+
+from genrl.environments.vec_env.utils import ObservationBatch
+from genrl.environments.vec_env.vector_envs import (
+    SubProcessVecEnv,
+    get_attr,
+    repeat_step,
+    to_numpy,
+)
+
+# Maximum number of environments kept alive by each worker of an EnvPool
+MAX_CACHED_ENVS = 4
+
+
+class EnvFactory:
+    """
+    Picklable factory building a single wrapped environment
+
+    Environments are built inside the pool workers by calling the factory, so
+    only the factory (and not the environment) is ever sent across processes.
+    Gym environments are built directly as a single FusedTorchEnv.
+
+    :param env_id: Gym ID of the environment
+    :param env_type: Type of environment ["gym", "atari", "atari_screens"]
+    :type env_id: string
+    :type env_type: string
+    """
+
+    def __init__(self, env_id: str, env_type: str = "gym"):
+        self.env_id = env_id
+        self.env_type = env_type
+
+    def __call__(self) -> gym.Env:
+        from genrl.environments.fused import FusedTorchEnv
+        from genrl.environments.suite import AtariEnv, AtariScreensEnv
+        from genrl.environments.torch import TorchWrapper
+
+        if self.env_type == "atari":
+            return TorchWrapper(AtariEnv(self.env_id))
+        elif self.env_type == "atari_screens":
+            return TorchWrapper(AtariScreensEnv(self.env_id))
+        return FusedTorchEnv(gym.make(self.env_id))
+
+    @property
+    def spec(self) -> gym.envs.registration.EnvSpec:
+        return gym.spec(self.env_id)
+
+    def __repr__(self) -> str:
+        return "EnvFactory({!r}, env_type={!r})".format(self.env_id, self.env_type)
+
+
+def pool_worker(parent_conn: mp.Pipe, child_conn: mp.Pipe):
+    """
+    Worker process of the EnvPool
+
+    Environments are built from the pickled factories sent with the "make" command
+    and kept alive in the worker, so that a later request for the same factory
+    reuses the already constructed environment. At most MAX_CACHED_ENVS
+    environments are kept, the least recently used one being closed first.
+
+    :param parent_conn: Parent connection of Pipe
+    :param child_conn: Child connection of Pipe
+    :type parent_conn: Multiprocessing Pipe Connection
+    :type child_conn: Multiprocessing Pipe Connection
+    """
+    parent_conn.close()
+    envs = OrderedDict()
+    env = None
+    while True:
+        try:
+            cmd, data = child_conn.recv()
+        except EOFError:
+            break
+
+        if cmd == "make":
+            try:
+                if data not in envs:
+                    envs[data] = pickle.loads(data)()
+                envs.move_to_end(data)
+                env = envs[data]
+                while len(envs) > MAX_CACHED_ENVS:
+                    envs.popitem(last=False)[1].close()
+                child_conn.send((env.observation_space, env.action_space))
+            except Exception as e:
+                child_conn.send(e)
+        elif cmd == "step":
+            observation, reward, done, info = env.step(data)
+            child_conn.send((to_numpy(observation), reward, done, info))
+        elif cmd == "step_repeat":
+            observation, reward, done, info = repeat_step(env, *data)
+            child_conn.send((to_numpy(observation), reward, done, info))
+        elif cmd == "seed":
+            child_conn.send(env.seed(data))
+        elif cmd == "reset":
+            child_conn.send(to_numpy(env.reset()))
+        elif cmd == "render":
+            child_conn.send(env.render())
+        elif cmd == "get_spaces":
+            child_conn.send((env.observation_space, env.action_space))
+        elif cmd == "get_attr":
+            child_conn.send(get_attr(env, data))
+        elif cmd == "close":
+            for cached_env in envs.values():
+                cached_env.close()
+            child_conn.close()
+            break
+        else:
+            raise NotImplementedError
+
+
+class _PoolWorker:
+    """
+    Handle on a single worker process of the EnvPool
+    """
+
+    def __init__(self):
+        self.conn, child_conn = mp.Pipe()
+        self.process = mp.Process(
+            target=pool_worker, args=(self.conn, child_conn), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        # Keys of the environments cached by the worker, least recently used first
+        self.cached = []
+
+    def cache(self, key: bytes):
+        """
+        Records that the worker built (or reused) an environment, evicting the
+        least recently used ones like the worker does
+        """
+        if key in self.cached:
+            self.cached.remove(key)
+        self.cached = (self.cached + [key])[-MAX_CACHED_ENVS:]
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+
+class EnvPool:
+    """
+    Pool of persistent environment worker processes
+
+    Workers are started on demand and returned to the pool when the vectorised
+    environment using them is closed, so that consecutive runs (eg. trials of a
+    hyperparameter search) do not pay for process startup and env construction
+    again. Workers which already built the requested environment are preferred.
+
+    Use ``get_env_pool`` to get the pool shared by the whole process, which is
+    shut down on interpreter exit.
+    """
+
+    def __init__(self):
+        self.idle = []
+        self.busy = []
+
+    def make(
+        self,
+        env_fn: EnvFactory,
+        n_envs: int = 2,
+        copy_obs: bool = True,
+        pin_memory: bool = False,
+    ) -> "PooledVecEnv":
+        """
+        Hands out a vectorised environment running on pooled workers
+
+        :param env_fn: Picklable callable building a single environment
+        :param n_envs: Number of environments
+        :param copy_obs: True if the observations returned should be copies of the \
+batch. If False, they are overwritten by the next step or reset
+        :param pin_memory: True if the batch of observations should be in pinned memory
+        :type env_fn: callable
+        :type n_envs: int
+        :type copy_obs: bool
+        :type pin_memory: bool
+        :returns: Reset vectorised environment
+        :rtype: PooledVecEnv
+        """
+        key = pickle.dumps(env_fn)
+
+        # Workers may have died (eg. killed) while idle
+        self.idle = [w for w in self.idle if w.alive()]
+        self.idle.sort(key=lambda w: key not in w.cached)
+        workers = self.idle[:n_envs]
+        self.idle = self.idle[n_envs:]
+        workers += [_PoolWorker() for _ in range(n_envs - len(workers))]
+        self.busy += workers
+
+        # Send all the requests before waiting so that envs are built in parallel
+        for w in workers:
+            w.conn.send(("make", key))
+        spaces = [w.conn.recv() for w in workers]
+
+        for w, result in zip(workers, spaces):
+            if isinstance(result, Exception):
+                self.release(workers)
+                raise result
+            w.cache(key)
+
+        venv = PooledVecEnv(self, workers, env_fn, spaces, copy_obs, pin_memory)
+        venv.reset()
+        return venv
+
+    def release(self, workers: List[_PoolWorker]):
+        """
+        Returns workers to the pool
+
+        Workers whose process is no longer alive are dropped instead
+
+        :param workers: Workers handed out by make
+        :type workers: list
+        """
+        for w in workers:
+            if w in self.busy:
+                self.busy.remove(w)
+                if w.alive():
+                    self.idle.append(w)
+                else:
+                    w.conn.close()
+
+    def close(self):
+        """
+        Closes all the environments and shuts down the worker processes
+        """
+        for w in self.idle + self.busy:
+            try:
+                w.conn.send(("close", None))
+            except (BrokenPipeError, EOFError):
+                pass
+        for w in self.idle + self.busy:
+            w.process.join(timeout=1)
+            if w.process.is_alive():
+                w.process.terminate()
+        self.idle = []
+        self.busy = []
+
+    @property
+    def n_workers(self) -> int:
+        return len(self.idle) + len(self.busy)
+
+
+class PooledVecEnv(SubProcessVecEnv):
+    """
+    Vectorised environment running on the workers of an EnvPool
+
+    Behaves like SubProcessVecEnv, except that no environment is built in the
+    parent process and closing it returns the workers to the pool instead of
+    shutting them down.
+
+    :param pool: Pool owning the workers
+    :param workers: Workers on which the environments were built
+    :param env_fn: Factory used to build the environments
+    :param spaces: Observation and action spaces of each environment
+    :param copy_obs: True if the observations returned should be copies of the \
+batch. If False, they are overwritten by the next step or reset
+    :param pin_memory: True if the batch of observations should be in pinned memory
+    :type pool: EnvPool
+    :type workers: list
+    :type env_fn: callable
+    :type spaces: list
+    :type copy_obs: bool
+    :type pin_memory: bool
+    """
+
+    def __init__(
+        self,
+        pool: EnvPool,
+        workers: List[_PoolWorker],
+        env_fn: EnvFactory,
+        spaces: List[Tuple],
+        copy_obs: bool = True,
+        pin_memory: bool = False,
+    ):
+        self.envs = []
+        self.env = None
+        self._n_envs = len(workers)
+        self.episode_reward = torch.zeros(self.n_envs)
+        self.spaces = spaces
+        self.observation_space, self.action_space = spaces[0]
+
+        self.pool = pool
+        self.workers = workers
+        self.env_fn = env_fn
+        self.procs = [w.process for w in workers]
+        self.parent_conns = [w.conn for w in workers]
+        self.waiting = False
+        self.closed = False
+        self.obs_batch = ObservationBatch(
+            self.n_envs, self.obs_shape, copy_obs, pin_memory, self.obs_dtype
+        )
+
+    def close(self):
+        """
+        Returns the workers (and the environments built on them) to the pool
+        """
+        if self.closed:
+            return
+        if self.waiting:
+            for parent_conn in self.parent_conns:
+                parent_conn.recv()
+            self.waiting = False
+        self.pool.release(self.workers)
+        self.closed = True
+
+
+_ENV_POOL: Dict[str, EnvPool] = {}
+
+
+def get_env_pool() -> EnvPool:
+    """
+    Returns the EnvPool shared by the process, starting it if needed
+
+    :returns: Shared environment pool
+    :rtype: EnvPool
+    """
+    if "pool" not in _ENV_POOL:
+        _ENV_POOL["pool"] = EnvPool()
+        atexit.register(_ENV_POOL["pool"].close)
+    return _ENV_POOL["pool"]
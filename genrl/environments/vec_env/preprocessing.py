@@ -0,0 +1,138 @@
+from typing import Tuple
+
+import numpy as np
+import torch
+from gym.spaces import Box
+
+from genrl.environments.vec_env.vector_envs import VecEnv
+from genrl.environments.vec_env.wrappers import VecEnvWrapper
+
+
+class VecAtariPreprocessing(VecEnvWrapper):
+    """
+    Batched image preprocessing for vectorised Atari environments
+
+    The environments only do the frameskip (see AtariScreens) and return their last
+    two raw screens. Grayscale conversion, max pooling over the two screens,
+    downsampling with area interpolation and frame stacking are then done for all
+    the environments at once as tensor operations. The frame stacks are kept in
+    uint8, like the observation space, and returned as float32 observations.
+
+    :param venv: Vectorized Environment of AtariScreens environments
+    :param grayscale: Whether or not the output should be converted to grayscale
+    :param screen_size: Size of the output screen (square output)
+    :param framestack: Number of frames to be stacked
+    :type venv: Vectorized Environment
+    :type grayscale: boolean
+    :type screen_size: int
+    :type framestack: int
+    """
+
+    # ITU-R 601-2 luma transform, as used by cv2.cvtColor
+    rgb_weights = torch.tensor([0.299, 0.587, 0.114])
+
+    def __init__(
+        self,
+        venv: VecEnv,
+        grayscale: bool = True,
+        screen_size: int = 84,
+        framestack: int = 4,
+    ):
+        super(VecAtariPreprocessing, self).__init__(venv)
+
+        self.grayscale = grayscale
+        self.screen_size = screen_size
+        self.framestack = framestack
+        # Raw screens are (2, height, width, 3) or (2, height, width) if grayscale
+        self.rgb = len(venv.observation_space.shape) == 4
+
+        frame_shape = (screen_size, screen_size)
+        if self.rgb and not grayscale:
+            frame_shape = (3, *frame_shape)
+        self.observation_space = Box(
+            low=0, high=255, shape=(framestack, *frame_shape), dtype=np.uint8
+        )
+
+        self.stacks = torch.zeros(
+            self.n_envs, *self.observation_space.shape, dtype=torch.uint8
+        )
+
+        height, width = venv.observation_space.shape[1:3]
+        self.resize_h = area_weights(height, screen_size)
+        self.resize_w = area_weights(width, screen_size)
+
+    def _process(self, screens: torch.Tensor) -> torch.Tensor:
+        """
+        Converts batches of raw screen pairs to single preprocessed frames
+
+        :param screens: Raw screens of shape (batch_size, 2, height, width[, 3])
+        :type screens: torch.Tensor
+        :returns: uint8 frames of shape (batch_size[, 3], screen_size, screen_size)
+        :rtype: torch.Tensor
+        """
+        screens = screens.float()
+        if self.rgb and self.grayscale:
+            screens = screens @ self.rgb_weights
+        elif self.rgb:
+            screens = screens.permute(0, 1, 4, 2, 3)
+
+        frames = screens.amax(dim=1)
+        frames = self.resize_h @ frames @ self.resize_w.T
+        return frames.round_().clamp_(0, 255).to(torch.uint8)
+
+    def step(self, actions: torch.Tensor) -> Tuple:
+        """
+        Steps through all the environments and preprocesses their screens
+
+        :param actions: Actions to be taken for the Vectorized Environment
+        :type actions: torch.Tensor
+        :returns: Stacked frames, rewards, dones, infos
+        """
+        screens, rewards, dones, infos = self.venv.step(actions)
+        frames = self._process(screens)
+        self.stacks = torch.cat([self.stacks[:, 1:], frames.unsqueeze(1)], dim=1)
+        return self.stacks.float(), rewards, dones, infos
+
+    def reset(self) -> torch.Tensor:
+        """
+        Resets Vectorized Environment
+
+        :returns: Initial stacked frames
+        :rtype: torch.Tensor
+        """
+        frames = self._process(self.venv.reset())
+        self.stacks[:] = frames.unsqueeze(1)
+        return self.stacks.float()
+
+    def reset_single_env(self, i: int) -> torch.Tensor:
+        """
+        Resets a single environment
+
+        :returns: Stacked frames of all environments after the reset
+        :rtype: torch.Tensor
+        """
+        screens = self.venv.reset_single_env(i)
+        self.stacks[i] = self._process(screens[i : i + 1])
+        return self.stacks.float()
+
+
+def area_weights(in_size: int, out_size: int) -> torch.Tensor:
+    """
+    Weights for downsampling one dimension with area interpolation
+
+    Each output pixel is the average of the input pixels it covers, weighted by the
+    fraction of each input pixel covered (like cv2.INTER_AREA), so that resizing is
+    a product with these weights along each dimension.
+
+    :param in_size: Size of the input dimension
+    :param out_size: Size of the output dimension
+    :type in_size: int
+    :type out_size: int
+    :returns: Weights of shape (out_size, in_size)
+    :rtype: torch.Tensor
+    """
+    scale = in_size / out_size
+    start = torch.arange(out_size, dtype=torch.float64).unsqueeze(1) * scale
+    pixels = torch.arange(in_size, dtype=torch.float64).unsqueeze(0)
+    overlap = torch.min(start + scale, pixels + 1) - torch.max(start, pixels)
+    return (overlap.clamp(min=0) / scale).float()
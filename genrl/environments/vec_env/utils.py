@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Any, Dict, List, Tuple
 
 import torch
 
@@ -7,6 +7,8 @@ class RunningMeanStd:
     """
     Utility Function to compute a running mean and variance calculator
 
+    The statistics are float32 tensors which are updated in-place.
+
     :param epsilon: Small number to prevent division by zero for calculations
     :param shape: Shape of the RMS object
     :type epsilon: float
@@ -14,25 +16,118 @@ class RunningMeanStd:
     """
 
     def __init__(self, epsilon: float = 1e-4, shape: Tuple = ()):
-        self.mean = torch.zeros(shape).double()
-        self.var = torch.ones(shape).double()
+        self.mean = torch.zeros(shape)
+        self.var = torch.ones(shape)
         self.count = epsilon
 
     def update(self, batch: torch.Tensor):
-        batch_mean = torch.mean(batch, axis=0)
-        batch_var = torch.var(batch, axis=0)
+        batch = batch.to(self.mean.dtype)
+        batch_mean = torch.mean(batch, dim=0)
+        batch_var = torch.var(batch, dim=0, unbiased=False)
         batch_count = batch.shape[0]
 
         total_count = self.count + batch_count
         delta = batch_mean - self.mean
 
-        new_mean = self.mean + delta * batch_count / total_count
-        M2 = (
-            self.var * self.count
-            + batch_var * batch_count
-            + (delta ** 2) * self.count * batch_count / total_count
+        self.mean.add_(delta, alpha=batch_count / total_count)
+        # var <- (var * count + batch_var * batch_count + delta^2 * count * batch_count / total) / total
+        self.var.mul_(self.count).add_(batch_var, alpha=batch_count)
+        self.var.add_(delta.square_(), alpha=self.count * batch_count / total_count)
+        self.var.div_(total_count)
+        self.count = total_count
+
+    def normalize(self, batch: torch.Tensor, epsilon: float = 1e-8) -> torch.Tensor:
+        """
+        Normalizes a batch with the current statistics
+
+        :param batch: Batch to be normalized
+        :param epsilon: Small number added to the variance to prevent division by zero
+        :type batch: torch.Tensor
+        :type epsilon: float
+        :returns: Normalized batch (a new tensor)
+        :rtype: torch.Tensor
+        """
+        batch = torch.sub(batch.to(self.mean.dtype), self.mean)
+        return batch.mul_(torch.rsqrt(self.var + epsilon))
+
+    def state_dict(self) -> Dict:
+        """
+        Returns the statistics so that they can be saved
+        """
+        return {"mean": self.mean.clone(), "var": self.var.clone(), "count": self.count}
+
+    def load_state_dict(self, state_dict: Dict):
+        """
+        Loads statistics returned by state_dict
+
+        :param state_dict: Saved statistics
+        :type state_dict: dict
+        """
+        self.mean.copy_(state_dict["mean"])
+        self.var.copy_(state_dict["var"])
+        self.count = state_dict["count"]
+
+
+class ObservationBatch:
+    """
+    Preallocated contiguous batch of observations of all the environments
+
+    Environments write their observations straight into a single (n_envs, ...)
+    NumPy array, which shares its memory with the torch tensor handed out by the
+    vectorised environments, so no per-environment tensor is allocated and no
+    stacking is needed.
+
+    :param n_envs: Number of environments
+    :param shape: Shape of the observation of a single environment
+    :param copy: True if get should return a copy of the batch. Otherwise the \
+tensor itself is returned, and is overwritten by the next step or reset
+    :param pin_memory: True if the batch should be in pinned memory (for faster \
+transfers to the GPU). Ignored if CUDA is not available
+    :param dtype: Data type of the observations
+    :type n_envs: int
+    :type shape: tuple
+    :type copy: bool
+    :type pin_memory: bool
+    :type dtype: torch.dtype
+    """
+
+    def __init__(
+        self,
+        n_envs: int,
+        shape: Tuple,
+        copy: bool = True,
+        pin_memory: bool = False,
+        dtype: torch.dtype = torch.float32,
+    ):
+        self.copy = copy
+        self.tensor = torch.zeros(
+            n_envs,
+            *shape,
+            dtype=dtype,
+            pin_memory=pin_memory and torch.cuda.is_available(),
         )
+        self.array = self.tensor.numpy()
 
-        self.mean = new_mean
-        self.var = M2 / (total_count - 1)
-        self.count = total_count
+    def __setitem__(self, index: int, observation: Any):
+        """
+        Writes the observation of an environment (NumPy array or tensor) in place
+        """
+        self.array[index] = observation
+
+    def write(self, observations: List) -> None:
+        """
+        Writes the observations of all the environments in place
+
+        :param observations: Observation of each environment
+        :type observations: list
+        """
+        for i, observation in enumerate(observations):
+            self.array[i] = observation
+
+    def get(self) -> torch.Tensor:
+        """
+        Returns the batch as a tensor (a copy unless copy is False)
+
+        :rtype: torch.Tensor
+        """
+        return self.tensor.clone() if self.copy else self.tensor
@@ -1,34 +1,87 @@
 import multiprocessing as mp
+import os
+import pickle
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from typing import Any, Iterator, List, Tuple
+from typing import Any, Callable, Iterator, List, Tuple, Union
 
 import gym
+import numpy as np
 import torch
 
+from genrl.environments.vec_env.utils import ObservationBatch
 
-def worker(parent_conn: mp.Pipe, child_conn: mp.Pipe, env: gym.Env):
+
+def repeat_step(env: gym.Env, action: Any, repeat: int) -> Tuple:
+    """
+    Repeats an action in an environment, stopping at the end of the episode
+
+    :param env: Environment to be stepped
+    :param action: Action to be repeated
+    :param repeat: Maximum number of times the action is taken
+    :type env: Gym Environment
+    :type repeat: int
+    :returns: Last observation, sum of the rewards, done and last info
+    """
+    total_reward = 0.0
+    for _ in range(repeat):
+        observation, reward, done, info = env.step(action)
+        total_reward += reward
+        if done:
+            break
+    return observation, total_reward, done, info
+
+
+def to_numpy(observation: Any) -> Any:
+    """
+    Converts tensor observations to NumPy arrays before sending them between processes
+
+    Pickling a NumPy array is much cheaper than sharing a tensor between processes,
+    and the parent writes the observations into its batch anyway.
+    """
+    if isinstance(observation, torch.Tensor):
+        return observation.numpy()
+    return observation
+
+
+def worker(parent_conn: mp.Pipe, child_conn: mp.Pipe, env: Union[gym.Env, Callable]):
     """
     Worker class to facilitate multiprocessing
 
+    If a factory is passed instead of an environment, the environment is built
+    inside the worker. The spaces of the environment (or the exception raised
+    while building it) are sent back once on startup.
+
     :param parent_conn: Parent connection of Pipe
     :param child_conn: Child connection of Pipe
-    :param env: Gym environment we need multiprocessing for
+    :param env: Gym environment we need multiprocessing for, or a factory building it
     :type parent_conn: Multiprocessing Pipe Connection
     :type child_conn: Multiprocessing Pipe Connection
-    :type env: Gym Environment
+    :type env: Gym Environment or callable
     """
     parent_conn.close()
+    if not isinstance(env, gym.Env):
+        try:
+            env = env()
+        except Exception as e:
+            child_conn.send(e)
+            child_conn.close()
+            return
+    child_conn.send((env.observation_space, env.action_space))
+
     while True:
         cmd, data = child_conn.recv()
         if cmd == "step":
             observation, reward, done, info = env.step(data)
-            child_conn.send((observation, reward, done, info))
+            child_conn.send((to_numpy(observation), reward, done, info))
+        elif cmd == "step_repeat":
+            observation, reward, done, info = repeat_step(env, *data)
+            child_conn.send((to_numpy(observation), reward, done, info))
         elif cmd == "seed":
             child_conn.send(env.seed(data))
         elif cmd == "reset":
-            observation = env.reset()
-            child_conn.send(observation)
+            child_conn.send(to_numpy(env.reset()))
         elif cmd == "render":
             child_conn.send(env.render())
         elif cmd == "close":
@@ -37,10 +90,34 @@ def worker(parent_conn: mp.Pipe, child_conn: mp.Pipe, env: gym.Env):
             break
         elif cmd == "get_spaces":
             child_conn.send((env.observation_space, env.action_space))
+        elif cmd == "get_attr":
+            child_conn.send(get_attr(env, data))
         else:
             raise NotImplementedError
 
 
+def get_attr(env: gym.Env, name: str) -> Tuple[bool, Any]:
+    """
+    Looks up an attribute of an environment for the parent process
+
+    Errors (a missing attribute, or a value which cannot be pickled) are sent
+    back instead of being raised, so that they do not kill the worker
+
+    :param env: Environment of the worker
+    :param name: Name of the attribute
+    :type env: Gym Environment
+    :type name: string
+    :returns: (True and the attribute, or False and the description of the error)
+    :rtype: tuple
+    """
+    try:
+        value = getattr(env, name)
+        pickle.dumps(value)
+        return True, value
+    except Exception as e:
+        return False, repr(e)
+
+
 class VecEnv(ABC):
     """
     Base class for multiple environments.
@@ -95,6 +172,18 @@ class VecEnv(ABC):
     def step(self, actions):
         raise NotImplementedError
 
+    def step_repeat(self, actions: torch.Tensor, repeat: int) -> Tuple:
+        """
+        Repeats the actions in every environment (see VecActionRepeat)
+
+        :param actions: Actions to be repeated
+        :param repeat: Maximum number of times the actions are taken
+        :type actions: torch.Tensor
+        :type repeat: int
+        :returns: States, summed rewards, dones, infos
+        """
+        raise NotImplementedError
+
     @abstractmethod
     def close(self):
         raise NotImplementedError
@@ -125,6 +214,13 @@ class VecEnv(ABC):
             raise NotImplementedError
         return obs_shape
 
+    @property
+    def obs_dtype(self) -> torch.dtype:
+        # Discrete observations are kept as (compact) indices
+        if isinstance(self.observation_space, gym.spaces.Discrete):
+            return torch.long
+        return torch.float32
+
     @property
     def action_shape(self):
         if isinstance(self.action_space, gym.spaces.Box):
@@ -139,14 +235,32 @@ class VecEnv(ABC):
 class SerialVecEnv(VecEnv):
     """
     Constructs a wrapper for serial execution through envs.
+
+    Observations are written in place into a preallocated ObservationBatch.
+
+    :param envs: Environments to be vectorised
+    :param n_envs: Number of environments
+    :param copy_obs: True if the observations returned should be copies of the \
+batch. If False, they are overwritten by the next step or reset
+    :param pin_memory: True if the batch of observations should be in pinned memory
+    :type envs: list
+    :type n_envs: int
+    :type copy_obs: bool
+    :type pin_memory: bool
     """
 
-    def __init__(self, *args, **kwargs):
-        super(SerialVecEnv, self).__init__(*args, **kwargs)
-        self.states = torch.zeros(
-            self.n_envs,
-            *self.obs_shape,
+    def __init__(
+        self,
+        envs: List,
+        n_envs: int = 2,
+        copy_obs: bool = True,
+        pin_memory: bool = False,
+    ):
+        super(SerialVecEnv, self).__init__(envs, n_envs)
+        self.obs_batch = ObservationBatch(
+            self.n_envs, self.obs_shape, copy_obs, pin_memory, self.obs_dtype
         )
+        self.states = self.obs_batch.tensor
         self.rewards = torch.zeros(self.n_envs)
         self.dones = torch.zeros(self.n_envs)
         self.infos = [{} for _ in range(self.n_envs)]
@@ -158,15 +272,26 @@ class SerialVecEnv(VecEnv):
         :param actions: Actions from the model
         :type actions: Iterable of ints/floats
         """
+        return self.step_repeat(actions, 1)
+
+    def step_repeat(self, actions: torch.Tensor, repeat: int) -> Tuple:
+        """
+        Repeats the actions in all envs serially, stopping at episode ends
+
+        :param actions: Actions from the model
+        :param repeat: Maximum number of times the actions are taken
+        :type actions: Iterable of ints/floats
+        :type repeat: int
+        """
         for i, env in enumerate(self.envs):
-            obs, reward, done, info = env.step(actions[i])
-            self.states[i] = obs
+            obs, reward, done, info = repeat_step(env, actions[i], repeat)
+            self.obs_batch[i] = obs
             self.episode_reward[i] += reward
             self.rewards[i] = reward
             self.dones[i] = done
             self.infos[i] = info
         return (
-            self.states.detach().clone(),
+            self.obs_batch.get(),
             self.rewards.detach().clone(),
             self.dones.detach().clone(),
             deepcopy(self.infos),
@@ -177,19 +302,19 @@ class SerialVecEnv(VecEnv):
         Resets all envs
         """
         for i, env in enumerate(self.envs):
-            self.states[i] = env.reset()
+            self.obs_batch[i] = env.reset()
         self.episode_reward = torch.zeros(self.n_envs)
 
-        return self.states.detach().clone()
+        return self.obs_batch.get()
 
     def reset_single_env(self, i: int) -> torch.Tensor:
         """
         Resets single environment
         """
-        self.states[i] = self.envs[i].reset()
+        self.obs_batch[i] = self.envs[i].reset()
         self.episode_reward[i] = 0
 
-        return self.states.detach().clone()
+        return self.obs_batch.get()
 
     def close(self):
         """
@@ -218,21 +343,158 @@ class SerialVecEnv(VecEnv):
         self.env.render()
 
 
+class ThreadVecEnv(SerialVecEnv):
+    """
+    Constructs a wrapper for parallel execution through envs on a thread pool.
+
+    Meant for environments which spend most of a step in native code that releases
+    the GIL (eg. Box2D, ALE). The envs are split into contiguous chunks, one per
+    thread, and every thread writes its results directly into the preallocated
+    state, reward and done tensors. The pool is created once and reused for every
+    call to step and reset.
+
+    :param envs: Environments to be vectorised
+    :param n_envs: Number of environments
+    :param n_threads: Number of worker threads. Defaults to min(n_envs, cpu count)
+    :type envs: list
+    :type n_envs: int
+    :type n_threads: int
+    """
+
+    def __init__(self, *args, n_threads: int = None, **kwargs):
+        super(ThreadVecEnv, self).__init__(*args, **kwargs)
+
+        if n_threads is None:
+            n_threads = min(self.n_envs, os.cpu_count() or 1)
+        self.n_threads = max(1, min(n_threads, self.n_envs))
+
+        self.chunks = [
+            chunk.tolist()
+            for chunk in np.array_split(np.arange(self.n_envs), self.n_threads)
+        ]
+        self.pool = ThreadPoolExecutor(
+            max_workers=self.n_threads, thread_name_prefix="ThreadVecEnv"
+        )
+
+    def _step_chunk(
+        self, indices: List[int], actions: torch.Tensor, repeat: int
+    ) -> None:
+        """
+        Steps through a chunk of envs and writes results into the shared buffers
+
+        :param indices: Indices of the envs in the chunk
+        :param actions: Actions for all the envs
+        :param repeat: Maximum number of times the actions are taken
+        :type indices: list
+        :type actions: Iterable of ints/floats
+        :type repeat: int
+        """
+        for i in indices:
+            obs, reward, done, info = repeat_step(self.envs[i], actions[i], repeat)
+            self.obs_batch[i] = obs
+            self.rewards[i] = reward
+            self.dones[i] = done
+            self.infos[i] = info
+
+    def _reset_chunk(self, indices: List[int]) -> None:
+        """
+        Resets a chunk of envs and writes initial states into the shared buffer
+
+        :param indices: Indices of the envs in the chunk
+        :type indices: list
+        """
+        for i in indices:
+            self.obs_batch[i] = self.envs[i].reset()
+
+    def _run(self, fn, *args) -> None:
+        """
+        Runs the given function on every chunk in the thread pool and waits for all of them
+
+        Exceptions raised inside a worker thread are re-raised here.
+        """
+        futures = [self.pool.submit(fn, chunk, *args) for chunk in self.chunks]
+        for future in futures:
+            future.result()
+
+    def step_repeat(self, actions: torch.Tensor, repeat: int) -> Tuple:
+        """
+        Repeats the actions in all envs in parallel on the thread pool
+
+        :param actions: Actions from the model
+        :param repeat: Maximum number of times the actions are taken
+        :type actions: Iterable of ints/floats
+        :type repeat: int
+        """
+        self._run(self._step_chunk, actions, repeat)
+        self.episode_reward += self.rewards
+        return (
+            self.obs_batch.get(),
+            self.rewards.detach().clone(),
+            self.dones.detach().clone(),
+            deepcopy(self.infos),
+        )
+
+    def reset(self) -> torch.Tensor:
+        """
+        Resets all envs in parallel on the thread pool
+        """
+        self._run(self._reset_chunk)
+        self.episode_reward = torch.zeros(self.n_envs)
+
+        return self.obs_batch.get()
+
+    def close(self):
+        """
+        Closes all envs and shuts down the thread pool
+        """
+        self.pool.shutdown(wait=True)
+        super(ThreadVecEnv, self).close()
+
+
 class SubProcessVecEnv(VecEnv):
     """
     Constructs a wrapper for parallel execution through envs.
+
+    Environments can also be given as factories (callables returning the
+    environment), in which case they are built in parallel inside the worker
+    processes and only their spaces are sent back to the parent. Workers send
+    their observations as NumPy arrays, which are written in place into a
+    preallocated ObservationBatch.
+
+    :param envs: Gym environments, or factories building them
+    :param n_envs: Number of environments
+    :param copy_obs: True if the observations returned should be copies of the \
+batch. If False, they are overwritten by the next step or reset
+    :param pin_memory: True if the batch of observations should be in pinned memory
+    :type envs: list
+    :type n_envs: int
+    :type copy_obs: bool
+    :type pin_memory: bool
     """
 
-    def __init__(self, *args, **kwargs):
-        super(SubProcessVecEnv, self).__init__(*args, **kwargs)
+    def __init__(
+        self,
+        envs: List,
+        n_envs: int = 2,
+        copy_obs: bool = True,
+        pin_memory: bool = False,
+    ):
+        if isinstance(envs[0], gym.Env):
+            super(SubProcessVecEnv, self).__init__(envs, n_envs)
+        else:
+            self.envs = []
+            self.env = None
+            self._n_envs = n_envs
+            self.episode_reward = torch.zeros(self.n_envs)
 
         self.procs = []
+        self.waiting = False
         self.parent_conns, self.child_conns = zip(
             *[mp.Pipe() for i in range(self._n_envs)]
         )
 
         for parent_conn, child_conn, env_fn in zip(
-            self.parent_conns, self.child_conns, self.envs
+            self.parent_conns, self.child_conns, envs
         ):
             args = (parent_conn, child_conn, env_fn)
             process = mp.Process(target=worker, args=args, daemon=True)
@@ -240,13 +502,41 @@ class SubProcessVecEnv(VecEnv):
             self.procs.append(process)
             child_conn.close()
 
+        self.spaces = [parent_conn.recv() for parent_conn in self.parent_conns]
+        for result in self.spaces:
+            if isinstance(result, Exception):
+                self.close()
+                raise result
+        self.observation_space, self.action_space = self.spaces[0]
+        self.obs_batch = ObservationBatch(
+            self.n_envs, self.obs_shape, copy_obs, pin_memory, self.obs_dtype
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        if super(SubProcessVecEnv, self).__getattribute__("env") is not None:
+            return super(SubProcessVecEnv, self).__getattr__(name)
+
+        # No environment in this process, so fetch the attribute from a worker
+        parent_conns = super(SubProcessVecEnv, self).__getattribute__("parent_conns")
+        parent_conns[0].send(("get_attr", name))
+        found, value = parent_conns[0].recv()
+        if not found:
+            raise AttributeError(
+                "Environment has no attribute {!r}: {}".format(name, value)
+            )
+        return value
+
     def get_spaces(self) -> Tuple:
         """
         Returns state and action spaces of environments
         """
-        self.parent_conns[0].send(("get_spaces", None))
-        observation_space, action_space = self.parent_conns[0].recv()
-        return (observation_space, action_space)
+        return (self.observation_space, self.action_space)
+
+    def sample(self) -> torch.Tensor:
+        """
+        Return samples of actions from each environment
+        """
+        return torch.as_tensor(np.array([space.sample() for _, space in self.spaces]))
 
     def seed(self, seed: int = None):
         """
@@ -268,8 +558,19 @@ class SubProcessVecEnv(VecEnv):
 
         self.episode_reward = torch.zeros(self.n_envs)
 
-        obs = [parent_conn.recv() for parent_conn in self.parent_conns]
-        return torch.stack(obs)
+        self.obs_batch.write([parent_conn.recv() for parent_conn in self.parent_conns])
+        return self.obs_batch.get()
+
+    def reset_single_env(self, i: int) -> torch.Tensor:
+        """
+        Resets single environment
+
+        :returns: States of all environments after the reset
+        """
+        self.parent_conns[i].send(("reset", None))
+        self.obs_batch[i] = self.parent_conns[i].recv()
+        self.episode_reward[i] = 0
+        return self.obs_batch.get()
 
     def step(self, actions: torch.Tensor) -> Tuple:
         """
@@ -278,8 +579,30 @@ class SubProcessVecEnv(VecEnv):
         :param actions: Actions from the model
         :type actions: Iterable of ints/floats
         """
-        for parent_conn, action in zip(self.parent_conns, actions):
-            parent_conn.send(("step", action))
+        return self._step([("step", action) for action in actions])
+
+    def step_repeat(self, actions: torch.Tensor, repeat: int) -> Tuple:
+        """
+        Repeats the actions inside the worker processes, stopping at episode ends
+
+        Only one message is exchanged with each worker per call.
+
+        :param actions: Actions from the model
+        :param repeat: Maximum number of times the actions are taken
+        :type actions: Iterable of ints/floats
+        :type repeat: int
+        """
+        return self._step([("step_repeat", (action, repeat)) for action in actions])
+
+    def _step(self, messages: List[Tuple]) -> Tuple:
+        """
+        Sends a step command to every worker and collects the results
+
+        :param messages: Command and data to be sent to each worker
+        :type messages: list
+        """
+        for parent_conn, message in zip(self.parent_conns, messages):
+            parent_conn.send(message)
         self.waiting = True
 
         result = []
@@ -288,8 +611,17 @@ class SubProcessVecEnv(VecEnv):
         self.waiting = False
 
         observations, rewards, dones, infos = zip(*result)
-        self.episode_reward += torch.Tensor(rewards)
-        return (torch.Tensor(v) for v in [observations, rewards, dones, infos])
+        rewards = torch.Tensor(rewards)
+        self.episode_reward += rewards
+        self.obs_batch.write(observations)
+        return self.obs_batch.get(), rewards, torch.Tensor(dones), list(infos)
+
+    def render(self, mode: str = "human") -> Any:
+        """
+        Renders the first environment
+        """
+        self.parent_conns[0].send(("render", None))
+        return self.parent_conns[0].recv()
 
     def close(self):
         """
@@ -299,6 +631,23 @@ class SubProcessVecEnv(VecEnv):
             for parent_conn in self.parent_conns:
                 parent_conn.recv()
         for parent_conn in self.parent_conns:
-            parent_conn.send(("close", None))
+            try:
+                parent_conn.send(("close", None))
+            except BrokenPipeError:  # Worker failed to build its environment
+                pass
         for proc in self.procs:
             proc.join()
+
+    @property
+    def observation_spaces(self) -> List:
+        return [observation_space for observation_space, _ in self.spaces]
+
+    @property
+    def action_spaces(self) -> List:
+        return [action_space for _, action_space in self.spaces]
+
+    @property
+    def unwrapped(self) -> gym.Env:
+        if self.env is None:
+            return self
+        return self.env.unwrapped
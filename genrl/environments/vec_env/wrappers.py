@@ -5,8 +5,14 @@ from genrl.environments.vec_env.vector_envs import VecEnv
 
 class VecEnvWrapper(VecEnv):
     def __init__(self, venv):
+        # Environments may not exist in this process (eg. subprocess or batched
+        # VecEnvs), so everything is taken from the wrapped VecEnv
         self.venv = venv
-        super(VecEnvWrapper, self).__init__(envs=venv.envs, n_envs=venv.n_envs)
+        self.envs = venv.envs
+        self.env = venv.env
+        self._n_envs = venv.n_envs
+        self.observation_space = venv.observation_space
+        self.action_space = venv.action_space
 
     def __getattr__(self, name):
         return getattr(self.venv, name)
@@ -19,8 +25,22 @@ class VecEnvWrapper(VecEnv):
     def reset(self):
         pass
 
+    def sample(self):
+        return self.venv.sample()
+
+    def seed(self, seed):
+        return self.venv.seed(seed)
+
     def render(self, mode="human"):
         return self.venv.render(mode=mode)
 
     def close(self):
         self.venv.close()
+
+    @property
+    def observation_spaces(self):
+        return [self.observation_space] * self.n_envs
+
+    @property
+    def action_spaces(self):
+        return self.venv.action_spaces
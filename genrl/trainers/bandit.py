@@ -72,7 +72,7 @@ class MABTrainer(BanditTrainer):
         reward_mv_avgs = []
 
         for t in range(1, timesteps + 1):
-            action = self.agent.select_action(context)
+            action = self.agent.act(context)
             context, reward = self.bandit.step(action)
             self.agent.action_hist.append(action)
             self.agent.update_params(context, action, reward)
@@ -169,7 +169,7 @@ class DCBTrainer(BanditTrainer):
             )
 
         for t in range(1, timesteps + 1):
-            action = self.agent.select_action(context)
+            action = self.agent.act(context)
             new_context, reward = self.bandit.step(action)
             self.agent.update_db(context, action, reward)
             context = new_context
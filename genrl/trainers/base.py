@@ -1,13 +1,20 @@
 import os
 from abc import ABC
-from typing import Any, List, Optional, Union
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import gym
-import numpy as np
 import toml
 import torch
 
-from genrl.environments.vec_env import VecEnv
+from genrl.environments.vec_env import VecEnv, get_vec_normalize
+from genrl.trainers.evaluation import (
+    AsyncEvaluator,
+    SequentialStopping,
+    make_eval_env,
+    run_episodes,
+    summarize,
+)
 from genrl.utils import Logger, set_seeds
 
 
@@ -32,7 +39,15 @@ class Trainer(ABC):
         load_weights (str): Weights file
         load_hyperparams (str): File to load hyperparameters
         render (bool): True if environment is to be rendered during training, else False
-        evaluate_episodes (int): Number of episodes to evaluate for
+        evaluate_episodes (int): Number of episodes to evaluate for (at most, if
+            eval_stopping is given)
+        eval_stopping (:obj:`SequentialStopping`): Rule to stop evaluations early once
+            the mean reward is known precisely enough
+        evaluate_interval (int): Timesteps between successive evaluations of the agent
+            in a separate process during training. 0 disables them
+        eval_env (str or callable): Gym ID of the evaluation environment, or picklable
+            callable building the vectorised evaluation environment. Defaults to the
+            training environment
         seed (int): Set seed for reproducibility
     """
 
@@ -54,6 +69,9 @@ class Trainer(ABC):
         load_hyperparams: str = None,
         render: bool = False,
         evaluate_episodes: int = 25,
+        eval_stopping: Optional[SequentialStopping] = None,
+        evaluate_interval: int = 0,
+        eval_env: Union[str, Callable] = None,
         seed: Optional[int] = None,
     ):
         self.agent = agent
@@ -72,6 +90,10 @@ class Trainer(ABC):
         self.load_hyperparams = load_hyperparams
         self.render = render
         self.evaluate_episodes = evaluate_episodes
+        self.eval_stopping = eval_stopping
+        self.evaluate_interval = evaluate_interval
+        self.eval_env = eval_env
+        self.evaluator = None
 
         if seed is not None:
             set_seeds(seed, self.env)
@@ -85,44 +107,92 @@ class Trainer(ABC):
         """
         raise NotImplementedError
 
-    def evaluate(self, render: bool = False) -> None:
+    def evaluate(self, render: bool = False) -> Dict[str, Any]:
         """Evaluate performance of Agent
 
+        Runs evaluate_episodes episodes, or fewer if eval_stopping stops the
+        evaluation early.
+
         Args:
             render (bool): Option to render the environment during evaluation
+
+        Returns:
+            summary (dict): Number of episodes used, mean and standard deviation of the
+                rewards
         """
-        episode, episode_reward = 0, torch.zeros(self.env.n_envs)
-        episode_rewards = []
-        state = self.env.reset()
-        while True:
-            if self.off_policy:
-                action = self.agent.select_action(state, deterministic=True)
-            else:
-                action, _, _ = self.agent.select_action(state)
-
-            next_state, reward, done, _ = self.env.step(action)
-
-            if render:
-                self.env.render()
-
-            episode_reward += reward
-            state = next_state
-            if done.byte().any():
-                for i, di in enumerate(done):
-                    if di:
-                        episode += 1
-                        episode_rewards.append(episode_reward[i].clone().detach())
-                        episode_reward[i] = 0
-                        self.env.reset_single_env(i)
-            if episode == self.evaluate_episodes:
-                print(
-                    "Evaluated for {} episodes, Mean Reward: {:.2f}, Std Deviation for the Reward: {:.2f}".format(
-                        self.evaluate_episodes,
-                        np.mean(episode_rewards),
-                        np.std(episode_rewards),
-                    )
-                )
-                return
+        episode_rewards = run_episodes(
+            self.agent,
+            self.env,
+            self.evaluate_episodes,
+            self.off_policy,
+            self.eval_stopping,
+            render,
+        )
+        summary = summarize(episode_rewards)
+        print(
+            "Evaluated for {} episodes, Mean Reward: {:.2f}, Std Deviation for the Reward: {:.2f}".format(
+                summary["Episodes"], summary["Mean Reward"], summary["Std Reward"]
+            )
+        )
+        return summary
+
+    def start_evaluator(self) -> None:
+        """Starts the process evaluating the agent during training
+
+        Evaluation results are logged under the "eval" subdirectory of logdir.
+        Does nothing if evaluate_interval is 0.
+        """
+        if self.evaluate_interval <= 0:
+            return
+
+        env_fn = self.eval_env
+        if env_fn is None or isinstance(env_fn, str):
+            env_fn = partial(
+                make_eval_env,
+                env_fn or self.env.unwrapped.spec.id,
+                self.env.n_envs,
+                get_vec_normalize(self.env) is not None,
+            )
+        self.evaluator = AsyncEvaluator(
+            self.agent,
+            env_fn,
+            self.evaluate_episodes,
+            self.off_policy,
+            self.eval_stopping,
+        )
+        self.eval_logger = Logger(
+            logdir=os.path.join(self.logdir, "eval"), formats=[*self.log_mode]
+        )
+        self.next_evaluation = 0
+
+    def evaluate_async(self, timestep: int) -> None:
+        """Sends the agent for evaluation when due and logs finished evaluations
+
+        Training does not wait for the evaluation, which runs in a separate process
+        on a snapshot of the agent's weights.
+
+        Args:
+            timestep (int): Current timestep of training
+        """
+        if self.evaluator is None:
+            return
+
+        if timestep >= self.next_evaluation:
+            self.evaluator.submit(timestep, self.agent, self.env)
+            self.next_evaluation = timestep + self.evaluate_interval
+
+        for result in self.evaluator.poll():
+            self.eval_logger.write(result, "timestep")
+
+    def stop_evaluator(self) -> None:
+        """Waits for the last evaluations, logs them and stops the evaluator"""
+        if self.evaluator is None:
+            return
+
+        for result in self.evaluator.close():
+            self.eval_logger.write(result, "timestep")
+        self.eval_logger.close()
+        self.evaluator = None
 
     def save(self, timestep: int) -> None:
         """Function to save all relevant parameters of a given agent
@@ -159,6 +229,13 @@ class Trainer(ABC):
 
         torch.save(weights, filename_weights)
 
+        vec_normalize = get_vec_normalize(self.env)
+        if vec_normalize is not None:
+            filename_normalize = "{}/{}-log-{}-normalize.pt".format(
+                path, run_num, timestep
+            )
+            torch.save(vec_normalize.state_dict(), filename_normalize)
+
     def load(self):
         """Function to load saved parameters of a given agent"""
         try:
@@ -178,6 +255,14 @@ class Trainer(ABC):
         except FileNotFoundError:
             raise Exception("Invalid weights File Name")
 
+        # Normalization statistics are saved next to the weights
+        vec_normalize = get_vec_normalize(self.env)
+        filename_normalize = "{}-normalize.pt".format(
+            os.path.splitext(self.load_weights)[0]
+        )
+        if vec_normalize is not None and os.path.exists(filename_normalize):
+            vec_normalize.load_state_dict(torch.load(filename_normalize))
+
         print("Loaded Pretrained Model weights and hyperparameters!")
 
     @property
@@ -4,6 +4,7 @@ import gym
 import numpy as np
 from matplotlib import pyplot as plt
 
+from genrl.trainers.evaluation import SequentialStopping
 from genrl.utils.models import get_model_from_name
 
 
@@ -18,6 +19,7 @@ class ClassicalTrainer:
     :param n_episodes: number of training episodes
     :param plan_n_steps: number of planning step per environment interaction
     :param start_steps: number of initial exploration timesteps
+    :param eval_stopping: rule to stop evaluations early
     :param seed: seed for random number generator
     :param render: render gym environment
     :type agent: object
@@ -27,6 +29,7 @@ class ClassicalTrainer:
     :type n_episodes: int
     :type plan_n_steps: int
     :type start_steps: int
+    :type eval_stopping: SequentialStopping
     :type seed: int
     :type render: bool
     """
@@ -42,6 +45,7 @@ class ClassicalTrainer:
         start_steps: int = 5000,
         start_plan: int = 50,
         evaluate_frequency: int = 500,
+        eval_stopping: Optional[SequentialStopping] = None,
         seed: Optional[int] = None,
         render: bool = False,
     ):
@@ -52,6 +56,7 @@ class ClassicalTrainer:
         self.start_steps = start_steps
         self.start_plan = start_plan
         self.evaluate_frequency = evaluate_frequency
+        self.eval_stopping = eval_stopping
         self.render = render
 
         if mode == "learn":
@@ -145,10 +150,14 @@ class ClassicalTrainer:
         """
         Evaluate function.
 
-        :param eval_ep: Number of episodes you want to evaluate for
+        Runs eval_ep episodes, or fewer if eval_stopping stops the evaluation early.
+        The number of episodes actually run is kept in eval_episodes.
+
+        :param eval_ep: Maximum number of episodes you want to evaluate for
         :type eval_ep: int
+        :returns: Mean reward of the evaluation episodes
+        :rtype: float
         """
-        ep = 0
         ep_rew = 0
         ep_rews = []
         state = self.env.reset()
@@ -161,16 +170,20 @@ class ClassicalTrainer:
             ep_rew += reward
             if done:
                 ep_rews.append(ep_rew)
-                ep += 1
-                mean_ep_rew = np.mean(ep_rews)
-                if ep == 100:
-                    print(
-                        "Evaluated for {} episodes, Mean Reward: {:.2f}, Std Deviation for the Reward: {:.2f}".format(
-                            eval_ep, mean_ep_rew, np.std(ep_rews)
-                        )
-                    )
+                if len(ep_rews) == eval_ep or (
+                    self.eval_stopping is not None and self.eval_stopping(ep_rews)
+                ):
                     break
+                state = self.env.reset()
+                ep_rew = 0
 
+        mean_ep_rew = np.mean(ep_rews)
+        self.eval_episodes = len(ep_rews)
+        print(
+            "Evaluated for {} episodes, Mean Reward: {:.2f}, Std Deviation for the Reward: {:.2f}".format(
+                self.eval_episodes, mean_ep_rew, np.std(ep_rews)
+            )
+        )
         return mean_ep_rew
 
     def plot(self, results: List[float], window_size: int = 100) -> None:
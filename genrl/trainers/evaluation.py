@@ -0,0 +1,331 @@
+import copy
+import multiprocessing as mp
+import pickle
+import time
+from statistics import NormalDist
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import torch
+
+from genrl.environments import VecNormalize, VectorEnv
+from genrl.environments.vec_env import VecEnv, get_vec_normalize
+
+
+class SequentialStopping:
+    """Stopping rule ending an evaluation as soon as its outcome is known
+
+    After each episode, a confidence interval is computed for the mean return (with
+    a normal approximation). The evaluation stops once the interval is narrower
+    than 2 * tolerance, or once it lies entirely above or below threshold, ie. the
+    agent clearly beats or fails it.
+
+    Note that with vectorised environments, short episodes end first, so stopping
+    early slightly favours them.
+
+    Args:
+        tolerance (float): Half-width of the confidence interval below which the
+            mean return is precise enough
+        threshold (float): Return which the agent should beat
+        confidence (float): Confidence level of the interval
+        min_episodes (int): Number of episodes always run before stopping
+    """
+
+    def __init__(
+        self,
+        tolerance: Optional[float] = None,
+        threshold: Optional[float] = None,
+        confidence: float = 0.95,
+        min_episodes: int = 5,
+    ):
+        if tolerance is None and threshold is None:
+            raise ValueError("Either tolerance or threshold should be given")
+        if min_episodes < 2:
+            raise ValueError("At least 2 episodes are needed for an interval")
+
+        self.tolerance = tolerance
+        self.threshold = threshold
+        self.confidence = confidence
+        self.min_episodes = min_episodes
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    def interval(self, rewards: List[float]) -> Tuple[float, float]:
+        """Confidence interval of the mean return
+
+        Args:
+            rewards (:obj:`list` of float): Returns of the episodes run so far
+
+        Returns:
+            mean (float): Mean return
+            half_width (float): Half-width of the confidence interval
+        """
+        mean = np.mean(rewards)
+        half_width = self.z * np.std(rewards, ddof=1) / np.sqrt(len(rewards))
+        return mean, half_width
+
+    def __call__(self, rewards: List[float]) -> bool:
+        """Whether the evaluation can stop
+
+        Args:
+            rewards (:obj:`list` of float): Returns of the episodes run so far
+
+        Returns:
+            stop (bool): True if the evaluation can stop
+        """
+        if len(rewards) < self.min_episodes:
+            return False
+
+        mean, half_width = self.interval(rewards)
+        if self.tolerance is not None and half_width <= self.tolerance:
+            return True
+        return self.threshold is not None and (
+            mean - half_width > self.threshold or mean + half_width < self.threshold
+        )
+
+
+def run_episodes(
+    agent: Any,
+    env: VecEnv,
+    n_episodes: int,
+    off_policy: bool = False,
+    stopping: Optional[SequentialStopping] = None,
+    render: bool = False,
+) -> List[float]:
+    """Runs an agent on a vectorised environment for a number of episodes
+
+    Args:
+        agent (object): Agent acting on the environment
+        env (:obj:`VecEnv`): Vectorised environment
+        n_episodes (int): Maximum number of episodes to run
+        off_policy (bool): True if the agent is an off policy agent (which then acts
+            deterministically), False if it is on policy
+        stopping (:obj:`SequentialStopping`): Rule to stop before n_episodes episodes.
+            None always runs n_episodes episodes
+        render (bool): True if the environment should be rendered
+
+    Returns:
+        episode_rewards (:obj:`list` of float): Rewards of the episodes run, in the
+            order they ended
+    """
+    episode_rewards = []
+    episode_reward = torch.zeros(env.n_envs)
+    state = env.reset()
+    while len(episode_rewards) < n_episodes:
+        if off_policy:
+            action = agent.act(state, deterministic=True)
+        else:
+            action, _, _ = agent.act(state)
+
+        state, reward, done, _ = env.step(action)
+        if render:
+            env.render()
+
+        episode_reward += reward
+        for i in done.nonzero(as_tuple=True)[0].tolist():
+            episode_rewards.append(episode_reward[i].item())
+            episode_reward[i] = 0
+            state = env.reset_single_env(i)
+            if len(episode_rewards) == n_episodes or (
+                stopping is not None and stopping(episode_rewards)
+            ):
+                return episode_rewards
+    return episode_rewards
+
+
+def summarize(episode_rewards: List[float]) -> Dict[str, Any]:
+    """Summary of the returns of an evaluation
+
+    Args:
+        episode_rewards (:obj:`list` of float): Returns of the evaluation episodes
+
+    Returns:
+        summary (dict): Number of episodes, mean and standard deviation of the returns
+    """
+    return {
+        "Episodes": len(episode_rewards),
+        "Mean Reward": np.mean(episode_rewards),
+        "Std Reward": np.std(episode_rewards),
+    }
+
+
+def make_eval_env(env_id: str, n_envs: int = 2, normalize: bool = False) -> VecEnv:
+    """Builds the default evaluation environment
+
+    Args:
+        env_id (str): Gym ID of the environment
+        n_envs (int): Number of environments
+        normalize (bool): True if observations should be normalized with the (synced)
+            statistics of the training environment
+
+    Returns:
+        env (:obj:`VecEnv`): Evaluation environment
+    """
+    env = VectorEnv(env_id, n_envs)
+    if normalize:
+        env = VecNormalize(env, norm_reward=False, frozen=True)
+    return env
+
+
+def evaluation_worker(
+    parent_conn: mp.Pipe,
+    child_conn: mp.Pipe,
+    agent: Any,
+    env_fn: Callable,
+    n_episodes: int,
+    off_policy: bool,
+    stopping: Optional[SequentialStopping] = None,
+):
+    """Worker process of the AsyncEvaluator
+
+    The evaluation environment is built once in the worker. Each "evaluate" command
+    carries a pickled snapshot of the policy weights (and normalization statistics)
+    which is loaded into the worker's copy of the agent before running the episodes.
+
+    Args:
+        parent_conn (:obj:`Pipe`): Parent connection of Pipe
+        child_conn (:obj:`Pipe`): Child connection of Pipe
+        agent (object): Copy of the agent, without its training env and buffers
+        env_fn (callable): Builds the vectorised evaluation environment
+        n_episodes (int): Maximum number of episodes per evaluation
+        off_policy (bool): True if the agent is an off policy agent
+        stopping (:obj:`SequentialStopping`): Rule to stop evaluations early
+    """
+    parent_conn.close()
+    # Keep the evaluation from competing with training for the cores
+    torch.set_num_threads(1)
+    env = env_fn()
+    agent.env = env
+    vec_normalize = get_vec_normalize(env)
+    while True:
+        try:
+            cmd, data = child_conn.recv()
+        except EOFError:
+            break
+
+        if cmd == "evaluate":
+            timestep, snapshot = data
+            weights, normalize_state = pickle.loads(snapshot)
+            agent._load_weights(weights)
+            if vec_normalize is not None and normalize_state is not None:
+                vec_normalize.load_state_dict(normalize_state)
+
+            start = time.perf_counter()
+            rewards = run_episodes(agent, env, n_episodes, off_policy, stopping)
+            child_conn.send((timestep, rewards, time.perf_counter() - start))
+        elif cmd == "close":
+            env.close()
+            child_conn.close()
+            break
+        else:
+            raise NotImplementedError
+
+
+class AsyncEvaluator:
+    """Evaluates snapshots of a policy in a separate process
+
+    The evaluator process holds its own copy of the agent and its own vectorised
+    environment, so evaluation runs concurrently with training and never touches the
+    state of the training environments. ``submit`` sends a snapshot of the current
+    weights without waiting, and finished evaluations are collected with ``poll``.
+    While an evaluation is running, only the latest submitted snapshot is kept
+    (older pending ones are dropped) and it is sent as soon as the worker is free.
+
+    Args:
+        agent (object): Agent being trained
+        env_fn (callable): Picklable callable building the vectorised evaluation
+            environment (called inside the evaluator process)
+        evaluate_episodes (int): Maximum number of episodes per evaluation
+        off_policy (bool): True if the agent is an off policy agent
+        stopping (:obj:`SequentialStopping`): Rule to stop evaluations early
+    """
+
+    def __init__(
+        self,
+        agent: Any,
+        env_fn: Callable,
+        evaluate_episodes: int = 25,
+        off_policy: bool = False,
+        stopping: Optional[SequentialStopping] = None,
+    ):
+        # The worker needs the networks only, not the training env and buffers
+        snapshot = copy.copy(agent)
+        for name in ("env", "replay_buffer", "rollout"):
+            if hasattr(snapshot, name):
+                setattr(snapshot, name, None)
+
+        self.conn, child_conn = mp.Pipe()
+        args = (
+            self.conn,
+            child_conn,
+            snapshot,
+            env_fn,
+            evaluate_episodes,
+            off_policy,
+            stopping,
+        )
+        self.process = mp.Process(target=evaluation_worker, args=args, daemon=True)
+        self.process.start()
+        child_conn.close()
+
+        self.busy = False
+        self.pending = None
+        self.closed = False
+
+    def submit(self, timestep: int, agent: Any, env: Optional[VecEnv] = None) -> None:
+        """Sends a snapshot of the agent's current policy to be evaluated
+
+        Args:
+            timestep (int): Training timestep the snapshot is taken at
+            agent (object): Agent being trained
+            env (:obj:`VecEnv`): Training environment, whose normalization
+                statistics (if any) are synced with the snapshot
+        """
+        vec_normalize = get_vec_normalize(env) if env is not None else None
+        normalize_state = (
+            vec_normalize.state_dict() if vec_normalize is not None else None
+        )
+        # Pickling copies the weights, so later updates do not leak into the snapshot
+        snapshot = pickle.dumps((agent.get_hyperparams()[1], normalize_state))
+        self.pending = ("evaluate", (timestep, snapshot))
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        if not self.busy and self.pending is not None:
+            self.conn.send(self.pending)
+            self.pending = None
+            self.busy = True
+
+    def _receive(self) -> Dict[str, Any]:
+        timestep, rewards, eval_time = self.conn.recv()
+        self.busy = False
+        self._dispatch()
+        return {"timestep": timestep, **summarize(rewards), "Eval Time": eval_time}
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """Collects the evaluations which have finished, without waiting
+
+        Returns:
+            results (:obj:`list` of dict): Training timestep, number of episodes, mean
+                and standard deviation of the rewards and wall-clock time of each
+                finished evaluation
+        """
+        results = []
+        while self.busy and self.conn.poll():
+            results.append(self._receive())
+        return results
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Waits for the running and pending evaluations and stops the process
+
+        Returns:
+            results (:obj:`list` of dict): Evaluations finished since the last poll
+        """
+        if self.closed:
+            return []
+        results = []
+        while self.busy:
+            results.append(self._receive())
+        self.conn.send(("close", None))
+        self.process.join()
+        self.closed = True
+        return results
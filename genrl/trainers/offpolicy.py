@@ -1,6 +1,7 @@
-from typing import List, Type, Union
+from typing import List, Optional, Type, Union
 
 import numpy as np
+import torch
 
 from genrl.core import PrioritizedBuffer, ReplayBuffer
 from genrl.trainers import Trainer
@@ -64,10 +65,15 @@ class OffPolicyTrainer(Trainer):
             self.agent.replay_buffer = buffer
         self.buffer = self.agent.replay_buffer
 
-    def noise_reset(self) -> None:
-        """Resets the agent's action noise functions"""
+    def noise_reset(self, env_ids: Optional[List[int]] = None) -> None:
+        """Resets the agent's action noise functions
+
+        Args:
+            env_ids (:obj:`list` of int): Environments whose noise should be reset.
+                None resets the noise of all environments
+        """
         if "noise" in self.agent.__dict__ and self.agent.noise is not None:
-            self.agent.noise.reset()
+            self.agent.noise.reset(env_ids)
 
     def get_action(self, state: np.ndarray, timestep: int) -> np.ndarray:
         """Gets the action to be performed on the environment
@@ -85,7 +91,7 @@ class OffPolicyTrainer(Trainer):
         if timestep < self.warmup_steps:
             action = self.env.sample()
         else:
-            action = self.agent.select_action(state)
+            action = self.agent.act(state)
         return action
 
     def log(self, timestep: int) -> None:
@@ -107,36 +113,43 @@ class OffPolicyTrainer(Trainer):
         )
         self.training_rewards = []
 
-    def check_game_over_status(self, dones: List[bool]) -> bool:
+    def check_game_over_status(
+        self, dones: List[bool], state: Optional[torch.Tensor] = None
+    ) -> bool:
         """Takes care of game over status of envs
 
         Whenever an env shows done, the reward accumulated is stored in a list
-        and the env is reset. Note that not all envs in the Vectorised Env are reset.
+        and the env and its action noise are reset. Note that not all envs in the
+        Vectorised Env are reset.
 
         Args:
             dones (:obj:`list`): Game over statuses of all envs
+            state (:obj:`torch.Tensor`): States of all envs. The states of the envs
+                which are reset are replaced in place by their initial states
 
         Return:
             game_over (bool): True, if at least one environment was done. Else, False
         """
-        game_over = False
+        done_envs = [i for i, done_i in enumerate(dones) if done_i]
 
-        for i, done_i in enumerate(dones):
-            if done_i:
-                self.training_rewards.append(
-                    self.env.episode_reward[i].detach().clone()
-                )
-                self.env.reset_single_env(i)
-                self.episodes += 1
-                game_over = True
+        for i in done_envs:
+            self.training_rewards.append(self.env.episode_reward[i].detach().clone())
+            reset_states = self.env.reset_single_env(i)
+            if state is not None:
+                state[i] = reset_states[i]
+            self.episodes += 1
 
-        return game_over
+        if done_envs:
+            self.noise_reset(done_envs)
+        return len(done_envs) > 0
 
     def train(self) -> None:
         """Main training method"""
         if self.load_weights is not None or self.load_hyperparams is not None:
             self.load()
 
+        self.start_evaluator()
+
         state = self.env.reset()
         self.noise_reset()
 
@@ -160,9 +173,7 @@ class OffPolicyTrainer(Trainer):
 
             state = next_state.detach().clone()
 
-            if self.check_game_over_status(done):
-                self.noise_reset()
-
+            if self.check_game_over_status(done, state):
                 if self.episodes % self.log_interval == 0:
                     self.log(timestep)
 
@@ -172,6 +183,9 @@ class OffPolicyTrainer(Trainer):
             if timestep >= self.start_update and timestep % self.update_interval == 0:
                 self.agent.update_params(self.update_interval)
 
+            if timestep >= self.start_update:
+                self.evaluate_async(timestep)
+
             if (
                 timestep >= self.start_update
                 and self.save_interval != 0
@@ -179,5 +193,6 @@ class OffPolicyTrainer(Trainer):
             ):
                 self.save(timestep)
 
+        self.stop_evaluator()
         self.env.close()
         self.logger.close()
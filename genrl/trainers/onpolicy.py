@@ -35,6 +35,8 @@ class OnPolicyTrainer(Trainer):
         if self.load_weights is not None or self.load_hyperparams is not None:
             self.load()
 
+        self.start_evaluator()
+
         for epoch in range(self.epochs):
             self.agent.epoch_reward = np.zeros(self.env.n_envs)
 
@@ -46,6 +48,7 @@ class OnPolicyTrainer(Trainer):
             self.agent.get_traj_loss(values, done)
 
             self.agent.update_params()
+            self.evaluate_async(epoch * self.agent.rollout_size)
 
             if epoch % self.log_interval == 0:
                 self.logger.write(
@@ -69,5 +72,6 @@ class OnPolicyTrainer(Trainer):
             if self.save_interval != 0 and epoch % self.save_interval == 0:
                 self.save(epoch * self.agent.batch_size)
 
+        self.stop_evaluator()
         self.env.close()
         self.logger.close()
@@ -13,11 +13,16 @@ from genrl.utils.logger import HumanOutputFormat  # noqa
 from genrl.utils.logger import Logger  # noqa
 from genrl.utils.logger import TensorboardLogger  # noqa
 from genrl.utils.utils import (  # noqa
+    TargetUpdater,
     cnn,
+    compile_step,
+    ensemble_mlp,
     get_env_properties,
     get_model,
+    graph_break,
     mlp,
     noisy_mlp,
     safe_mean,
+    script_sequentials,
     set_seeds,
 )
@@ -1,5 +1,5 @@
 import random
-from typing import Any, List, Tuple, Union
+from typing import Any, Callable, Iterable, List, Tuple, Union
 
 import gym
 import numpy as np
@@ -7,6 +7,8 @@ import torch  # noqa
 import torch.nn as nn  # noqa
 
 from genrl.core.base import BaseActorCritic, BasePolicy, BaseValue
+from genrl.core.encoders import OneHotLinear
+from genrl.core.ensemble import EnsembleLinear
 from genrl.core.noise import NoisyLinear
 from genrl.environments.vec_env import VecEnv
 
@@ -40,14 +42,19 @@ def mlp(
     sizes: Tuple,
     activation: str = "relu",
     sac: bool = False,
+    one_hot: bool = False,
 ):
     """
         Generates an MLP model given sizes of each layer
 
         :param sizes: Sizes of hidden layers
         :param sac: True if Soft Actor Critic is being used, else False
+        :param one_hot: (True if the MLP takes discrete observations given as
+    indices, sizes[0] being the number of observations. Its first layer is then a
+    OneHotLinear layer)
         :type sizes: tuple or list
         :type sac: bool
+        :type one_hot: bool
         :returns: (Neural Network with fully-connected linear layers and
     activation layers)
     """
@@ -58,7 +65,35 @@ def mlp(
 
     for layer in range(limit - 1):
         act = activation if layer < limit - 2 else nn.Identity()
-        layers += [nn.Linear(sizes[layer], sizes[layer + 1]), act]
+        linear = OneHotLinear if one_hot and layer == 0 else nn.Linear
+        layers += [linear(sizes[layer], sizes[layer + 1]), act]
+
+    return nn.Sequential(*layers)
+
+
+def ensemble_mlp(sizes: Tuple, n_members: int = 2, activation: str = "relu"):
+    """
+    Generates an ensemble of MLPs with the same sizes, evaluated together
+
+    Each layer of the ensemble is a single EnsembleLinear layer, so the model
+    takes inputs of shape (n_members, ..., sizes[0]) and returns outputs of
+    shape (n_members, ..., sizes[-1])
+
+    :param sizes: Sizes of the layers
+    :param n_members: Number of MLPs in the ensemble
+    :param activation: Activation function to be used. ["tanh", "relu"]
+    :type sizes: tuple or list
+    :type n_members: int
+    :type activation: string
+    :returns: Ensemble of MLPs
+    """
+    layers = []
+    act = nn.Tanh() if activation == "tanh" else nn.ReLU()
+
+    for layer in range(len(sizes) - 1):
+        layers += [EnsembleLinear(n_members, sizes[layer], sizes[layer + 1])]
+        if layer < len(sizes) - 2:
+            layers += [act]
 
     return nn.Sequential(*layers)
 
@@ -103,13 +138,20 @@ def cnn(
     return cnn_layers, output_size
 
 
-def noisy_mlp(fc_layers: List[int], noisy_layers: List[int], activation="relu"):
+def noisy_mlp(
+    fc_layers: List[int],
+    noisy_layers: List[int],
+    activation="relu",
+    one_hot: bool = False,
+):
     """Noisy MLP generating helper function
 
     Args:
         fc_layers (:obj:`list` of :obj:`int`): List of fully connected layers
         noisy_layers (:obj:`list` of :obj:`int`): :ist of noisy layers
         activation (str): Activation function to be used. ["tanh", "relu"]
+        one_hot (bool): True if the MLP takes discrete observations given as
+            indices, its first layer then being a OneHotLinear layer
 
     Returns:
         Noisy MLP model
@@ -118,9 +160,11 @@ def noisy_mlp(fc_layers: List[int], noisy_layers: List[int], activation="relu"):
     act = nn.Tanh if activation == "tanh" else nn.ReLU()
 
     for layer in range(len(fc_layers) - 1):
-        model += [nn.Linear(fc_layers[layer], fc_layers[layer + 1]), act]
+        linear = OneHotLinear if one_hot and layer == 0 else nn.Linear
+        model += [linear(fc_layers[layer], fc_layers[layer + 1]), act]
 
-    model += [nn.Linear(fc_layers[-1], noisy_layers[0]), act]
+    linear = OneHotLinear if one_hot and len(fc_layers) == 1 else nn.Linear
+    model += [linear(fc_layers[-1], noisy_layers[0]), act]
 
     for layer in range(len(noisy_layers) - 1):
         model += [NoisyLinear(noisy_layers[layer], noisy_layers[layer + 1])]
@@ -146,6 +190,9 @@ def get_env_properties(
     """
     if network == "cnn":
         state_dim = env.framestack
+    elif network == "mlp" and isinstance(env.observation_space, gym.spaces.Discrete):
+        # Discrete observations are indices, one-hot encoded by the networks
+        state_dim = env.observation_space.n
     elif network == "mlp":
         state_dim = env.observation_space.shape[0]
     elif isinstance(network, (BasePolicy, BaseValue)):
@@ -187,15 +234,138 @@ def set_seeds(seed: int, env: Union[gym.Env, VecEnv] = None) -> None:
         env.seed(seed)
 
 
-def safe_mean(log: Union[torch.Tensor, List[int]]):
+def safe_mean(log: Union[torch.Tensor, List[int], List[torch.Tensor]]):
     """
     Returns 0 if there are no elements in logs
+
+    Lists of (scalar) tensors are stacked and averaged in a single reduction
     """
 
     if len(log) == 0:
         return 0
     if isinstance(log, torch.Tensor):
         func = torch.mean
+    elif isinstance(log[0], torch.Tensor):
+        # Losses logged as tensors are only synchronised here
+        return torch.stack(log).mean().item()
     else:
         func = np.mean
     return func(log)
+
+
+class TargetUpdater:
+    """
+        Updates the weights of a target network from those of a source network
+
+        The parameters (and buffers) of both networks are gathered once into flat
+    lists, so that an update is a few fused multi-tensor kernels (torch._foreach_*)
+    instead of a Python loop over the parameters or a copy through state dicts.
+
+        :param source: Network being trained
+        :param target: Target network, with the same architecture as source
+        :type source: torch.nn.Module
+        :type target: torch.nn.Module
+    """
+
+    def __init__(self, source: nn.Module, target: nn.Module):
+        self.source_params = list(source.parameters())
+        self.target_params = list(target.parameters())
+        self.source_buffers = list(source.buffers())
+        self.target_buffers = list(target.buffers())
+        if len(self.source_params) != len(self.target_params) or len(
+            self.source_buffers
+        ) != len(self.target_buffers):
+            raise ValueError("Source and target networks should have the same layout")
+
+    @torch.no_grad()
+    def hard_update(self) -> None:
+        """
+        Copies the parameters and buffers of the source network to the target network
+        """
+        torch._foreach_copy_(self.target_params, self.source_params)
+        if self.target_buffers:
+            torch._foreach_copy_(self.target_buffers, self.source_buffers)
+
+    @torch.no_grad()
+    def soft_update(self, polyak: float) -> None:
+        """
+            Polyak averages the parameters of the target network towards those of the
+        source network: target = polyak * target + (1 - polyak) * source
+
+            :param polyak: Weight of the target parameters in the average
+            :type polyak: float
+        """
+        torch._foreach_lerp_(self.target_params, self.source_params, 1 - polyak)
+
+    def update(self, polyak: float = 0.0) -> None:
+        """
+            Updates the target network, with a hard update if polyak is 0 and a soft
+        update otherwise
+
+            :param polyak: Weight of the target parameters in the average
+            :type polyak: float
+        """
+        if polyak == 0:
+            self.hard_update()
+        else:
+            self.soft_update(polyak)
+
+
+def script_sequentials(module: nn.Module) -> nn.Module:
+    """
+    Scripts the Sequential networks within a module in place with TorchScript
+
+    The module keeps its own (unscripted) methods and shares its parameters with
+    the scripted networks, so that optimizers and target updaters are unaffected.
+
+    :param module: Module whose Sequential submodules are scripted
+    :type module: Pytorch Module
+    :returns: The module
+    :rtype: Pytorch Module
+    """
+    for name, child in module.named_children():
+        if isinstance(child, nn.Sequential):
+            setattr(module, name, torch.jit.script(child))
+        else:
+            script_sequentials(child)
+    return module
+
+
+def compile_step(
+    step: Callable, modules: Iterable[nn.Module] = (), backend: str = "inductor"
+) -> Callable:
+    """
+    Compiles the update step of an agent, to reuse it on every update
+
+    With torch.compile, the whole step (losses, backward passes and optimizer steps)
+    is captured on its first call and the compiled step is reused afterwards. On
+    versions of torch without torch.compile, the Sequential networks of the modules
+    are scripted with TorchScript instead and the step is returned as is.
+
+    :param step: Update step of the agent
+    :param modules: Networks used by the step
+    :param backend: Backend of torch.compile
+    :type step: callable
+    :type modules: list of Pytorch Modules
+    :type backend: string
+    :returns: Compiled update step
+    :rtype: callable
+    """
+    if hasattr(torch, "compile"):
+        return torch.compile(step, backend=backend)
+
+    for module in modules:
+        script_sequentials(module)
+    return step
+
+
+def graph_break() -> None:
+    """
+    Ends the current graph of a step compiled by compile_step
+
+    Tensors computed before the break come out of a separate graph, so they can be
+    backpropagated through independently of the losses computed after it. Does
+    nothing when the step is not compiled with torch.compile.
+    """
+    if hasattr(torch, "_dynamo"):
+        torch._dynamo.graph_break()
@@ -28,8 +28,6 @@ CLASSIFIERS = (
     "Natural Language :: English",
     "Operating System :: OS Independent",
     "Programming Language :: Python",
-    "Programming Language :: Python :: 3.6",
-    "Programming Language :: Python :: 3.7",
     "Programming Language :: Python :: 3.8",
     "Topic :: Software Development",
     "Topic :: Software Development :: Libraries :: Python Modules",
@@ -81,7 +79,7 @@ CONFIG = {
     "project_urls": {"Source": REPOSITORY},
     "packages": find_packages(where=PROJECT, exclude=EXCLUDES),
     "install_requires": list(get_requires()),
-    "python_requires": ">=3.6",
+    "python_requires": ">=3.8",
 }
 
 if __name__ == "__main__":
@@ -1,8 +1,12 @@
 import shutil
 
+import numpy as np
+import torch
+
 from genrl.agents import A2C
 from genrl.environments import VectorEnv
 from genrl.trainers import OnPolicyTrainer
+from tests.utils import fill_rollout
 
 
 class TestA2C:
@@ -16,6 +20,16 @@ class TestA2C:
         trainer.evaluate()
         shutil.rmtree("./logs")
 
+    def test_a2c_discrete_obs(self):
+        env = VectorEnv("FrozenLake-v0", 2)
+        algo = A2C("mlp", env, rollout_size=32)
+        trainer = OnPolicyTrainer(
+            algo, env, log_mode=["csv"], logdir="./logs", epochs=1
+        )
+        trainer.train()
+        assert algo.rollout.observations.dtype == torch.long
+        shutil.rmtree("./logs")
+
     def test_a2c_continuous(self):
         env = VectorEnv("Pendulum-v0", 1)
         algo = A2C("mlp", env, rollout_size=128)
@@ -43,3 +57,23 @@ class TestA2C:
         )
         trainer.train()
         shutil.rmtree("./logs")
+
+    def test_a2c_bf16_losses(self):
+        env = VectorEnv("CartPole-v0", 2)
+        agents = []
+        for precision in ["fp32", "bf16"]:
+            torch.manual_seed(0)
+            agents.append(A2C("mlp", env, rollout_size=128, precision=precision))
+        env.seed(0)
+        fill_rollout(agents[0], env, agents[1:])
+
+        curves = []
+        for algo in agents:
+            np.random.seed(0)
+            for _ in range(5):
+                algo.update_params()
+            curves.append(
+                {key: torch.tensor(losses) for key, losses in algo.logs.items()}
+            )
+        for key in curves[0]:
+            assert torch.allclose(curves[0][key], curves[1][key], rtol=0.05, atol=1e-2)
@@ -1,9 +1,13 @@
 import shutil
 
+import torch
+
 from genrl.agents import DDPG
 from genrl.core import NormalActionNoise
 from genrl.environments import VectorEnv
 from genrl.trainers import OffPolicyTrainer
+from genrl.trainers.evaluation import run_episodes
+from tests.utils import fill_replay_buffer
 
 
 class TestDDPG:
@@ -55,3 +59,38 @@ class TestDDPG:
         )
         trainer.train()
         shutil.rmtree("./logs")
+
+    def test_ddpg_value_loss_before_actor_step(self):
+        env = VectorEnv("Pendulum-v0", 2)
+        for shared_layers in [None, [8]]:
+            algo = DDPG("mlp", env, batch_size=8, shared_layers=shared_layers)
+            assert algo.critic_step_first == (shared_layers is not None)
+            fill_replay_buffer(algo, env, 20)
+            batch = algo.sample_from_buffer()
+
+            # The critic loss is the one of the parameters before the update
+            expected = algo.get_q_loss(batch).detach()
+            value_loss, _ = algo._update_step(batch)
+            assert torch.allclose(value_loss, expected)
+
+    def test_ddpg_act(self):
+        env = VectorEnv("Pendulum-v0", 2)
+        algo = DDPG("mlp", env, noise=NormalActionNoise)
+        state = env.reset()
+
+        action = algo.act(state)
+        assert action.shape == (2, 1)
+        assert action.grad_fn is None
+        assert action.is_inference()
+
+    def test_ddpg_eval_env(self):
+        env = VectorEnv("Pendulum-v0", 2)
+        algo = DDPG("mlp", env, noise=NormalActionNoise)
+        state = env.reset()
+        assert not torch.equal(algo.act(state), algo.act(state, deterministic=True))
+
+        # The action noise is sized for the training env, but deterministic actions
+        # are selected without it
+        eval_env = VectorEnv("Pendulum-v0", 3)
+        episode_rewards = run_episodes(algo, eval_env, 3, off_policy=True)
+        assert len(episode_rewards) == 3
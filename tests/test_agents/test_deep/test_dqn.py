@@ -1,5 +1,8 @@
 import shutil
 
+import numpy as np
+import torch
+
 from genrl.agents import (
     DQN,
     CategoricalDQN,
@@ -13,13 +16,59 @@ from genrl.core import (
     MlpDuelingValue,
     MlpNoisyValue,
     MlpValue,
+    OneHotLinear,
     PrioritizedBuffer,
 )
 from genrl.environments import VectorEnv
 from genrl.trainers import OffPolicyTrainer
+from tests.utils import fill_replay_buffer
 
 
 class TestDQN:
+    def test_dqn_epsilon_greedy(self):
+        env = VectorEnv("CartPole-v0", 64)
+        algo = DQN("mlp", env, max_epsilon=1.0, min_epsilon=0.0, epsilon_decay=100)
+        state = env.reset()
+        greedy = algo.select_action(state, deterministic=True)
+        assert greedy.shape == (64,)
+
+        algo.update_params_before_select_action(0)
+        assert algo.epsilon == 1.0
+        action = algo.select_action(state)
+        assert action.shape == (64,)
+        assert set(action.tolist()) == {0, 1}
+
+        # Envs explore independently of each other
+        algo.update_params_before_select_action(70)
+        assert 0.4 < algo.epsilon < 0.6
+        action = algo.select_action(state)
+        assert 0 < (action != greedy).sum() < 64
+
+        algo.update_params_before_select_action(100000)
+        assert torch.equal(algo.select_action(state), greedy)
+        assert algo.get_logging_params()["epsilon"] < 1e-6
+
+        env = VectorEnv("CartPole-v0", 1)
+        algo = DQN("mlp", env)
+        assert algo.select_action(env.reset()).shape == (1,)
+
+    def test_dqn_discrete_obs(self):
+        env = VectorEnv("FrozenLake-v0", 2)
+        algo = DQN("mlp", env, batch_size=5, replay_size=100, value_layers=[8, 8])
+        assert isinstance(algo.model.model[0], OneHotLinear)
+        trainer = OffPolicyTrainer(
+            algo,
+            env,
+            log_mode=["csv"],
+            logdir="./logs",
+            max_ep_len=50,
+            epochs=1,
+            warmup_steps=10,
+            start_update=10,
+        )
+        trainer.train()
+        shutil.rmtree("./logs")
+
     def test_vanilla_dqn(self):
         env = VectorEnv("CartPole-v0")
         algo = DQN("mlp", env, batch_size=5, replay_size=100, value_layers=[1, 1])
@@ -55,6 +104,94 @@ class TestDQN:
         trainer.train()
         shutil.rmtree("./logs")
 
+    def test_double_dqn_fused_targets(self):
+        env = VectorEnv("CartPole-v0", 2)
+        algo = DoubleDQN("mlp", env, batch_size=8, replay_size=100)
+        fill_replay_buffer(algo, env, 20)
+        batch = algo.sample_from_buffer()
+
+        q_values, target_q_values = algo.get_q_and_target_values(batch)
+        assert torch.allclose(q_values, algo.get_q_values(batch.states, batch.actions))
+        expected = algo.get_target_q_values(
+            batch.next_states, batch.rewards, batch.dones
+        )
+        assert torch.allclose(target_q_values, expected)
+        assert q_values.requires_grad and not target_q_values.requires_grad
+
+    def test_dqn_sample_batches(self):
+        env = VectorEnv("CartPole-v0", 2)
+        algo = DQN("mlp", env, batch_size=8, replay_size=100)
+        fill_replay_buffer(algo, env, 20)
+
+        batches = list(algo.sample_batches(3))
+        assert len(batches) == 3
+        for batch in batches:
+            assert batch.states.shape == batch.next_states.shape == (8, 2, 4)
+            assert batch.actions.shape == (8, 2, 1)
+            assert batch.actions.dtype == torch.int64
+        # The minibatches are views of one sampled block
+        assert batches[0].states.data_ptr() + 8 * 2 * 4 * 4 == (
+            batches[1].states.data_ptr()
+        )
+
+        algo.update_params(3)
+        assert len(algo.logs["value_loss"]) == 3
+        assert isinstance(algo.get_logging_params()["value_loss"], float)
+
+    def test_dqn_compiled_update(self):
+        env = VectorEnv("CartPole-v0", 2)
+        torch.manual_seed(0)
+        algo = DQN("mlp", env, batch_size=8, replay_size=100)
+        torch.manual_seed(0)
+        compiled = DQN(
+            "mlp", env, batch_size=8, replay_size=100, compile_update="eager"
+        )
+        fill_replay_buffer(algo, env, 20)
+
+        for batch in algo.sample_batches(2):
+            assert torch.allclose(
+                algo._update_step(batch), compiled._update_step(batch)
+            )
+        for p, p_compiled in zip(algo.model.parameters(), compiled.model.parameters()):
+            assert torch.allclose(p, p_compiled, atol=1e-6)
+
+    def test_dqn_bf16_precision(self):
+        env = VectorEnv("CartPole-v0", 2)
+        agents = []
+        for precision in ["fp32", "bf16"]:
+            torch.manual_seed(0)
+            agents.append(
+                DQN(
+                    "mlp",
+                    env,
+                    batch_size=32,
+                    replay_size=1000,
+                    precision=precision,
+                    bf16_buffers=precision == "bf16",
+                )
+            )
+        env.seed(0)
+        state = fill_replay_buffer(agents[0], env, 200, agents[1:])
+
+        # Both agents sample the same minibatches, so their loss curves only differ
+        # by the rounding of the bfloat16 forward passes
+        curves = []
+        for algo in agents:
+            np.random.seed(0)
+            algo.update_params(200)
+            curves.append(torch.stack(algo.logs["value_loss"]).float())
+        assert curves[1][-20:].mean() < 0.5 * curves[1][:20].mean()
+        assert torch.allclose(curves[0], curves[1], rtol=0.05, atol=1e-3)
+
+        bf16 = agents[1]
+        for param in bf16.model.parameters():
+            assert param.dtype == torch.float32
+        for param_state in bf16.optimizer.state.values():
+            assert param_state["exp_avg"].dtype == torch.float32
+
+        action = bf16.act(state)
+        assert action.dtype == agents[0].act(state).dtype
+
     def test_dueling_dqn(self):
         env = VectorEnv("CartPole-v0")
         algo = DuelingDQN(
@@ -1,8 +1,12 @@
 import shutil
 
+import numpy as np
+import torch
+
 from genrl.agents import PPO1
 from genrl.environments import VectorEnv
 from genrl.trainers import OnPolicyTrainer
+from tests.utils import fill_rollout
 
 
 class TestPPO:
@@ -41,3 +45,57 @@ class TestPPO:
         )
         trainer.train()
         shutil.rmtree("./logs")
+
+    def test_ppo1_act(self):
+        env = VectorEnv("CartPole-v0", 2)
+        algo = PPO1("mlp", env, rollout_size=16)
+        action, value, log_prob = algo.act(env.reset())
+        for tensor in (action, value, log_prob):
+            assert tensor.grad_fn is None
+            assert tensor.is_inference()
+
+        # Rollouts collected with act can still be trained on
+        values, dones = algo.collect_rollouts(env.reset())
+        algo.get_traj_loss(values, dones)
+        algo.update_params()
+
+    def test_ppo1_bf16_precision(self):
+        env = VectorEnv("CartPole-v0", 2)
+        algo = PPO1("mlp", env, rollout_size=128, precision="bf16", bf16_buffers=True)
+        action, value, log_prob = algo.act(env.reset())
+        assert value.dtype == log_prob.dtype == torch.float32
+
+        values, dones = algo.collect_rollouts(env.reset())
+        assert algo.rollout.observations.dtype == torch.bfloat16
+        algo.get_traj_loss(values, dones)
+        algo.update_params()
+        for param in algo.ac.parameters():
+            assert param.dtype == torch.float32
+            assert param.grad.dtype == torch.float32
+        assert all(
+            rollout.observations.dtype == torch.float32
+            for rollout in algo.rollout.get(algo.batch_size)
+        )
+
+    def test_ppo1_bf16_losses(self):
+        env = VectorEnv("CartPole-v0", 2)
+        agents = []
+        for precision in ["fp32", "bf16"]:
+            torch.manual_seed(0)
+            agents.append(PPO1("mlp", env, rollout_size=128, precision=precision))
+        env.seed(0)
+        fill_rollout(agents[0], env, agents[1:])
+
+        # Both agents are updated on the same minibatches, so their loss curves only
+        # differ by the rounding of the bfloat16 forward passes
+        curves = {}
+        for algo in agents:
+            np.random.seed(0)
+            for _ in range(5):
+                algo.update_params()
+            for key, losses in algo.logs.items():
+                # The ratio and the losses are computed in float32
+                assert all(loss.dtype == torch.float32 for loss in losses)
+                curves.setdefault(key, []).append(torch.stack(losses))
+        for fp32_curve, bf16_curve in curves.values():
+            assert torch.allclose(fp32_curve, bf16_curve, rtol=0.05, atol=1e-2)
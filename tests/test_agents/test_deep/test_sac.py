@@ -1,8 +1,12 @@
 import shutil
 
+import numpy as np
+import torch
+
 from genrl.agents import SAC
 from genrl.environments import VectorEnv
 from genrl.trainers import OffPolicyTrainer
+from tests.utils import fill_replay_buffer
 
 
 class TestSAC:
@@ -46,3 +50,64 @@ class TestSAC:
         )
         trainer.train()
         shutil.rmtree("./logs")
+
+    def test_sac_bf16_precision(self):
+        env = VectorEnv("Pendulum-v0", 2)
+        agents = []
+        for precision in ["fp32", "bf16"]:
+            torch.manual_seed(0)
+            agents.append(
+                SAC(
+                    "mlp",
+                    env,
+                    batch_size=32,
+                    replay_size=1000,
+                    precision=precision,
+                    bf16_buffers=precision == "bf16",
+                )
+            )
+        env.seed(0)
+        state = fill_replay_buffer(agents[0], env, 100, agents[1:])
+
+        curves = []
+        for algo in agents:
+            np.random.seed(0)
+            algo.update_params(100)
+            curves.append(torch.stack(algo.logs["value_loss"]).float())
+        assert torch.allclose(curves[0], curves[1], rtol=0.05, atol=1e-2)
+
+        action = agents[1].act(state)
+        assert action.dtype == torch.float32
+        for param in agents[1].ac.parameters():
+            assert param.dtype == torch.float32
+
+    def test_sac_fused_actor_pass(self):
+        env = VectorEnv("Pendulum-v0", 2)
+        for shared_layers, n_passes in [(None, 1), ([8], 2)]:
+            algo = SAC("mlp", env, batch_size=8, shared_layers=shared_layers)
+            assert algo.fused_actor_pass == (shared_layers is None)
+            fill_replay_buffer(algo, env, 20)
+
+            batch_sizes = []
+            get_action = algo.ac.get_action
+
+            def counted_get_action(states, *args, **kwargs):
+                batch_sizes.append(states.shape[0])
+                return get_action(states, *args, **kwargs)
+
+            algo.ac.get_action = counted_get_action
+            algo.update_params(3)
+            assert len(batch_sizes) == 3 * n_passes
+            assert sum(batch_sizes) == 3 * 2 * algo.batch_size
+
+    def test_sac_compiled_fused_actor_pass(self):
+        env = VectorEnv("Pendulum-v0", 2)
+        algo = SAC("mlp", env, batch_size=8, compile_update="aot_eager")
+        assert algo.fused_actor_pass
+        fill_replay_buffer(algo, env, 20)
+
+        params = [param.clone() for param in algo.ac.parameters()]
+        algo.update_params(3)
+        assert len(algo.logs["policy_loss"]) == 3
+        for before, after in zip(params, algo.ac.parameters()):
+            assert not torch.equal(before, after)
@@ -0,0 +1,45 @@
+import torch
+
+from genrl.core import PrioritizedBuffer, ReplayBuffer
+from genrl.utils import safe_mean
+
+
+class TestBuffers:
+    def test_replay_buffer_sample_block(self):
+        buffer = ReplayBuffer(100)
+        for i in range(50):
+            state = torch.full((2, 3), float(i))
+            buffer.push(
+                (state, torch.zeros(2), torch.ones(2), state + 1, torch.zeros(2))
+            )
+
+        states, actions, rewards, next_states, dones = buffer.sample_block(4, 8)
+        assert states.shape == next_states.shape == (4, 8, 2, 3)
+        assert actions.shape == rewards.shape == dones.shape == (4, 8, 2)
+        # Every sampled experience is a stored transition
+        assert torch.equal(next_states, states + 1)
+        assert set(states[..., 0, 0].flatten().tolist()) <= set(range(50))
+
+    def test_bf16_states(self):
+        for buffer in [
+            ReplayBuffer(100, bf16_states=True),
+            PrioritizedBuffer(100, bf16_states=True),
+        ]:
+            for i in range(20):
+                state = torch.rand(2, 3) * i
+                buffer.push(
+                    (state, torch.ones(2, 1), torch.rand(2), state + 1, torch.zeros(2))
+                )
+            states, actions, rewards, next_states, dones = buffer.sample(8)[:5]
+            for tensor in [states, actions, rewards, next_states, dones]:
+                assert tensor.dtype == torch.float32
+            # States are rounded to bfloat16, other elements are stored exactly
+            assert torch.allclose(next_states, states + 1, rtol=1e-2, atol=1e-2)
+            assert torch.equal(actions, torch.ones(8, 2, 1))
+            assert torch.equal(states, states.bfloat16().float())
+
+    def test_safe_mean_tensors(self):
+        losses = [torch.tensor(1.0), torch.tensor(2.0), torch.tensor(6.0)]
+        mean = safe_mean(losses)
+        assert isinstance(mean, float) and mean == 3.0
+        assert safe_mean([]) == 0
@@ -0,0 +1,58 @@
+import torch
+
+from genrl.core import CategoricalProjection, QuantileProjection
+
+
+class TestDistributional:
+    def test_categorical_projection(self):
+        projection = CategoricalProjection(-10, 10, num_atoms=51)
+        assert projection.support.shape == (51,)
+
+        next_dist = torch.softmax(torch.randn(4, 3, 51), dim=-1)
+        # Rewards such that the targets stay within the support
+        rewards = 2 * torch.rand(4, 3) - 1
+        dones = torch.zeros(4, 3)
+        dones[0] = 1
+        target = projection(next_dist, rewards, dones, 0.9)
+        assert target.shape == (4, 3, 51)
+        # The projection conserves the probability mass
+        assert torch.allclose(target.sum(-1), torch.ones(4, 3), atol=1e-5)
+        # The expected value follows the Bellman target with the given gamma
+        expected = rewards + 0.9 * (1 - dones) * projection.expected_value(next_dist)
+        assert torch.allclose(projection.expected_value(target), expected, atol=1e-4)
+
+    def test_categorical_projection_on_atoms(self):
+        """
+        test that no mass is lost when the targets land exactly on atoms
+        """
+        projection = CategoricalProjection(-2, 2, num_atoms=5)
+        next_dist = torch.eye(5)
+        target = projection(next_dist, torch.zeros(5), torch.zeros(5), 1.0)
+        assert torch.equal(target, torch.eye(5))
+
+        # Targets clamped to the edges of the support
+        target = projection(next_dist, 10 * torch.ones(5), torch.zeros(5), 1.0)
+        assert torch.equal(target[:, -1], torch.ones(5))
+
+    def test_quantile_projection(self):
+        projection = QuantileProjection(num_quantiles=8)
+        assert torch.allclose(projection.taus, (torch.arange(8) + 0.5) / 8)
+
+        next_quantiles = torch.randn(4, 3, 8)
+        rewards = torch.randn(4, 3)
+        dones = torch.zeros(4, 3)
+        dones[1] = 1
+        target = projection(next_quantiles, rewards, dones, 0.99)
+        expected = (
+            rewards.unsqueeze(-1) + 0.99 * (1 - dones.unsqueeze(-1)) * next_quantiles
+        )
+        assert torch.allclose(target, expected)
+
+        quantiles = torch.randn(4, 3, 8, requires_grad=True)
+        loss = projection.loss(quantiles, target)
+        assert loss.dim() == 0
+        loss.backward()
+        assert quantiles.grad is not None
+        # Dirac target distributions are matched exactly by constant quantiles
+        constant = torch.ones(4, 3, 8)
+        assert projection.loss(constant, constant).item() == 0
@@ -0,0 +1,59 @@
+import torch
+from torch import nn
+
+from genrl.core import EnsembleLinear, MlpValue
+from genrl.core.actor_critic import MlpSingleActorTwoCritic
+
+
+class TestEnsemble:
+    def test_ensemble_linear(self):
+        layer = EnsembleLinear(3, 4, 5)
+        assert layer.weight.shape == (3, 4, 5)
+        inp = torch.randn(3, 8, 2, 4)
+        out = layer(inp)
+        assert out.shape == (3, 8, 2, 5)
+        for i in range(3):
+            linear = nn.Linear(4, 5)
+            linear.weight.data = layer.weight[i].t()
+            linear.bias.data = layer.bias[i, 0]
+            assert torch.allclose(out[i], linear(inp[i]), atol=1e-6)
+
+        # Inputs shared by the members can be expanded views
+        shared = torch.randn(8, 4)
+        out = layer(shared.expand(3, 8, 4))
+        assert torch.allclose(out[1], shared @ layer.weight[1] + layer.bias[1])
+
+        # Inputs of fewer members are evaluated by the first members only
+        assert torch.allclose(layer(inp[:2]), layer(inp)[:2])
+
+    def test_ensemble_critics(self):
+        ac = MlpSingleActorTwoCritic(
+            3, 1, val_type="Qsa", discrete=False, sac=True, num_critics=5
+        )
+        state = torch.randn(8, 2, 4)
+        values = ac.get_value(state, mode="both")
+        assert len(values) == 5 and values[0].shape == (8, 2)
+        assert torch.equal(
+            ac.get_value(state, mode="min"), torch.stack(values).min(0)[0]
+        )
+        first = ac.get_value(state, mode="first")
+        assert torch.allclose(first.squeeze(-1), values[0], atol=1e-6)
+        # The first critic is evaluated alone
+        assert ac.critics(state, n_members=1).shape == (1, 8, 2, 1)
+
+    def test_load_twin_critics(self):
+        """
+        test loading weights of separate twin critics into the ensemble
+        """
+        ac = MlpSingleActorTwoCritic(3, 1, val_type="Qsa", discrete=False, sac=True)
+        critics = [MlpValue(3, 1, "Qsa", (32, 32)) for _ in range(2)]
+        state_dict = {"actor." + k: v for k, v in ac.actor.state_dict().items()}
+        for i, critic in enumerate(critics):
+            for k, v in critic.state_dict().items():
+                state_dict["critic{}.{}".format(i + 1, k)] = v
+        ac.load_state_dict(state_dict)
+
+        state = torch.randn(8, 2, 4)
+        q1_values, q2_values = ac.get_value(state, mode="both")
+        assert torch.allclose(q1_values, critics[0].get_value(state), atol=1e-6)
+        assert torch.allclose(q2_values, critics[1].get_value(state), atol=1e-6)
@@ -0,0 +1,48 @@
+import torch
+
+from genrl.core import NormalActionNoise, OrnsteinUhlenbeckActionNoise
+
+
+class TestNoise:
+    def test_normal_action_noise(self):
+        noise = NormalActionNoise(
+            torch.ones(2), 0.5 * torch.ones(2), n_envs=3, block_size=1000
+        )
+        samples = torch.stack([noise() for _ in range(2000)])
+        assert samples.shape == (2000, 3, 2)
+        assert torch.allclose(samples.mean(dim=0), torch.ones(3, 2), atol=0.1)
+        assert torch.allclose(samples.std(dim=0), 0.5 * torch.ones(3, 2), atol=0.1)
+        # Each env gets its own noise
+        assert not torch.equal(samples[:, 0], samples[:, 1])
+
+    def test_ou_action_noise(self):
+        noise = OrnsteinUhlenbeckActionNoise(
+            torch.zeros(2), torch.ones(2), n_envs=3, block_size=16
+        )
+        for _ in range(40):
+            sample = noise()
+        assert sample.shape == (3, 2)
+        assert not torch.equal(sample[0], sample[1])
+
+        noise.reset([1])
+        assert torch.equal(noise.noise_prev[1], torch.zeros(2))
+        assert not torch.equal(noise.noise_prev[0], torch.zeros(2))
+
+        noise.reset()
+        assert torch.equal(noise.noise_prev, torch.zeros(3, 2))
+
+    def test_ou_action_noise_process(self):
+        """
+        test that the noise follows the OU process from the pre-generated increments
+        """
+        noise = OrnsteinUhlenbeckActionNoise(
+            torch.ones(1), 0.3 * torch.ones(1), theta=0.5, dt=0.1, n_envs=2
+        )
+        torch.manual_seed(0)
+        increments = torch.randn(noise.block_size, 2, 1) * 0.3 * 0.1 ** 0.5
+        torch.manual_seed(0)
+
+        expected = torch.zeros(2, 1)
+        for increment in increments[:10]:
+            expected = expected + 0.5 * (1 - expected) * 0.1 + increment
+            assert torch.allclose(noise(), expected, atol=1e-6)
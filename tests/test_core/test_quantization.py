@@ -0,0 +1,129 @@
+import time
+
+import torch
+from torch import nn
+from torch.ao.nn.quantized import dynamic
+
+from genrl.agents import DQN, PPO1, TD3
+from genrl.core import (
+    CnnValue,
+    OneHotLinear,
+    export_quantized_agent,
+    quantize_dynamic_network,
+)
+from genrl.core.quantization import buffer_states
+from genrl.environments import VectorEnv
+from genrl.utils import mlp
+from tests.utils import fill_replay_buffer
+
+
+def act_latency(agent, state, n_calls=200, repeats=5):
+    """Median time of a call to act on a single observation"""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(n_calls):
+            agent.act(state, deterministic=True)
+        times.append((time.perf_counter() - start) / n_calls)
+    return sorted(times)[repeats // 2]
+
+
+class TestQuantization:
+    def test_dynamic_quantization_agreement(self):
+        env = VectorEnv("CartPole-v0", 2)
+        torch.manual_seed(0)
+        algo = DQN("mlp", env, replay_size=1000, value_layers=[256, 256])
+        fill_replay_buffer(algo, env, 300)
+
+        # Every linear layer is quantized by default
+        exported = export_quantized_agent(algo)
+        assert exported.replay_buffer is None and algo.replay_buffer is not None
+        assert all(
+            isinstance(layer, dynamic.Linear)
+            for layer in exported.model.model
+            if not isinstance(layer, (nn.ReLU, nn.Identity))
+        )
+        assert not any(isinstance(layer, dynamic.Linear) for layer in algo.model.model)
+
+        states = buffer_states(algo, 500)
+        assert states.shape == (500, 4)
+        actions = algo.act(states, deterministic=True)
+        agreement = (exported.act(states, deterministic=True) == actions).float()
+        assert agreement.mean() >= 0.95
+
+    def test_dynamic_quantization_continuous(self):
+        env = VectorEnv("Pendulum-v0", 2)
+        torch.manual_seed(0)
+        algo = TD3("mlp", env, replay_size=1000)
+        fill_replay_buffer(algo, env, 100)
+
+        exported = export_quantized_agent(algo)
+        states = buffer_states(algo, 200)
+        actions = algo.act(states, deterministic=True)
+        error = exported.act(states, deterministic=True) - actions
+        # Actions of Pendulum are in [-2, 2]
+        assert error.abs().max() < 0.05
+
+    def test_min_weight_size(self):
+        network = nn.Sequential(nn.Linear(8, 64), nn.ReLU(), nn.Linear(64, 1024))
+        quantized = quantize_dynamic_network(network, min_weight_size=64 * 1024)
+        assert type(quantized[0]) is nn.Linear
+        assert isinstance(quantized[2], dynamic.Linear)
+        assert type(network[2]) is nn.Linear
+
+        # One-hot input layers are embedding lookups and are kept in float32
+        quantized = quantize_dynamic_network(mlp([5, 64, 2], one_hot=True))
+        assert type(quantized[0]) is OneHotLinear
+        assert isinstance(quantized[2], dynamic.Linear)
+        indices = torch.tensor([[3], [0]])
+        assert quantized(indices).shape == (2, 2)
+
+    def test_static_cnn_quantization(self):
+        env = VectorEnv("CartPole-v0", 1)
+        torch.manual_seed(0)
+        algo = DQN(CnnValue(4, 2, "Qs", [32]), env, replay_size=100)
+        frames = torch.rand(64, 4, 84, 84)
+
+        exported = export_quantized_agent(algo, calibration_states=frames)
+        assert any(
+            isinstance(layer, torch.ao.nn.intrinsic.quantized.ConvReLU2d)
+            for layer in exported.model.conv
+        )
+        states = torch.rand(64, 4, 84, 84)
+        with torch.inference_mode():
+            q_values = algo.model(states.unsqueeze(0))
+            error = exported.model(states.unsqueeze(0)) - q_values
+        assert error.abs().max() < 0.1 * q_values.std()
+        agreement = exported.act(states, deterministic=True) == algo.act(
+            states, deterministic=True
+        )
+        assert agreement.float().mean() >= 0.95
+
+    def test_rollout_calibration_states(self):
+        env = VectorEnv("CartPole-v0", 2)
+        algo = PPO1("mlp", env, rollout_size=32)
+        values, dones = algo.collect_rollouts(env.reset())
+        states = buffer_states(algo, 50)
+        assert states.shape == (50, 4)
+        assert torch.equal(states[:2], algo.rollout.observations[0])
+
+    def test_quantized_latency(self):
+        env = VectorEnv("CartPole-v0", 1)
+        algo = DQN("mlp", env, value_layers=[1024, 1024])
+        # Only the 1024 x 1024 layer is large enough to be quantized
+        exported = export_quantized_agent(algo, min_weight_size=2 ** 19)
+        assert isinstance(exported.model.model[2], dynamic.Linear)
+        assert type(exported.model.model[0]) is nn.Linear
+
+        n_threads = torch.get_num_threads()
+        torch.set_num_threads(1)
+        try:
+            state = env.reset()
+            fp32_latency = act_latency(algo, state)
+            int8_latency = act_latency(exported, state)
+        finally:
+            torch.set_num_threads(n_threads)
+        # The int8 network is about twice as fast. The ratio is generous so that
+        # the test does not depend on the load of the machine, the strict timings
+        # are measured by examples/benchmarks/quantized_policies.py
+        assert int8_latency < 1.5 * fp32_latency
@@ -1,3 +1,4 @@
 from tests.test_environments.test_atari_wrappers import TestAtari  # noqa
+from tests.test_environments.test_batched import TestBatchedEnvs  # noqa
 from tests.test_environments.test_vecenv import TestVecEnvs  # noqa
 from tests.test_environments.test_wrappers import TestWrappers  # noqa
@@ -1,12 +1,55 @@
 import shutil
 
+import cv2
 import gym
+import numpy as np
+import torch
 
 from genrl.agents import DQN
-from genrl.environments import AtariEnv, AtariPreprocessing, FrameStack, VectorEnv
+from genrl.core import ReplayBuffer
+from genrl.environments import (
+    AtariEnv,
+    AtariPreprocessing,
+    AtariScreens,
+    FrameStack,
+    LazyFrames,
+    VectorEnv,
+)
+from genrl.environments.torch import TorchWrapper
+from genrl.environments.vec_env import SerialVecEnv, VecAtariPreprocessing
 from genrl.trainers import OffPolicyTrainer
 
 
+class RandomScreens(gym.Env):
+    """
+    Environment returning random pairs of raw RGB screens like AtariScreens
+    """
+
+    observation_space = gym.spaces.Box(0, 255, (2, 210, 160, 3), dtype=np.uint8)
+    action_space = gym.spaces.Discrete(2)
+
+    def step(self, action):
+        return self.observation_space.sample(), 0.0, False, {"done": False}
+
+    def reset(self):
+        return self.observation_space.sample()
+
+
+class RandomFrames(gym.Env):
+    """
+    Environment returning random preprocessed grayscale frames
+    """
+
+    observation_space = gym.spaces.Box(0, 255, (84, 84), dtype=np.uint8)
+    action_space = gym.spaces.Discrete(2)
+
+    def step(self, action):
+        return self.observation_space.sample(), 0.0, False, {}
+
+    def reset(self):
+        return self.observation_space.sample()
+
+
 class TestAtari:
     def test_atari_preprocessing(self):
         """
@@ -42,6 +85,60 @@ class TestAtari:
         assert isinstance(info, dict)
         atari_env.close()
 
+    def test_lazy_frames(self):
+        """
+        Tests decoding and metadata of LazyFrames
+        """
+        frames = [np.random.randint(0, 255, (84, 84), dtype=np.uint8) for _ in range(5)]
+        for compress in [False, True]:
+            first = LazyFrames(frames[:4], compress)
+            second = LazyFrames(
+                first._frames[1:] + LazyFrames(frames[4:], compress)._frames,
+                compress,
+                (84, 84),
+                np.uint8,
+            )
+            assert first.shape == (4, 84, 84) and len(first) == 4
+            assert first.dtype == np.uint8
+            assert np.array_equal(np.asarray(first), np.stack(frames[:4]))
+            assert np.array_equal(first[2], frames[2])
+            assert np.asarray(first, dtype=np.float32).dtype == np.float32
+
+            batch = LazyFrames.stack([first, second])
+            assert batch.shape == (2, 4, 84, 84)
+            assert np.array_equal(batch[0], np.stack(frames[:4]))
+            assert np.array_equal(batch[1], np.stack(frames[1:]))
+
+    def test_lazy_framestack(self):
+        """
+        Tests compressing each frame once in FrameStack and sampling LazyFrames
+        """
+        env = FrameStack(RandomFrames(), lazy=True)
+        buffer = ReplayBuffer(10)
+
+        state = env.reset()
+        assert isinstance(state, LazyFrames)
+        assert state.compress and state.shape == (4, 84, 84)
+        # The initial frame is compressed once and shared by the stack
+        assert len({id(frame) for frame in state._frames}) == 1
+        for _ in range(10):
+            next_state, reward, done, _ = env.step(env.action_space.sample())
+            assert next_state._frames[:3] == state._frames[1:]
+            buffer.push((state, 0, reward, next_state, done))
+            state = next_state
+
+        assert len(buffer) == 10
+        states, _, _, next_states, _ = buffer.sample(10)
+        assert states.shape == next_states.shape == (10, 4, 84, 84)
+        transitions = list(buffer.memory)
+        for state, next_state in zip(states, next_states):
+            idx = [np.array_equal(state, np.asarray(t[0])) for t in transitions]
+            transition = transitions[idx.index(True)]
+            assert np.array_equal(next_state, np.asarray(transition[3]))
+
+        env = FrameStack(RandomFrames())
+        assert env.reset().shape == (1, 4, 84, 84)
+
     def test_atari_env(self):
         """
         Tests working of Atari Wrappers and the AtariEnv function
@@ -54,3 +151,60 @@ class TestAtari:
         )
         trainer.train()
         shutil.rmtree("./logs")
+
+    def test_atari_screens(self):
+        """
+        Tests AtariScreens wrapper
+        """
+        env = gym.make("Pong-v0")
+        atari_env = AtariScreens(env, frameskip=4)
+
+        state = atari_env.reset()
+        assert state.shape == (2, 210, 160, 3)
+        state, _, _, _ = atari_env.step(atari_env.action_space.sample())
+        assert state.shape == (2, 210, 160, 3)
+        atari_env.close()
+
+    def test_vec_atari_preprocessing(self):
+        """
+        Tests batched preprocessing against per-environment cv2 preprocessing
+        """
+        venv = SerialVecEnv([TorchWrapper(RandomScreens()) for _ in range(3)], 3)
+        env = VecAtariPreprocessing(venv, framestack=4)
+        assert env.obs_shape == (4, 84, 84)
+
+        def cv2_preprocess(screens):
+            frames = [cv2.cvtColor(s, cv2.COLOR_RGB2GRAY) for s in screens]
+            frame = np.maximum(frames[0], frames[1])
+            return cv2.resize(frame, (84, 84), interpolation=cv2.INTER_AREA)
+
+        states = env.reset()
+        assert states.shape == (3, 4, 84, 84)
+        assert states.dtype == torch.float32 and env.stacks.dtype == torch.uint8
+        assert torch.equal(states[:, 0], states[:, 3])
+
+        screens = venv.states.numpy().astype(np.uint8)
+        expected = np.stack([cv2_preprocess(s) for s in screens])
+        assert np.abs(states[:, -1].numpy() - expected).max() <= 1
+
+        next_states, _, _, _ = env.step(env.sample())
+        assert torch.equal(next_states[:, :3], states[:, 1:])
+
+        next_states = env.reset_single_env(1)
+        assert torch.equal(next_states[1, 0], next_states[1, 3])
+        assert not torch.equal(next_states[0, 0], next_states[0, 3])
+        env.close()
+
+    def test_atari_env_batched_preprocessing(self):
+        """
+        Tests working of the AtariEnv function with batched preprocessing
+        """
+        env = VectorEnv("Pong-v0", 2, env_type="atari", batched_preprocessing=True)
+        assert env.reset().shape == (2, 4, 84, 84)
+        algo = DQN("cnn", env, batch_size=5, replay_size=100, value_layers=[1, 1])
+
+        trainer = OffPolicyTrainer(
+            algo, env, epochs=5, max_ep_len=200, warmup_steps=10, start_update=10
+        )
+        trainer.train()
+        shutil.rmtree("./logs")
@@ -0,0 +1,152 @@
+import shutil
+
+import gym
+import numpy as np
+import pytest
+import torch
+
+from genrl.agents import DQN, PPO1, TD3
+from genrl.environments import (
+    BatchedCartPole,
+    BatchedMountainCar,
+    BatchedPendulum,
+    VectorEnv,
+)
+from genrl.trainers import OffPolicyTrainer, OnPolicyTrainer
+
+
+class TestBatchedEnvs:
+    def test_batched_env_interface(self):
+        """
+        Tests the VecEnv interface of batched envs with a large number of envs
+        """
+        env = VectorEnv("CartPole-v1", 10000, env_type="batched")
+        assert isinstance(env, BatchedCartPole)
+        assert env.obs_shape == (4,)
+        assert env.action_shape == (1,)
+
+        env.seed(0)
+        states = env.reset()
+        assert states.shape == (10000, 4)
+        for _ in range(30):
+            states, rewards, dones, infos = env.step(env.sample())
+        assert states.shape == (10000, 4)
+        assert rewards.shape == dones.shape == (10000,)
+        assert len(infos) == 10000
+        assert dones.any()
+
+        # step returns the final observations of the finished episodes
+        final_states = states[dones.bool()]
+        assert (
+            (final_states[:, 0].abs() > env.x_threshold)
+            | (final_states[:, 2].abs() > env.theta_threshold_radians)
+        ).all()
+        assert (env.episode_reward[dones.bool()] > 0).all()
+
+        i = int(dones.nonzero()[0])
+        states = env.reset_single_env(i)
+        assert (states[i].abs() <= 0.05).all()
+        assert env.episode_reward[i] == 0
+        env.close()
+
+    def test_batched_truncation(self):
+        """
+        Tests that the next state stored for a truncated transition is the final
+        observation of the episode and not the initial one of the next episode
+        """
+        env = BatchedPendulum("Pendulum-v0", 2, max_episode_len=5)
+        algo = TD3("mlp", env, batch_size=5, policy_layers=[1, 1], value_layers=[1, 1])
+        trainer = OffPolicyTrainer(
+            algo,
+            env,
+            log_mode=["csv"],
+            logdir="./logs",
+            max_timesteps=20,
+            warmup_steps=20,
+            start_update=20,
+        )
+        trainer.train()
+        shutil.rmtree("./logs")
+
+        transitions = list(trainer.buffer.memory)
+        assert len(transitions) == 10
+        for state, action, _, next_state, done in transitions:
+            # Pendulum never terminates, so every done is a truncation
+            assert not any(done)
+            theta = torch.atan2(state[:, 1], state[:, 0])
+            internal_state = torch.stack([theta, state[:, 2]], dim=-1)
+            expected, _, _ = env._dynamics(internal_state, action.reshape(2, 1))
+            assert torch.allclose(next_state, env._get_obs(expected), atol=1e-5)
+
+        # The transition after the truncation starts from the new episode
+        assert not torch.allclose(transitions[5][0], transitions[4][3])
+
+    @pytest.mark.parametrize(
+        "env_id, batched_env, action",
+        [
+            ("CartPole-v1", BatchedCartPole, 1),
+            ("MountainCar-v0", BatchedMountainCar, 2),
+            ("Pendulum-v0", BatchedPendulum, np.array([0.7])),
+        ],
+    )
+    def test_batched_dynamics(self, env_id, batched_env, action):
+        """
+        Tests that batched dynamics match those of the gym environments
+        """
+        env = gym.make(env_id)
+        env.reset()
+        batched = batched_env(env_id, 1)
+        batched.reset()
+        batched.state = torch.as_tensor(
+            np.array(env.unwrapped.state), dtype=torch.float32
+        ).reshape(1, -1)
+
+        for _ in range(20):
+            obs, reward, done, _ = env.step(action)
+            batched_obs, batched_reward, batched_done, _ = batched.step(
+                torch.as_tensor(action).reshape(1, -1)
+            )
+            if done:
+                break
+            assert batched_obs[0].numpy() == pytest.approx(obs, abs=1e-4)
+            assert batched_reward[0].item() == pytest.approx(reward, abs=1e-4)
+            assert not batched_done[0]
+
+    def test_batched_off_policy(self):
+        env = VectorEnv("CartPole-v0", 4, env_type="batched")
+        algo = DQN("mlp", env, batch_size=5, replay_size=100, value_layers=[1, 1])
+        trainer = OffPolicyTrainer(
+            algo,
+            env,
+            log_mode=["csv"],
+            logdir="./logs",
+            epochs=4,
+            warmup_steps=10,
+            start_update=10,
+        )
+        trainer.train()
+        trainer.evaluate()
+        shutil.rmtree("./logs")
+
+        env = VectorEnv("Pendulum-v0", 2, env_type="batched")
+        algo = TD3("mlp", env, batch_size=5, policy_layers=[1, 1], value_layers=[1, 1])
+        trainer = OffPolicyTrainer(
+            algo,
+            env,
+            log_mode=["csv"],
+            logdir="./logs",
+            epochs=2,
+            warmup_steps=10,
+            start_update=10,
+        )
+        trainer.train()
+        shutil.rmtree("./logs")
+
+    def test_batched_on_policy(self):
+        env = VectorEnv("MountainCar-v0", 4, env_type="batched")
+        algo = PPO1("mlp", env, rollout_size=32)
+        trainer = OnPolicyTrainer(
+            algo, env, log_mode=["csv"], logdir="./logs", epochs=1, evaluate_episodes=2
+        )
+        trainer.train()
+        shutil.rmtree("./logs")
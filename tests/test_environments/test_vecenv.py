@@ -1,8 +1,28 @@
+import pickle
+import shutil
+
+import gym
 import pytest
 import torch
 
+from genrl.agents import PPO1
 from genrl.environments.suite import GymEnv, VectorEnv
-from genrl.environments.vec_env import RunningMeanStd, VecMonitor, VecNormalize
+from genrl.environments.torch import TorchWrapper
+from genrl.environments.vec_env import (
+    EnvFactory,
+    EnvPool,
+    ObservationBatch,
+    PooledVecEnv,
+    RunningMeanStd,
+    SerialVecEnv,
+    SubProcessVecEnv,
+    ThreadVecEnv,
+    VecActionRepeat,
+    VecMonitor,
+    VecNormalize,
+)
+from genrl.environments.vec_env.pool import MAX_CACHED_ENVS
+from genrl.trainers import OnPolicyTrainer
 
 
 class TestVecEnvs:
@@ -18,6 +38,40 @@ class TestVecEnvs:
         env.step(env.sample())
         env.close()
 
+    def test_vecenv_parallel_factory(self):
+        """
+        Tests construction of parallel VecEnvs from env factories inside the workers
+        """
+        env = VectorEnv(lambda: TorchWrapper(GymEnv("Pendulum-v0")), 3, parallel=True)
+        assert env.env is None
+        assert env.unwrapped.spec.id == "Pendulum-v0"
+        assert len(env.action_spaces) == 3
+        assert env.obs_shape == (3,)
+
+        env.seed(0)
+        states = env.reset()
+        assert states.shape == (3, 3)
+        env.step(env.sample())
+        env.reset_single_env(2)
+        env.close()
+
+        with pytest.raises(gym.error.Error):
+            VectorEnv("NotAnEnv-v0", 2, parallel=True)
+
+    def test_vecenv_parallel_missing_attr(self):
+        """
+        Tests that looking up a missing attribute does not kill the workers
+        """
+        env = VectorEnv(lambda: TorchWrapper(GymEnv("Pendulum-v0")), 2, parallel=True)
+        assert not hasattr(env, "missing")
+        assert getattr(env, "missing", None) is None
+        with pytest.raises(AttributeError):
+            env.missing
+        states = env.reset()
+        assert states.shape == (2, 3)
+        env.step(env.sample())
+        env.close()
+
     def test_vecenv_serial(self):
         """
         Tests working of serial VecEnvs
@@ -30,6 +84,124 @@ class TestVecEnvs:
         env.step(env.sample())
         env.close()
 
+    def test_vecenv_thread(self):
+        """
+        Tests working of thread pool VecEnvs
+        """
+        env = VectorEnv("CartPole-v1", 3, parallel="thread")
+        serial_env = VectorEnv("CartPole-v1", 3, parallel=False)
+        assert isinstance(env, ThreadVecEnv)
+
+        env.seed(0)
+        serial_env.seed(0)
+        assert torch.equal(env.reset(), serial_env.reset())
+
+        actions = env.sample()
+        states, rewards, dones, _ = env.step(actions)
+        serial_states, serial_rewards, serial_dones, _ = serial_env.step(actions)
+        assert torch.equal(states, serial_states)
+        assert torch.equal(rewards, serial_rewards)
+        assert torch.equal(dones, serial_dones)
+
+        env.reset_single_env(0)
+        env.close()
+        serial_env.close()
+
+    def test_vecenv_pool(self):
+        """
+        Tests reuse of the persistent workers of the EnvPool across runs
+        """
+        env = VectorEnv("CartPole-v1", 2, parallel="pool")
+        assert isinstance(env, PooledVecEnv)
+        assert env.unwrapped.spec.id == "CartPole-v1"
+        workers = list(env.workers)
+
+        for _ in range(2):
+            algo = PPO1("mlp", env, rollout_size=32)
+            trainer = OnPolicyTrainer(
+                algo, env, log_mode=["csv"], logdir="./logs", epochs=1
+            )
+            trainer.train()
+            env.close()
+
+            env = VectorEnv("CartPole-v1", 2, parallel="pool")
+            assert env.workers == workers
+        env.close()
+        shutil.rmtree("./logs")
+
+        pool = EnvPool()
+        env = pool.make(env.env_fn, 3)
+        env.seed(0)
+        env.reset_single_env(1)
+        env.step(env.sample())
+        env.close()
+        assert pool.n_workers == 3 and len(pool.idle) == 3
+
+        # Missing attributes do not kill the workers
+        env = pool.make(env.env_fn, 3)
+        assert not hasattr(env, "missing")
+        env.reset()
+
+        # Dead workers are not handed out again
+        env.workers[0].process.terminate()
+        env.workers[0].process.join()
+        env.close()
+        assert pool.n_workers == 2
+        env = pool.make(env.env_fn, 3)
+        assert all(w.process.is_alive() for w in env.workers)
+        env.reset()
+        env.close()
+        pool.close()
+        assert pool.n_workers == 0
+
+    def test_vecenv_pool_cache(self):
+        """
+        Tests that the workers of the EnvPool keep a bounded number of envs
+        """
+        pool = EnvPool()
+        env_ids = ["CartPole-v0", "CartPole-v1", "Pendulum-v0", "MountainCar-v0"]
+        for env_id in env_ids + ["Acrobot-v1", "CartPole-v0"]:
+            pool.make(EnvFactory(env_id), 1).close()
+        (worker,) = pool.idle
+        assert len(worker.cached) == MAX_CACHED_ENVS
+        assert worker.cached[-1] == pickle.dumps(EnvFactory("CartPole-v0"))
+        assert pickle.dumps(EnvFactory("CartPole-v1")) not in worker.cached
+        pool.close()
+
+    def test_observation_batch(self):
+        """
+        Tests assembling observations in place into a preallocated batch
+        """
+        batch = ObservationBatch(2, (3,), copy=False, pin_memory=True)
+        batch.write([torch.ones(3), torch.zeros(3).numpy()])
+        batch[1] = [2.0, 2.0, 2.0]
+        assert batch.get() is batch.tensor
+        assert torch.equal(batch.tensor, torch.tensor([[1.0] * 3, [2.0] * 3]))
+
+        env_fn = lambda: TorchWrapper(GymEnv("CartPole-v1"))  # noqa
+        env = SerialVecEnv([env_fn() for _ in range(2)], 2, copy_obs=False)
+        states = env.reset()
+        next_states, _, _, _ = env.step(env.sample())
+        assert next_states.data_ptr() == states.data_ptr()
+        cartpole_state = torch.as_tensor(env.envs[0].unwrapped.state).float()
+        assert torch.equal(states[0], cartpole_state)
+
+        env = SubProcessVecEnv([env_fn] * 2, 2)
+        states = env.reset()
+        initial_states = states.clone()
+        new_states = env.reset_single_env(1)
+        assert torch.equal(states, initial_states)
+        assert torch.equal(new_states[0], states[0])
+        assert new_states.dtype == torch.float32 and new_states.shape == (2, 4)
+        env.close()
+
+        for parallel in ["serial", "thread", "process", "pool"]:
+            env = VectorEnv("CartPole-v1", 2, parallel, copy_obs=False)
+            states = env.reset()
+            next_states, _, _, _ = env.step(env.sample())
+            assert next_states.data_ptr() == states.data_ptr()
+            env.close()
+
     def test_vecnormalize(self):
         """
         Tests working of the VecNormalize wrapper
@@ -48,6 +220,30 @@ class TestVecEnvs:
         assert (-1.0 <= rewards).byte().all()
         assert (1.0 >= rewards).byte().all()
 
+    def test_vecnormalize_frozen(self):
+        """
+        Tests the frozen mode and saving of the VecNormalize statistics
+        """
+        env = VecNormalize(VectorEnv("CartPole-v1", 2))
+        env.reset()
+        for _ in range(5):
+            states, rewards, _, _ = env.step(env.sample())
+        assert states.dtype == torch.float32 and rewards.shape == (2,)
+        assert env.obs_rms.mean.dtype == torch.float32
+
+        state_dict = env.state_dict()
+        env.freeze()
+        env.step(env.sample())
+        assert torch.equal(env.obs_rms.mean, state_dict["obs_rms"]["mean"])
+        assert env.obs_rms.count == state_dict["obs_rms"]["count"]
+
+        new_env = VecNormalize(VectorEnv("CartPole-v1", 2), frozen=True)
+        new_env.load_state_dict(state_dict)
+        assert torch.equal(new_env.obs_rms.var, env.obs_rms.var)
+        assert new_env.reward_rms.count == env.reward_rms.count
+        env.close()
+        new_env.close()
+
     def test_vecmonitor(self):
         """
         Tests working of the VecMonitor wrapper
@@ -69,6 +265,68 @@ class TestVecEnvs:
         assert info["Episode Length"]
         assert info["Time taken"]
 
+        env.step(env.sample())
+        env.reset_single_env(1)
+        assert env.episode_returns[1] == 0 and env.episode_lens[1] == 0
+
+    def test_vecmonitor_statistics(self):
+        """
+        Tests the episode statistics and timing breakdown of the VecMonitor wrapper
+        """
+        env = VecMonitor(VectorEnv("CartPole-v1", 4), history_length=3)
+        assert env.get_statistics() == {"Episodes": 0}
+
+        env.reset()
+        episode_rewards = []
+        while env.episode_count < 5:
+            _, _, dones, infos = env.step(env.sample())
+            for i in dones.nonzero().flatten().tolist():
+                episode_rewards.append(infos[i]["episode"]["Episode Rewards"])
+                env.reset_single_env(i)
+        env.close()
+
+        statistics = env.get_statistics(percentiles=(50,))
+        assert statistics["Episodes"] == len(episode_rewards)
+        recent = torch.tensor(episode_rewards[-3:])
+        assert statistics["Episode Rewards Mean"] == pytest.approx(recent.mean().item())
+        assert statistics["Episode Rewards Max"] == recent.max().item()
+        assert statistics["Episode Rewards P50"] == recent.median().item()
+        assert statistics["Episode Length Min"] >= 1
+
+        timing = env.get_timing()
+        assert timing["Steps"] == env.n_steps
+        assert timing["Env time"] > 0 and timing["Monitor time"] > 0
+
+    def test_vec_action_repeat(self):
+        """
+        Tests repeating actions inside the VecEnvs with VecActionRepeat
+        """
+        for parallel, env_type in [
+            (False, "gym"),
+            ("thread", "gym"),
+            ("process", "gym"),
+            (False, "batched"),
+        ]:
+            env = VecActionRepeat(VectorEnv("CartPole-v1", 2, parallel, env_type), 4)
+            env.reset()
+            episode_len = torch.zeros(2)
+            dones = torch.zeros(2)
+            while not dones.all():
+                # Always pushing left ends the episodes after a few steps
+                _, rewards, step_dones, _ = env.step(torch.zeros(2, dtype=torch.long))
+                running = dones == 0
+                rewards, step_dones = rewards[running], step_dones[running].bool()
+                assert ((rewards == 4) | (step_dones & (rewards >= 1))).all()
+                episode_len[running] += rewards
+                dones[running] = step_dones.float()
+                for i in dones.nonzero().flatten().tolist():
+                    env.reset_single_env(i)
+            assert (episode_len < 20).all()
+            env.close()
+
+        with pytest.raises(ValueError):
+            VecActionRepeat(VectorEnv("CartPole-v1", 2), 0)
+
     def test_rms(self):
         """
         Tests working of the RMS utility function
@@ -80,3 +338,5 @@ class TestVecEnvs:
         assert rms.mean.shape == (5, 2)
         assert rms.var.shape == (5, 2)
         assert rms.count == pytest.approx(5, 1e-4)
+        assert torch.allclose(rms.mean, batch.mean(dim=0), atol=1e-3)
+        assert torch.allclose(rms.var, batch.var(dim=0, unbiased=False), atol=1e-3)
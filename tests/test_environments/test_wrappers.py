@@ -1,8 +1,12 @@
 import shutil
 
+import gym
 import pytest
+import torch
 
 from genrl.environments import ClipAction, GymEnv, RescaleAction, VectorEnv
+from genrl.environments.fused import FusedTorchEnv, fuse_wrappers
+from genrl.environments.torch import TorchWrapper
 from genrl.trainers import OffPolicyTrainer
 
 
@@ -16,6 +20,39 @@ class TestWrappers:
         env.step(env.sample())
         env.close()
 
+    def test_fused_env(self):
+        """
+        Tests that fused wrapper chains behave like the chains they replace
+        """
+        env = TorchWrapper(GymEnv("CartPole-v0"))
+        fused_env = fuse_wrappers(TorchWrapper(GymEnv("CartPole-v0")))
+        assert isinstance(fused_env, FusedTorchEnv)
+        assert fused_env.obs_shape == env.obs_shape
+        assert fused_env.action_shape == env.action_shape
+        assert fused_env.unwrapped.spec.id == "CartPole-v0"
+
+        env.seed(0)
+        fused_env.seed(0)
+        assert torch.equal(env.reset(), fused_env.reset())
+        for _ in range(50):
+            action = torch.tensor(env.action_space.sample())
+            step = env.step(action)
+            fused_step = fused_env.step(action)
+            assert torch.equal(step[0], fused_step[0])
+            assert step[1:] == fused_step[1:]
+            if step[2]:
+                assert torch.equal(env.reset(), fused_env.reset())
+
+        env = FusedTorchEnv(gym.make("Pendulum-v0"), max_episode_len=5)
+        env.reset()
+        for _ in range(5):
+            _, _, done, info = env.step(torch.tensor(env.action_space.sample()))
+        assert done and not info["done"]
+
+        pendulum = ClipAction(GymEnv("Pendulum-v0"))
+        assert fuse_wrappers(pendulum) is pendulum
+        assert isinstance(VectorEnv("CartPole-v0").env, FusedTorchEnv)
+
     def test_clip_action(self):
         """
         Tests working of Clip Action Wrapper
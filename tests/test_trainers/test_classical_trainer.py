@@ -4,6 +4,7 @@ import pytest
 
 from genrl.agents import SARSA, QLearning
 from genrl.trainers import ClassicalTrainer
+from genrl.trainers.evaluation import SequentialStopping
 
 
 class TestClassicalTrainer:
@@ -21,3 +22,13 @@ class TestClassicalTrainer:
         )
         ep_rs = trainer.train()
         trainer.evaluate()
+
+    def test_classical_trainer_sequential_stopping(self):
+        env = gym.make("FrozenLake-v0")
+        agent = QLearning(env)
+        trainer = ClassicalTrainer(
+            agent, env, eval_stopping=SequentialStopping(threshold=0.9)
+        )
+        mean_reward = trainer.evaluate()
+        assert 5 <= trainer.eval_episodes < 100
+        assert mean_reward < 0.9
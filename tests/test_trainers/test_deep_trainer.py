@@ -1,9 +1,14 @@
 import os
+from functools import partial
 from shutil import rmtree
 
-from genrl.agents import DDPG, PPO1
-from genrl.environments import VectorEnv
-from genrl.trainers import OffPolicyTrainer, OnPolicyTrainer
+import pytest
+import torch
+
+from genrl.agents import DDPG, DQN, PPO1
+from genrl.environments import VecNormalize, VectorEnv
+from genrl.trainers import AsyncEvaluator, OffPolicyTrainer, OnPolicyTrainer
+from genrl.trainers.evaluation import SequentialStopping, make_eval_env, run_episodes
 
 
 class TestDeepTrainer:
@@ -62,3 +67,134 @@ class TestDeepTrainer:
         trainer.train()
 
         rmtree("logs")
+
+    def test_save_load_vec_normalize(self):
+        """
+        test saving and loading of normalization statistics with the agent
+        """
+        env = VecNormalize(VectorEnv("CartPole-v0", 1))
+        algo = PPO1("mlp", env)
+        trainer = OnPolicyTrainer(
+            algo,
+            env,
+            ["stdout"],
+            save_model="test_ckpt_norm",
+            save_interval=1,
+            epochs=1,
+        )
+        trainer.train()
+        assert os.path.exists("test_ckpt_norm/PPO1_CartPole-v0/0-log-0-normalize.pt")
+
+        new_env = VecNormalize(VectorEnv("CartPole-v0", 1), frozen=True)
+        trainer = OnPolicyTrainer(
+            PPO1("mlp", new_env),
+            new_env,
+            epochs=0,
+            load_hyperparams="test_ckpt_norm/PPO1_CartPole-v0/0-log-0.toml",
+            load_weights="test_ckpt_norm/PPO1_CartPole-v0/0-log-0.pt",
+        )
+        trainer.train()
+        assert new_env.obs_rms.count > 1
+        assert not torch.equal(new_env.obs_rms.mean, torch.zeros(4))
+
+        rmtree("test_ckpt_norm")
+        rmtree("logs")
+
+    def test_async_evaluator(self):
+        """
+        test evaluation of policy snapshots in a separate process
+        """
+        env = VectorEnv("CartPole-v0", 2)
+        algo = DQN("mlp", env)
+        evaluator = AsyncEvaluator(
+            algo, partial(make_eval_env, "CartPole-v0", 2), 3, off_policy=True
+        )
+        evaluator.submit(0, algo, env)
+        # Only the latest snapshot is kept while the worker is busy
+        evaluator.submit(10, algo, env)
+        evaluator.submit(20, algo, env)
+        results = evaluator.poll() + evaluator.close()
+
+        assert [result["timestep"] for result in results] == [0, 20]
+        for result in results:
+            assert result["Episodes"] == 3
+            assert result["Mean Reward"] > 0
+        assert not evaluator.process.is_alive()
+
+    def test_normalized_evaluation(self):
+        """
+        test that states are normalized across the episode boundaries of evaluations
+        """
+        env = make_eval_env("CartPole-v0", 2, normalize=True)
+        env.obs_rms.mean.fill_(10.0)
+        algo = DQN("mlp", env)
+
+        states = []
+        act = algo.act
+
+        def recording_act(state, **kwargs):
+            states.append(state.clone())
+            return act(state, **kwargs)
+
+        algo.act = recording_act
+        episode_rewards = run_episodes(algo, env, 4, off_policy=True)
+        env.close()
+
+        assert len(episode_rewards) == 4
+        # Raw CartPole observations are far from the mean of 10 used for normalization
+        assert (torch.stack(states) < -5).all()
+
+    def test_async_evaluation_trainer(self):
+        """
+        test asynchronous evaluation during training
+        """
+        env = VectorEnv("CartPole-v0", 2)
+        algo = PPO1("mlp", env, rollout_size=64)
+        trainer = OnPolicyTrainer(
+            algo,
+            env,
+            ["csv"],
+            logdir="logs_eval",
+            epochs=4,
+            evaluate_episodes=2,
+            evaluate_interval=128,
+        )
+        trainer.train()
+
+        with open("logs_eval/eval/train.csv") as f:
+            lines = f.read().splitlines()
+        assert lines[0].startswith("timestep,Episodes,Mean Reward")
+        assert lines[1].startswith("0,2,")
+        assert trainer.evaluator is None
+
+        rmtree("logs_eval")
+
+    def test_sequential_stopping(self):
+        """
+        test early stopping of evaluations
+        """
+        with pytest.raises(ValueError):
+            SequentialStopping()
+
+        stopping = SequentialStopping(tolerance=1.0, min_episodes=3)
+        assert not stopping([10.0, 10.0])
+        assert stopping([10.0, 10.0, 10.0])
+        assert not stopping([0.0, 20.0, 0.0, 20.0])
+
+        stopping = SequentialStopping(threshold=50.0, min_episodes=3)
+        assert stopping([100.0, 110.0, 90.0])
+        assert stopping([0.0, 10.0, 5.0])
+        assert not stopping([40.0, 60.0, 50.0])
+
+        env = VectorEnv("CartPole-v0", 2)
+        algo = PPO1("mlp", env)
+        trainer = OnPolicyTrainer(
+            algo,
+            env,
+            ["stdout"],
+            evaluate_episodes=100,
+            eval_stopping=SequentialStopping(threshold=1000.0),
+        )
+        summary = trainer.evaluate()
+        assert 5 <= summary["Episodes"] < 100
+        assert summary["Mean Reward"] < 1000.0
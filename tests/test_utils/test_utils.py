@@ -1,14 +1,24 @@
 import random
 
 import gym
+import pytest
 import torch
 from torch import nn
 
-from genrl.agents import PPO1
-from genrl.core import CnnValue, MlpActorCritic, MlpPolicy, MlpValue
+from genrl.agents import PPO1, SAC, TD3
+from genrl.core import CnnValue, MlpActorCritic, MlpPolicy, MlpValue, OneHotLinear
 from genrl.environments import VectorEnv
 from genrl.trainers import OnPolicyTrainer
-from genrl.utils import cnn, get_env_properties, get_model, mlp, set_seeds
+from genrl.utils import (
+    TargetUpdater,
+    cnn,
+    compile_step,
+    get_env_properties,
+    get_model,
+    mlp,
+    set_seeds,
+)
+from tests.utils import fill_replay_buffer
 
 
 class TestUtils:
@@ -43,6 +53,29 @@ class TestUtils:
         assert mlp_nn(inp).shape == (2,)
         assert mlp_nn_sac(inp).shape == (3,)
 
+    def test_one_hot_linear(self):
+        """
+        test discrete observations given as indices to the first layer of MLPs
+        """
+        layer = OneHotLinear(5, 3)
+        indices = torch.tensor([[[4], [0]], [[2], [2]]])
+        one_hot = nn.functional.one_hot(indices.squeeze(-1), 5).float()
+
+        out = layer(indices)
+        expected = nn.functional.linear(one_hot, layer.weight, layer.bias)
+        assert out.shape == (2, 2, 3)
+        assert torch.allclose(out, expected)
+        assert torch.allclose(layer(indices.float()), expected)
+
+        out.sum().backward()
+        grad = layer.weight.grad.clone()
+        layer.zero_grad()
+        expected.sum().backward()
+        assert torch.allclose(grad, layer.weight.grad)
+
+        assert isinstance(mlp([5, 3, 2], one_hot=True)[0], OneHotLinear)
+        assert type(mlp([5, 3, 2])[0]) is nn.Linear
+
     def test_cnn(self):
         """
         test getting CNN layers
@@ -79,7 +112,65 @@ class TestUtils:
         assert discrete is False
         assert action_lim == 2.0
 
+        env = VectorEnv("FrozenLake-v0", 2)
+
+        state_dim, action_dim, discrete, _ = get_env_properties(env)
+        assert state_dim == 16
+        assert action_dim == 4
+        assert env.reset().dtype == torch.long and env.obs_shape == (1,)
+
     def test_set_seeds(self):
         set_seeds(42)
         sampled = random.sample([i for i in range(20)], 1)[0]
         assert sampled == 3
+
+    def test_target_updater(self):
+        """
+        test hard and soft updates of target networks
+        """
+        source = nn.Sequential(nn.Linear(3, 4), nn.BatchNorm1d(4))
+        target = nn.Sequential(nn.Linear(3, 4), nn.BatchNorm1d(4))
+        source(torch.randn(8, 3))
+        updater = TargetUpdater(source, target)
+
+        old_target = [p.clone() for p in target.parameters()]
+        updater.soft_update(0.9)
+        for p, p_old, p_target in zip(
+            source.parameters(), old_target, target.parameters()
+        ):
+            assert torch.allclose(p_target, 0.9 * p_old + 0.1 * p)
+        assert not torch.equal(target[1].running_mean, source[1].running_mean)
+
+        updater.update(0.0)
+        for k, v in source.state_dict().items():
+            assert torch.equal(target.state_dict()[k], v)
+
+        with pytest.raises(ValueError):
+            TargetUpdater(source, nn.Linear(3, 4))
+
+    def test_compile_step_fallback(self, monkeypatch):
+        """
+        test that networks are scripted when torch.compile is not available
+        """
+        model = MlpValue(4, 2, "Qs", (8, 8))
+        params = list(model.parameters())
+        x = torch.randn(3, 4)
+        expected = model(x).sum()
+
+        monkeypatch.delattr(torch, "compile")
+        step = compile_step(lambda x: model(x).sum(), [model])
+        assert isinstance(model.model, torch.jit.ScriptModule)
+        # The scripted networks keep the parameters of the model
+        assert all(p is q for p, q in zip(params, model.parameters()))
+        assert torch.allclose(step(x), expected)
+
+        # The ensembles of critics of TD3 and SAC are scripted too
+        env = VectorEnv("Pendulum-v0", 2)
+        for agent in [TD3, SAC]:
+            algo = agent("mlp", env, batch_size=8, compile_update=True)
+            assert isinstance(algo.ac.critics.model, torch.jit.ScriptModule)
+            fill_replay_buffer(algo, env, 20)
+            params = [param.clone() for param in algo.ac.critics.parameters()]
+            algo.update_params(2)
+            for before, after in zip(params, algo.ac.critics.parameters()):
+                assert not torch.equal(before, after)
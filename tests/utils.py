@@ -0,0 +1,26 @@
+def fill_replay_buffer(agent, env, timesteps, others=()):
+    """
+    Steps through env with the actions of agent and pushes the transitions into its
+    replay buffer, and into the replay buffers of the others agents
+
+    Returns the last state of env
+    """
+    state = env.reset()
+    for _ in range(timesteps):
+        action = agent.act(state)
+        next_state, reward, done, _ = env.step(action)
+        for algo in (agent, *others):
+            algo.replay_buffer.push((state, action, reward, next_state, done))
+        state = next_state
+    return state
+
+
+def fill_rollout(agent, env, others=()):
+    """
+    Collects a rollout with agent and shares its rollout buffer with the others
+    agents, so that all of them are updated on the same transitions
+    """
+    values, dones = agent.collect_rollouts(env.reset())
+    agent.get_traj_loss(values, dones)
+    for algo in others:
+        algo.rollout = agent.rollout